@@ -0,0 +1,168 @@
+from argparse import ArgumentParser
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from contextlib import nullcontext
+from json import loads
+from os import cpu_count
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from energyplus_pet.fit_cache import FitCache
+from energyplus_pet.pipeline import Pipeline
+from energyplus_pet.profiling import Profiler
+
+
+class BatchResult:
+    """A minimal class for reporting the outcome of processing one catalog definition file in a batch"""
+    def __init__(self, catalog_path: str, sku: str):
+        """
+        Constructor for the instance, initially describing a failure, until the processing fills it in
+
+        :param catalog_path: The path of the catalog definition file
+        :param sku: The product identifier, used to name the output files
+        """
+        self.catalog_path = catalog_path
+        self.sku = sku
+        self.success = False
+        self.error_message = ""
+        self.num_data_rows = 0
+        self.elapsed_seconds = 0.0
+        self.stage_seconds: Dict[str, float] = {}
+        self.output_files: List[str] = []
+        self.fit_cache_hit = False
+
+
+def process_catalog_file(
+        catalog_path: str, output_directory: str, cache_directory: Optional[str] = None, cache_size: int = 512,
+        profile: bool = False, timeout_seconds: Optional[float] = None
+) -> BatchResult:
+    """
+    Processes a single catalog definition file and writes the IDF, epJSON, and parameter summary outputs for it.
+    This is run inside the worker processes, so it never raises; any problem is reported on the returned result.
+
+    :param catalog_path: The path to a JSON catalog definition file, see ``Pipeline.run`` for the format, which can
+                         also include a ``sku`` key; if not, the file name stem is used as the SKU
+    :param output_directory: The directory to write the ``<sku>.idf``, ``<sku>.epJSON``, and ``<sku>.summary.txt``
+    :param cache_directory: An optional fit cache directory, shared by all the worker processes
+    :param cache_size: The maximum number of entries to keep in the fit cache, a count rather than a byte limit
+    :param profile: If True, a timing and peak memory report is also written to ``<sku>.profile.json``
+    :param timeout_seconds: If given, the catalog fails if its expansion and fitting take longer than this
+    :return: A BatchResult describing the outcome, including the time spent in each pipeline stage
+    """
+    path = Path(catalog_path)
+    result = BatchResult(str(path), path.stem)
+    start = perf_counter()
+    try:
+        definition = loads(path.read_text())
+        result.sku = str(definition.get('sku', path.stem))
+        result.num_data_rows = len(definition.get('base_data', []))
+        pipeline = Pipeline(FitCache(cache_directory, cache_size) if cache_directory else None)
+        profiler = Profiler(trace_memory=True) if profile else None
+        with profiler or nullcontext():
+            success = pipeline.run(definition, timeout_seconds=timeout_seconds)
+        if profiler is not None:
+            profile_file = Path(output_directory) / f"{result.sku}.profile.json"
+            profiler.dump_json(str(profile_file))
+            result.output_files.append(str(profile_file))
+        result.stage_seconds = {r.stage.name: r.elapsed_seconds for r in pipeline.stage_results}
+        result.fit_cache_hit = pipeline.fit_cache_hit
+        if not success:
+            failure = pipeline.first_failure
+            result.error_message = f"{failure.stage.name} stage failed: {failure.error_type}: {failure.error_message}"
+        else:
+            output_path = Path(output_directory)
+            for suffix, key in (('.idf', 'idf'), ('.epJSON', 'epjson'), ('.summary.txt', 'summary')):
+                output_file = output_path / f"{result.sku}{suffix}"
+                output_file.write_text(pipeline.outputs[key])
+                result.output_files.append(str(output_file))
+            result.success = True
+    except Exception as e:  # any type of exception, so one bad catalog doesn't stop the batch
+        result.error_message = f"{type(e).__name__}: {e}"
+    result.elapsed_seconds = perf_counter() - start
+    return result
+
+
+def run_batch(
+        catalog_paths: List[str], output_directory: str, num_workers: Optional[int] = None,
+        cache_directory: Optional[str] = None, cache_size: int = 512, profile: bool = False,
+        timeout_seconds: Optional[float] = None
+) -> List[BatchResult]:
+    """
+    Processes many catalog definition files in parallel across a pool of worker processes.
+
+    :param catalog_paths: A list of catalog definition file paths
+    :param output_directory: The directory to write all output files, created if needed
+    :param num_workers: The number of worker processes, defaulting to the number of CPUs
+    :param cache_directory: An optional fit cache directory, so unchanged catalogs are not refit
+    :param cache_size: The maximum number of entries to keep in the fit cache, a count rather than a byte limit
+    :param profile: If True, a timing and peak memory report is written for each catalog
+    :param timeout_seconds: If given, each catalog fails if its expansion and fitting take longer than this
+    :return: A list of BatchResult instances, in the same order as the catalog paths
+    """
+    Path(output_directory).mkdir(parents=True, exist_ok=True)
+    results: List[Optional[BatchResult]] = [None] * len(catalog_paths)
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = {
+            executor.submit(
+                process_catalog_file, p, output_directory, cache_directory, cache_size, profile, timeout_seconds
+            ): i
+            for i, p in enumerate(catalog_paths)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:  # the worker process itself died, so the catalog still gets reported
+                results[i] = BatchResult(catalog_paths[i], Path(catalog_paths[i]).stem)
+                results[i].error_message = f"Worker failure: {type(e).__name__}: {e}"
+    return results
+
+
+def main_batch(args: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point for fitting a whole directory of catalog definition files without the GUI.
+
+    :param args: Optional command line argument list, defaulting to sys.argv
+    :return: Process exit code, 0 if every catalog succeeded, 1 if any failed
+    """
+    parser = ArgumentParser(description="Generate EnergyPlus inputs for a directory of catalog definition files")
+    parser.add_argument('catalog_directory', help="Directory containing JSON catalog definition files")
+    parser.add_argument('output_directory', help="Directory to write IDF, epJSON, and summary outputs")
+    parser.add_argument('--pattern', default='*.json', help="File name pattern of catalog definitions")
+    parser.add_argument('--workers', type=int, default=cpu_count(), help="Number of worker processes")
+    parser.add_argument('--cache-dir', default=None, help="Fit cache directory, so unchanged catalogs are not refit")
+    parser.add_argument('--cache-size', type=int, default=512, help=(
+        "Maximum number of cached fits to keep; this is a count, not a size limit, and each entry grows with the "
+        "expanded catalog size"
+    ))
+    parser.add_argument('--profile', action='store_true', help="Write a timing and memory report for each catalog")
+    parser.add_argument('--timeout', type=float, default=None, help="Seconds allowed to fit each catalog")
+    options = parser.parse_args(args)
+    catalog_paths = sorted(str(p) for p in Path(options.catalog_directory).glob(options.pattern))
+    start = perf_counter()
+    results = run_batch(
+        catalog_paths, options.output_directory, options.workers, options.cache_dir, options.cache_size,
+        options.profile, options.timeout
+    )
+    elapsed = perf_counter() - start
+    failures = [r for r in results if not r.success]
+    total_rows = sum(r.num_data_rows for r in results if r.success)
+    rate = len(results) / elapsed if elapsed > 0 else 0.0
+    print(f"Processed {len(results)} catalogs in {elapsed:.2f} s ({rate:.1f} catalogs/s, {total_rows} base data rows)")
+    print(f"Succeeded: {len(results) - len(failures)}, Failed: {len(failures)}")
+    if options.cache_dir:
+        num_hits = sum(1 for r in results if r.fit_cache_hit)
+        print(f"Fit cache: {num_hits} hits, {len(results) - num_hits} misses")
+    stage_totals: Dict[str, float] = {}
+    for r in results:
+        for stage_name, seconds in r.stage_seconds.items():
+            stage_totals[stage_name] = stage_totals.get(stage_name, 0.0) + seconds
+    if stage_totals:
+        print("Total worker time by stage: " + ", ".join(f"{k} {v:.3f} s" for k, v in stage_totals.items()))
+    for failure in failures:
+        print(f"  FAILED {failure.sku} ({failure.catalog_path}): {failure.error_message}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_batch())
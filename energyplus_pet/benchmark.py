@@ -0,0 +1,340 @@
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from json import dumps, loads
+from math import ceil
+from pathlib import Path
+from platform import platform, python_version
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+from numpy import __version__ as numpy_version, column_stack, ndarray
+from numpy.random import default_rng
+
+from energyplus_pet.correction_factor import CorrectionFactor, CorrectionFactorType
+from energyplus_pet.data_manager import CatalogDataManager
+from energyplus_pet.equipment.base import BaseEquipment
+from energyplus_pet.equipment.equip_types import EquipType
+from energyplus_pet.equipment.manager import EquipmentFactory
+from energyplus_pet.exceptions import EnergyPlusPetException
+from energyplus_pet.units import FlowValue, PowerValue, TemperatureValue, UnitType, convert_array_to_calculation_unit
+
+BENCHMARK_EQUIPMENT = [
+    EquipType.WAHP_Heating_CurveFit, EquipType.WAHP_Cooling_CurveFit,
+    EquipType.WWHP_Heating_CurveFit, EquipType.WWHP_Cooling_CurveFit,
+]
+BENCHMARK_SIZES = [100, 1000, 10000, 100000, 1000000]
+# each correction factor setup is the list of (correction type, number of corrections) factors to apply
+CORRECTION_FACTOR_SETUPS = {
+    'none': [],
+    'multiplier': [(CorrectionFactorType.Multiplier, 4)],
+    'multiplier_replacement': [(CorrectionFactorType.Multiplier, 4), (CorrectionFactorType.Replacement, 4)],
+}
+# timings below this are mostly noise, so they are never reported as regressions
+NOISE_FLOOR_SECONDS = 1e-4
+
+
+class SyntheticCatalog:
+    """
+    A minimal class for a synthetic catalog of one equipment type, with randomly spread independent variables and
+    smooth dependent outputs, in calculation units, that expands to approximately a requested number of rows.
+    """
+    def __init__(self, equip_type: EquipType, num_rows: int, setup: str, seed: int = 0):
+        """
+        Constructor for the instance, which generates all the data
+
+        :param equip_type: The equipment type to build a catalog for
+        :param num_rows: The approximate number of rows in the expanded catalog
+        :param setup: A key of CORRECTION_FACTOR_SETUPS
+        :param seed: The random seed, so the same arguments always build the same catalog
+        """
+        self.equip_type = equip_type
+        self.setup = setup
+        rng = default_rng(seed)
+        equipment = EquipmentFactory.instance_factory(equip_type)
+        self.constant_parameters: Dict[str, float] = {}
+        for p in equipment.get_required_constant_parameters():
+            self.constant_parameters[p.id] = 0.0015 if p.unit_type == UnitType.Flow else 10000.0
+        units = equipment.headers().unit_array()
+        flow_columns = [i for i, u in enumerate(units) if u == UnitType.Flow]
+        power_columns = [i for i, u in enumerate(units) if u == UnitType.Power]
+        special_columns = [equipment.headers().get_db_column(), equipment.headers().get_wb_column()]
+        temperature_columns = [i for i, u in enumerate(units) if u == UnitType.Temperature]
+        plain_temperature_columns = [i for i in temperature_columns if i not in special_columns]
+
+        self.correction_factors: List[CorrectionFactor] = []
+        expansion = 1
+        for correction_type, num_corrections in CORRECTION_FACTOR_SETUPS[setup]:
+            cf = CorrectionFactor(f"{correction_type.name.lower()}_{len(self.correction_factors)}")
+            cf.correction_type = correction_type
+            cf.num_corrections = num_corrections
+            if correction_type == CorrectionFactorType.Multiplier:
+                cf.base_column_index = flow_columns[0]
+                cf.base_correction = rng.uniform(0.6, 1.4, num_corrections).tolist()
+            else:
+                cf.base_column_index = plain_temperature_columns[0]
+                cf.base_correction = rng.uniform(5.0, 35.0, num_corrections).tolist()
+            cf.columns_to_modify = power_columns
+            cf.mod_correction_data_column_map = {
+                c: rng.uniform(0.8, 1.2, num_corrections).tolist() for c in power_columns
+            }
+            self.correction_factors.append(cf)
+            expansion *= 1 + num_corrections
+        num_base_rows = max(ceil(num_rows / expansion), equipment.minimum_data_points_for_generation())
+
+        columns = []
+        for i, unit in enumerate(units):
+            if unit == UnitType.Temperature:
+                low = 15.0 if i == special_columns[1] else 5.0
+                columns.append(rng.uniform(low, low + 30.0, num_base_rows))
+            elif unit == UnitType.Flow:
+                columns.append(rng.uniform(0.001, 0.002, num_base_rows))
+            else:
+                columns.append(None)  # the dependent outputs are filled in from the independent variables below
+        independent = [c for c in columns if c is not None]
+        for i in power_columns:
+            weights = rng.uniform(-0.02, 0.02, len(independent))
+            response = 1.0 + sum(w * (c / c.mean() - 1.0) * 10.0 for w, c in zip(weights, independent))
+            columns[i] = 10000.0 / (1 + power_columns.index(i)) * response * rng.normal(1.0, 0.002, num_base_rows)
+        self.base_data: ndarray = column_stack(columns)
+
+    def data_manager(self) -> CatalogDataManager:
+        """Returns a new catalog data manager with this base data and these correction factors, not yet applied"""
+        data_manager = CatalogDataManager()
+        for cf in self.correction_factors:
+            data_manager.add_correction_factor(cf)
+        data_manager.add_base_data(self.base_data)
+        return data_manager
+
+    def equipment(self) -> BaseEquipment:
+        """Returns a new equipment instance with the constant parameters set"""
+        equipment = EquipmentFactory.instance_factory(self.equip_type)
+        for parameter_id, value in self.constant_parameters.items():
+            equipment.set_required_constant_parameter(parameter_id, value)
+        return equipment
+
+
+def time_best_of(action: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None) -> float:
+    """
+    Times an action several times and returns the fastest, which is the least affected by other machine activity.
+
+    :param action: The function to time, called with no arguments
+    :param repeat: The number of times to run the action
+    :param setup: An optional function, called before each run of the action, and not included in the time
+    :return: The fastest run time in seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        action()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def benchmark_case(catalog: SyntheticCatalog, repeat: int = 3, max_eval_points: int = 10000) -> Dict[str, float]:
+    """
+    Runs every benchmark for one synthetic catalog.
+
+    :param catalog: The synthetic catalog to benchmark
+    :param repeat: The number of times to run each benchmark, keeping the fastest
+    :param max_eval_points: The per-point curve evaluation is slow by design, so it is only timed on this many points
+    :return: A dictionary of the best times in seconds, keyed by benchmark name
+    """
+    equipment = catalog.equipment()
+    headers = equipment.headers()
+    minimum_points = equipment.minimum_data_points_for_generation()
+    state = {}
+
+    def new_data_manager():
+        # a fresh manager each time, since a manager reuses its previous expansion when nothing has changed
+        state['data_manager'] = catalog.data_manager()
+
+    def apply():
+        status = state['data_manager'].apply_correction_factors(
+            minimum_points, headers.get_db_column(), headers.get_wb_column()
+        )
+        if status != CatalogDataManager.ProcessResult.OK:
+            raise EnergyPlusPetException(f"Synthetic catalog was rejected: {state['data_manager'].last_error_message}")
+
+    results = {'apply_correction_factors': time_best_of(apply, repeat, new_data_manager)}
+    data_manager = state['data_manager']
+    final_data = data_manager.final_data
+    results['expanded_rows'] = float(final_data.shape[0])
+    results['generate_parameters'] = time_best_of(
+        lambda: equipment.generate_parameters(data_manager, lambda: None, lambda *_: None), repeat
+    )
+
+    output = equipment.curve_fit_outputs()[0]
+    num_eval_points = min(final_data.shape[0], max_eval_points)
+    eval_data = final_data[:num_eval_points]
+    independent_variables = equipment.scaled_independent_variables(eval_data)[output.independent_variable_set]
+    parameters = getattr(equipment, f"{output.name}_params")
+    results['eval_curve_at_points'] = time_best_of(
+        lambda: BaseEquipment.eval_curve_at_points(
+            output.eval_function, tuple(independent_variables.T), parameters, eval_data[:, output.catalog_column]
+        ), repeat
+    )
+    results['eval_linear_curve_at_points'] = time_best_of(
+        lambda: equipment.eval_output_at_points(
+            output, equipment.scaled_independent_variables(final_data)[output.independent_variable_set],
+            final_data[:, output.catalog_column]
+        ), repeat
+    )
+
+    # convert every column from a typical IP catalog unit, which exercises both the offset and scale conversions
+    ip_units = {
+        UnitType.Temperature: TemperatureValue.F, UnitType.Flow: FlowValue.GPM, UnitType.Power: PowerValue.BTU_hour
+    }
+
+    def convert_units():
+        for i, unit_type in enumerate(headers.unit_array()):
+            unit_id = ip_units.get(unit_type)
+            if unit_id is not None:
+                convert_array_to_calculation_unit(final_data[:, i], unit_type, unit_id)
+
+    results['unit_conversion'] = time_best_of(convert_units, repeat)
+    results['to_eplus_idf_object'] = time_best_of(equipment.to_eplus_idf_object, repeat)
+    results['to_eplus_epjson_object'] = time_best_of(equipment.to_eplus_epjson_object, repeat)
+    return results
+
+
+def micro_benchmarks(repeat: int = 3, num_objects: int = 10000) -> Dict[str, float]:
+    """
+    Runs small benchmarks of single hot functions, independent of the catalog size.
+
+    :param repeat: The number of times to run each benchmark, keeping the fastest
+    :param num_objects: The number of IDF objects to format in the formatter benchmark
+    :return: A dictionary of the best times in seconds, keyed by benchmark name
+    """
+    catalog = SyntheticCatalog(EquipType.WAHP_Cooling_CurveFit, 100, 'none')
+    equipment = catalog.equipment()
+    data_manager = catalog.data_manager()
+    data_manager.apply_correction_factors(
+        equipment.minimum_data_points_for_generation(), equipment.headers().get_db_column(),
+        equipment.headers().get_wb_column()
+    )
+    equipment.generate_parameters(data_manager, lambda: None, lambda *_: None)
+    coil = equipment.eplus_coil_object('Coil', {output.name: 'Curve' for output in equipment.curve_fit_outputs()})
+    curve = BaseEquipment.eplus_linear_curve_object('Curve', equipment.sensible_capacity_params)
+
+    def format_objects():
+        for _ in range(num_objects // 2):
+            BaseEquipment.fill_eplus_object_format(coil.object_type, coil.idf_fields)
+            BaseEquipment.fill_eplus_object_format(curve.object_type, curve.idf_fields)
+
+    return {f"fill_eplus_object_format_{num_objects}": time_best_of(format_objects, repeat)}
+
+
+def run_benchmarks(
+        equip_types: List[EquipType], sizes: List[int], setups: List[str], repeat: int = 3,
+        progress: Optional[Callable[[str], None]] = None
+) -> dict:
+    """
+    Runs the micro benchmarks, which are stored under the ``micro`` key, and then the benchmarks for every combination
+    of equipment type, catalog size, and correction factor setup.
+
+    :param equip_types: The equipment types to benchmark
+    :param sizes: The approximate expanded catalog sizes, in rows
+    :param setups: Keys of CORRECTION_FACTOR_SETUPS
+    :param repeat: The number of times to run each benchmark, keeping the fastest
+    :param progress: An optional function called with each case key as it starts
+    :return: A JSON-compatible results dictionary, with ``metadata`` and ``results`` keyed by case
+    """
+    if progress is not None:
+        progress('micro')
+    results = {'micro': micro_benchmarks(repeat)}
+    for equip_type in equip_types:
+        for setup in setups:
+            for size in sizes:
+                case_key = f"{equip_type.name}/{setup}/{size}"
+                if progress is not None:
+                    progress(case_key)
+                results[case_key] = benchmark_case(SyntheticCatalog(equip_type, size, setup), repeat)
+    return {
+        'metadata': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': python_version(),
+            'numpy': numpy_version,
+            'platform': platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.25) -> List[str]:
+    """
+    Compares two results dictionaries from ``run_benchmarks``, for the cases and benchmarks found in both.
+
+    :param baseline: The baseline results
+    :param current: The new results
+    :param threshold: The allowed fractional slowdown, so 0.25 flags anything more than 25% slower than the baseline
+    :return: A list of messages, one per benchmark that slowed down beyond the threshold; empty if none did
+    """
+    regressions = []
+    for case_key, current_times in current['results'].items():
+        baseline_times = baseline['results'].get(case_key, {})
+        for name, seconds in current_times.items():
+            if name == 'expanded_rows' or name not in baseline_times:
+                continue
+            baseline_seconds = baseline_times[name]
+            if seconds > NOISE_FLOOR_SECONDS and seconds > baseline_seconds * (1.0 + threshold):
+                slowdown = 100.0 * (seconds / baseline_seconds - 1.0) if baseline_seconds > 0 else float('inf')
+                regressions.append(
+                    f"{case_key} {name}: {baseline_seconds:.6f} s -> {seconds:.6f} s ({slowdown:+.0f}%)"
+                )
+    return regressions
+
+
+def main_benchmark(args: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point for running the benchmarks, and comparing them to a baseline.
+
+    :param args: Optional command line argument list, defaulting to sys.argv
+    :return: Process exit code, 1 if a comparison found any regressions, otherwise 0
+    """
+    parser = ArgumentParser(description="Benchmark EnergyPlus PET on synthetic catalogs")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="Run the benchmarks and save the results as JSON")
+    run_parser.add_argument('output_file', help="JSON file to write the results to")
+    run_parser.add_argument(
+        '--equipment', nargs='+', default=[e.name for e in BENCHMARK_EQUIPMENT], choices=[e.name for e in EquipType],
+        help="Equipment types to benchmark"
+    )
+    run_parser.add_argument('--sizes', nargs='+', type=int, default=BENCHMARK_SIZES, help="Expanded catalog sizes")
+    run_parser.add_argument(
+        '--setups', nargs='+', default=list(CORRECTION_FACTOR_SETUPS), choices=list(CORRECTION_FACTOR_SETUPS),
+        help="Correction factor setups"
+    )
+    run_parser.add_argument('--repeat', type=int, default=3, help="Runs of each benchmark, keeping the fastest")
+    run_parser.add_argument('--baseline', default=None, help="Baseline JSON file to compare the new results against")
+    run_parser.add_argument('--threshold', type=float, default=0.25, help="Allowed fractional slowdown")
+    compare_parser = commands.add_parser('compare', help="Compare two saved results files")
+    compare_parser.add_argument('baseline_file', help="Baseline results JSON file")
+    compare_parser.add_argument('current_file', help="New results JSON file")
+    compare_parser.add_argument('--threshold', type=float, default=0.25, help="Allowed fractional slowdown")
+    options = parser.parse_args(args)
+
+    if options.command == 'run':
+        current = run_benchmarks(
+            [EquipType[e] for e in options.equipment], options.sizes, options.setups, options.repeat,
+            lambda case_key: print(f"Benchmarking {case_key}")
+        )
+        Path(options.output_file).write_text(dumps(current, indent=2))
+        print(f"Wrote benchmark results to {options.output_file}")
+        if options.baseline is None:
+            return 0
+        baseline = loads(Path(options.baseline).read_text())
+    else:
+        baseline = loads(Path(options.baseline_file).read_text())
+        current = loads(Path(options.current_file).read_text())
+    regressions = compare_results(baseline, current, options.threshold)
+    for regression in regressions:
+        print(f"  SLOWER {regression}")
+    print(f"{len(regressions)} benchmarks slowed down by more than {100 * options.threshold:.0f}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_benchmark())
@@ -0,0 +1,151 @@
+from json import dumps
+from shutil import copyfileobj
+from tempfile import TemporaryFile
+from typing import Dict, IO, Iterable, Optional, Set, Tuple
+
+from energyplus_pet.equipment.base import BaseEquipment
+from energyplus_pet.exceptions import EnergyPlusPetException
+
+
+class BulkExporter:
+    """
+    This class writes many fitted products into a single EnergyPlus model, as one IDF file and one EpJSON file, rather
+    than the one standalone snippet per product that ``to_eplus_idf_object`` and ``to_eplus_epjson_object`` build.
+    Only one Version object is written.  Each product gets its own coil name, node names, and curve names.  Names that
+    are already taken get a numeric suffix.  A curve with exactly the same coefficients as one already written is not
+    written again, and the coil just refers to the existing curve instead.
+
+    Objects are written as each product is added, so the model is never held in memory as one string.  IDF objects go
+    straight to the IDF file.  EpJSON groups objects by type, so each type is written to its own temporary file, and
+    the groups are copied into the EpJSON file when the exporter is closed.  Use an instance as a context manager, or
+    call ``close`` when done, since the EpJSON file is not complete until then.
+    """
+
+    def __init__(self, idf_path: Optional[str] = None, epjson_path: Optional[str] = None):
+        """
+        Create a new exporter, which opens the output files and writes the Version object
+
+        :param idf_path: The IDF file path to write, or None to skip the IDF output
+        :param epjson_path: The EpJSON file path to write, or None to skip the EpJSON output
+        """
+        self.num_coils = 0
+        self.num_curves = 0
+        self.num_shared_curves = 0
+        self._used_names: Set[str] = set()
+        self._curve_names: Dict[Tuple, str] = {}  # written curve names, keyed by object type and coefficients
+        self._idf_file: Optional[IO] = open(idf_path, 'w') if idf_path is not None else None
+        self._epjson_path = epjson_path
+        self._epjson_groups: Dict[str, IO] = {}  # a temporary file of the objects of each EpJSON object type
+        if self._idf_file is not None:
+            self._idf_file.write(BaseEquipment.current_eplus_version_object_idf())
+        for object_type, objects in BaseEquipment.current_eplus_version_object_epjson().items():
+            for name, fields in objects.items():
+                self._write_epjson_object(object_type, name, fields)
+
+    def __enter__(self) -> 'BulkExporter':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _unique_name(self, name: str) -> str:
+        """Returns the name, with a numeric suffix if needed so it is not the same as any name already used"""
+        unique_name = name
+        suffix = 2
+        while unique_name in self._used_names:
+            unique_name = f"{name} {suffix}"
+            suffix += 1
+        self._used_names.add(unique_name)
+        return unique_name
+
+    def _write_epjson_object(self, object_type: str, name: str, fields: dict) -> None:
+        """Writes one object to the temporary file of its object type, indented to fit inside the final document"""
+        if self._epjson_path is None:
+            return
+        group = self._epjson_groups.get(object_type)
+        if group is None:
+            group = self._epjson_groups[object_type] = TemporaryFile('w+')
+        else:
+            group.write(',\n')
+        indented_fields = dumps(fields, indent=2).replace('\n', '\n    ')
+        group.write(f"    {dumps(name)}: {indented_fields}")
+
+    def _write_object(self, eplus_object: BaseEquipment.EplusObject) -> None:
+        if self._idf_file is not None:
+            self._idf_file.write('\n')
+            self._idf_file.write(
+                BaseEquipment.fill_eplus_object_format(eplus_object.object_type, eplus_object.idf_fields)
+            )
+        self._write_epjson_object(eplus_object.object_type, eplus_object.name, eplus_object.epjson_fields)
+
+    def add(self, equipment: BaseEquipment, product_name: str) -> str:
+        """
+        Writes the coil and curve objects of one fitted product.
+
+        :param equipment: An equipment instance, where parameters have already been generated
+        :param product_name: The product name, such as a model number or SKU, which is used as the coil name
+        :return: The coil name actually used, which has a numeric suffix if the product name was already used
+        """
+        if self._idf_file is None and self._epjson_path is None:
+            raise EnergyPlusPetException("Bulk exporter has no output files, or has already been closed")
+        coil_name = self._unique_name(product_name)
+        curve_names: Dict[str, str] = {}
+        for output in equipment.curve_fit_outputs():
+            params = [float(p) for p in getattr(equipment, f"{output.name}_params", [])]
+            if not params:
+                raise EnergyPlusPetException(f"Parameters have not been generated for {product_name} {output.name}")
+            curve_title = ''.join(word.capitalize() for word in output.name.split('_'))
+            curve = BaseEquipment.eplus_linear_curve_object(f"{coil_name} {curve_title}Curve", params)
+            curve_key = (curve.object_type, *params)
+            if curve_key in self._curve_names:
+                self.num_shared_curves += 1
+            else:
+                curve = BaseEquipment.eplus_linear_curve_object(self._unique_name(curve.name), params)
+                self._curve_names[curve_key] = curve.name
+                self._write_object(curve)
+                self.num_curves += 1
+            curve_names[output.name] = self._curve_names[curve_key]
+        self._write_object(equipment.eplus_coil_object(coil_name, curve_names, coil_name))
+        self.num_coils += 1
+        return coil_name
+
+    def close(self) -> None:
+        """
+        Finishes the IDF file, and assembles the EpJSON file from the temporary object type groups.
+
+        :return: Nothing
+        """
+        if self._idf_file is not None:
+            self._idf_file.close()
+            self._idf_file = None
+        if self._epjson_path is not None:
+            with open(self._epjson_path, 'w') as epjson_file:
+                epjson_file.write('{')
+                for i, (object_type, group) in enumerate(self._epjson_groups.items()):
+                    epjson_file.write(f"{',' if i > 0 else ''}\n  {dumps(object_type)}: {{\n")
+                    group.seek(0)
+                    copyfileobj(group, epjson_file)
+                    epjson_file.write('\n  }')
+                    group.close()
+                epjson_file.write('\n}')
+            self._epjson_groups.clear()
+            self._epjson_path = None
+
+
+def bulk_export(
+        products: Iterable[Tuple[str, BaseEquipment]], idf_path: Optional[str] = None,
+        epjson_path: Optional[str] = None
+) -> BulkExporter:
+    """
+    Writes many fitted products into one IDF file and one EpJSON file, see ``BulkExporter``.
+
+    :param products: An iterable of (product name, fitted equipment instance) tuples, which can be a generator, so
+                     products never all need to be in memory at once
+    :param idf_path: The IDF file path to write, or None to skip the IDF output
+    :param epjson_path: The EpJSON file path to write, or None to skip the EpJSON output
+    :return: The closed BulkExporter instance, which has the coil and curve counts
+    """
+    with BulkExporter(idf_path, epjson_path) as exporter:
+        for product_name, equipment in products:
+            exporter.add(equipment, product_name)
+    return exporter
@@ -72,6 +72,42 @@ class CorrectionFactor:
         response += dumps(self.mod_correction_data_column_map, indent=2)
         return response
 
+    def to_dict(self) -> dict:
+        """Returns a JSON-compatible dictionary of this correction factor, which can be read back with from_dict"""
+        return {
+            'name': self.name,
+            'num_corrections': self.num_corrections,
+            'correction_type': self.correction_type.name,
+            'base_column_index': self.base_column_index,
+            'columns_to_modify': list(self._columns_to_modify),
+            'base_correction': list(self.base_correction),
+            'base_correction_db': list(self.base_correction_db),
+            'base_correction_wb': list(self.base_correction_wb),
+            'mod_correction_data_column_map': {str(k): list(v) for k, v in self.mod_correction_data_column_map.items()},
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> 'CorrectionFactor':
+        """
+        Creates a new correction factor from a dictionary, such as one returned from to_dict or read from a JSON file.
+        Only the name is required; any missing summary or detailed data keeps the constructor default.
+
+        :param data: A dictionary with the same keys as returned from to_dict
+        :return: A new CorrectionFactor instance
+        """
+        cf = CorrectionFactor(data['name'])
+        cf.num_corrections = int(data.get('num_corrections', cf.num_corrections))
+        cf.correction_type = CorrectionFactorType[data.get('correction_type', cf.correction_type.name)]
+        cf.base_column_index = int(data.get('base_column_index', cf.base_column_index))
+        cf.columns_to_modify = [int(c) for c in data.get('columns_to_modify', [])]
+        cf.base_correction = [float(v) for v in data.get('base_correction', [])]
+        cf.base_correction_db = [float(v) for v in data.get('base_correction_db', [])]
+        cf.base_correction_wb = [float(v) for v in data.get('base_correction_wb', [])]
+        # JSON object keys are always strings, but the columns are integer header indices
+        for k, v in data.get('mod_correction_data_column_map', {}).items():
+            cf.mod_correction_data_column_map[int(k)] = [float(x) for x in v]
+        return cf
+
     def check_ok(self, db_column: int, wb_column: int, summary_only: bool = False) -> bool:
         """
         Checks values of this correction factor and returns True or False to indicate success.
@@ -1,8 +1,16 @@
-from copy import deepcopy
 from enum import auto, Enum
-from typing import List
+from hashlib import sha256
+from json import dumps
+from typing import Callable, Iterator, List, Optional
+
+from numpy import asarray, ascontiguousarray, concatenate, empty, maximum, minimum, ndarray, repeat, tile
+from numpy.lib.format import open_memmap
 
 from energyplus_pet.correction_factor import CorrectionFactor, CorrectionFactorType
+from energyplus_pet.exceptions import EnergyPlusPetException
+from energyplus_pet.expanded_catalog import ExpandedCatalog
+from energyplus_pet.profiling import profiled
+from energyplus_pet.progress import CancellationToken, check_cancelled
 
 
 class CatalogDataManager:
@@ -11,6 +19,26 @@ class CatalogDataManager:
     the primary tabular data, plus any correction factors applied to the data.
     While the equipment definitions define the types of data, the data manager actually stores the data.
     The equipment instances read data from the catalog data manager when processing parameters.
+
+    Both the base data and the final data are stored as 2D float64 NumPy arrays, indexed as [data_point, column],
+    so each column can be accessed as a zero-copy view with ``column(header_index)``.  The ``final_data_matrix``
+    attribute is kept only as a list-of-lists compatibility accessor for existing callers, and copies every row.
+
+    The expanded data set is also available as a lazy ``ExpandedCatalog`` view, which computes rows and columns on
+    demand from the base data and correction factors.  When correction factors are applied with ``materialize=False``
+    the final data array is only built if it is actually requested, so very large catalogs can be checked, iterated
+    in chunks, and plotted by column without ever holding the full expanded product in memory.
+
+    When the data set is materialized, the intermediate result after each correction factor is kept, along with a
+    signature of the factor that produced it.  Applying the correction factors again only re-expands from the first
+    factor that was added, replaced, removed, or edited in place, so appending a factor costs a single expansion step.
+    Since each expansion multiplies the row count, the kept intermediate levels are at most as large as the final data.
+
+    For very large catalogs, set ``backing_file`` to a local ``.npy`` path before applying the correction factors.
+    The expanded data is then written to that file in chunks straight from the lazy view, and the final data set is a
+    read-only NumPy memmap of the file, so it never has to live in heap memory, and columns and chunks read from it
+    are zero-copy views of the mapped pages.  Other processes can share the same expanded data read-only by calling
+    ``attach_backing_file`` with that path.  Intermediate levels are not kept in this mode.
     """
 
     def __init__(self):
@@ -18,11 +46,110 @@ class CatalogDataManager:
         Create a new CatalogDataManager instance, initializing arrays and flags.
         """
         self._correction_factors: List[CorrectionFactor] = []
-        self._base_data: List[List[float]] = []  # inner arrays are column allocated: self.base_data[data_point][column]
+        self._base_data: ndarray = empty((0, 0))  # indexed as self._base_data[data_point, column]
         self.data_processed = False
-        self.final_data_matrix: List[List[float]] = []
+        self._final_data: ndarray = empty((0, 0))
+        self.expanded_catalog = ExpandedCatalog(self._base_data, [], 0, 0)
+        self._final_data_pending = False  # true when the final data should be materialized from the lazy view
+        # the materialized data after each factor, level 0 is the base data, and the signature of each applied factor
+        self._expansion_levels: List[ndarray] = []
+        self._expansion_signatures: List[str] = []
+        self.last_expansion_steps = 0  # the number of factors actually expanded by the last apply_correction_factors
+        self.backing_file: Optional[str] = None  # if set, a .npy file path to hold the final data as a memmap
+        self.backing_chunk_size = 65536  # the number of expanded rows written to the backing file at a time
         self.last_error_message = ""
 
+    @staticmethod
+    def _as_data_array(data) -> ndarray:
+        """Converts a list of data point rows, or an existing array, into a 2D float64 data array"""
+        array = asarray(data, dtype=float)
+        if array.size == 0 and array.ndim < 2:
+            return empty((0, 0))
+        if array.ndim != 2:
+            raise EnergyPlusPetException(f"Catalog data must be a 2D set of rows and columns, got shape {array.shape}")
+        return array
+
+    @property
+    def final_data(self) -> ndarray:
+        """Returns the final data set as a 2D float64 array, indexed as [data_point, column]"""
+        if self._final_data_pending:
+            self._final_data = self.expanded_catalog[:]
+            self._final_data_pending = False
+        return self._final_data
+
+    def materialize_final_data(
+            self, cancel_token: Optional[CancellationToken] = None,
+            cb_rows_done: Optional[Callable[[int], None]] = None, chunk_size: int = 65536
+    ) -> ndarray:
+        """
+        Returns the final data set like ``final_data``, but if it still has to be built from the lazy expanded catalog,
+        builds it one chunk of rows at a time, checking for cancellation and reporting progress between chunks.
+
+        :param cancel_token: An optional CancellationToken, checked before each chunk
+        :param cb_rows_done: An optional callback, called with the number of rows in each chunk as it is built, or
+                             once with every row if the final data set was already built
+        :param chunk_size: The number of rows to build at a time
+        :return: The final data as a 2D float64 array, indexed as [data_point, column]
+        """
+        if not self._final_data_pending:
+            if cb_rows_done is not None:
+                cb_rows_done(self._final_data.shape[0])
+            return self._final_data
+        final_data = empty(self.expanded_catalog.shape)
+        start = 0
+        for chunk in self.expanded_catalog.iter_chunks(chunk_size):
+            check_cancelled(cancel_token)
+            final_data[start:start + chunk.shape[0]] = chunk
+            start += chunk.shape[0]
+            if cb_rows_done is not None:
+                cb_rows_done(chunk.shape[0])
+        self._final_data = final_data
+        self._final_data_pending = False
+        return self._final_data
+
+    @property
+    def final_data_matrix(self) -> List[List[float]]:
+        """
+        Returns a copy of the final data set as a list of data point rows, only for callers that expect plain lists.
+        Every access converts the whole expanded data set, including a memory mapped one, to nested Python lists, so
+        use ``final_data``, ``column``, or ``iter_final_data_chunks`` instead wherever possible.
+        """
+        return self.final_data.tolist()
+
+    @final_data_matrix.setter
+    def final_data_matrix(self, data) -> None:
+        """Sets the final data set directly from a list of data point rows, or a 2D array"""
+        self._final_data = self._as_data_array(data)
+        self._final_data_pending = False
+        self.expanded_catalog = ExpandedCatalog(self._final_data, [], 0, 0)
+
+    def column(self, column_index: int) -> ndarray:
+        """
+        Returns a single column of the final data set.  If the final data set has been materialized, this is a view
+        into it without copying, otherwise only this column is computed from the lazy expanded catalog.
+
+        :param column_index: The zero-based header column index
+        :return: A 1D array of column values
+        """
+        if self._final_data_pending:
+            return self.expanded_catalog.column(column_index)
+        return self._final_data[:, column_index]
+
+    def iter_final_data_chunks(self, chunk_size: int = 65536) -> Iterator[ndarray]:
+        """
+        Iterates over the final data set in fixed size chunks of rows.  If the final data set has been materialized
+        the chunks are views into it, otherwise each chunk is computed from the lazy expanded catalog, so only one
+        chunk of the expanded data is ever in memory.
+
+        :param chunk_size: The maximum number of rows in each chunk; the last chunk may be smaller
+        :return: An iterator of 2D arrays, indexed as [data_point, column]
+        """
+        if self._final_data_pending:
+            yield from self.expanded_catalog.iter_chunks(chunk_size)
+            return
+        for start in range(0, self._final_data.shape[0], chunk_size):
+            yield self._final_data[start:start + chunk_size]
+
     def add_correction_factor(self, cf: CorrectionFactor) -> None:
         """
         Add a completed correction factor, with summary data and detailed data.
@@ -32,6 +159,39 @@ class CatalogDataManager:
         """
         self._correction_factors.append(cf)
 
+    def replace_correction_factor(self, index: int, cf: CorrectionFactor) -> None:
+        """
+        Replace one correction factor, so the next apply only re-expands from this factor onward.
+
+        :param index: The zero-based position of the factor to replace, in application order
+        :param cf: The new, fully defined correction factor
+        :return: None
+        """
+        if not 0 <= index < len(self._correction_factors):
+            raise EnergyPlusPetException(f"No correction factor at index {index} to replace")
+        self._correction_factors[index] = cf
+
+    def remove_correction_factor(self, index: int) -> None:
+        """
+        Remove one correction factor, so the next apply only re-expands from this position onward.
+
+        :param index: The zero-based position of the factor to remove, in application order
+        :return: None
+        """
+        if not 0 <= index < len(self._correction_factors):
+            raise EnergyPlusPetException(f"No correction factor at index {index} to remove")
+        del self._correction_factors[index]
+
+    @property
+    def base_data(self) -> ndarray:
+        """Returns the base data set as a 2D float64 array, indexed as [data_point, column]"""
+        return self._base_data
+
+    @property
+    def correction_factors(self) -> List[CorrectionFactor]:
+        """Returns a copy of the list of correction factors, in application order"""
+        return list(self._correction_factors)
+
     # TODO: I think a nicer interface here would be add_base_data_column(column_id), and each equip defines column ids
     def add_base_data(self, data: List[List[float]]) -> None:
         """
@@ -41,62 +201,224 @@ class CatalogDataManager:
         Right now this function does not do any checks on the data because the tabular forms are supposed to handle
         all of that, and the apply_correction_factors function does a bunch of checking as well.
 
-        :param data: Catalog base data set in proper units
+        :param data: Catalog base data set in proper units, as a list of rows or a 2D array
         :return: None
         """
-        self._base_data = data
+        self._base_data = self._as_data_array(data)
+        self._clear_expansion_levels()
+
+    def _clear_expansion_levels(self) -> None:
+        """Drops every kept intermediate expansion, so the next apply rebuilds from the base data"""
+        self._expansion_levels = []
+        self._expansion_signatures = []
+
+    @staticmethod
+    def _expansion_signature(cf: CorrectionFactor, db_column: int, wb_column: int) -> str:
+        """Returns a string that is equal for two factors only if they expand the data identically"""
+        return dumps([db_column, wb_column, cf.to_dict()], sort_keys=True)
+
+    def _expand_incrementally(
+            self, db_column: int, wb_column: int, cancel_token: Optional[CancellationToken] = None
+    ) -> ndarray:
+        """
+        Materializes the final data set, reusing the kept intermediate expansions up to the first changed factor.
+
+        :param db_column: The zero-based dry-bulb column index, used for CombinedDbWb correction factors
+        :param wb_column: The zero-based wet-bulb column index, used for CombinedDbWb correction factors
+        :param cancel_token: An optional CancellationToken, checked before expanding by each factor
+        :return: The final data array, which is also the last kept level
+        """
+        signatures = [self._expansion_signature(cf, db_column, wb_column) for cf in self._correction_factors]
+        if not self._expansion_levels:
+            # copy so the base data is never modified through the levels, and this can safely be called again
+            self._expansion_levels = [self._base_data.copy()]
+            self._expansion_signatures = []
+        num_reusable = 0
+        for kept, current in zip(self._expansion_signatures, signatures):
+            if kept != current:
+                break
+            num_reusable += 1
+        del self._expansion_levels[num_reusable + 1:]
+        del self._expansion_signatures[num_reusable:]
+        for cf, signature in zip(self._correction_factors[num_reusable:], signatures[num_reusable:]):
+            check_cancelled(cancel_token)  # the levels kept so far stay valid, so a cancelled expansion can resume
+            self._expansion_levels.append(
+                self.expand_by_correction_factor(self._expansion_levels[-1], cf, db_column, wb_column)
+            )
+            self._expansion_signatures.append(signature)
+        self.last_expansion_steps = len(signatures) - num_reusable
+        return self._expansion_levels[-1]
+
+    def _write_backing_file(self, cancel_token: Optional[CancellationToken] = None) -> List[int]:
+        """
+        Writes the expanded data set to the backing file one chunk at a time, then maps the file read-only as the final
+        data set.  The column ranges are accumulated while writing, so the data diversity check needs no extra pass.
+
+        :param cancel_token: An optional CancellationToken, checked before writing each chunk
+        :return: A list of zero-based column indices that are constant over the whole expanded data set
+        """
+        self._final_data = empty((0, 0))  # release any previous mapping of the file before overwriting it
+        num_rows, num_columns = self.expanded_catalog.shape
+        output = open_memmap(self.backing_file, mode='w+', dtype='float64', shape=(num_rows, num_columns))
+        column_minimums = column_maximums = None
+        start = 0
+        for chunk in self.expanded_catalog.iter_chunks(self.backing_chunk_size):
+            check_cancelled(cancel_token)
+            output[start:start + chunk.shape[0]] = chunk
+            start += chunk.shape[0]
+            if column_minimums is None:
+                column_minimums, column_maximums = chunk.min(axis=0), chunk.max(axis=0)
+            else:
+                column_minimums = minimum(column_minimums, chunk.min(axis=0))
+                column_maximums = maximum(column_maximums, chunk.max(axis=0))
+        output.flush()
+        del output
+        self._final_data = open_memmap(self.backing_file, mode='r')
+        if column_minimums is None:
+            return []
+        return [int(c) for c in (column_minimums == column_maximums).nonzero()[0]]
+
+    def attach_backing_file(self, backing_file: str) -> None:
+        """
+        Uses an existing backing file, written by another data manager's ``apply_correction_factors``, as the final
+        data set, mapped read-only, so several worker processes can share one expanded data set without copying it.
+
+        :param backing_file: The path to the ``.npy`` file holding the expanded data set
+        :return: None
+        """
+        self._final_data = open_memmap(backing_file, mode='r')
+        if self._final_data.ndim != 2:
+            raise EnergyPlusPetException(f"Backing file {backing_file} does not hold a 2D catalog data set")
+        self.backing_file = backing_file
+        self._final_data_pending = False
+        self.expanded_catalog = ExpandedCatalog(self._final_data, [], 0, 0)
+        self._clear_expansion_levels()
+        self.data_processed = True
+
+    def content_digest(self) -> str:
+        """
+        Returns a stable SHA-256 hex digest of the base data and the correction factor definitions, which together
+        fully determine the final data set, so equal digests mean equal catalogs.
+        """
+        hasher = sha256()
+        hasher.update(dumps(list(self._base_data.shape)).encode())
+        hasher.update(ascontiguousarray(self._base_data, dtype='<f8').tobytes())
+        hasher.update(dumps([cf.to_dict() for cf in self._correction_factors], sort_keys=True).encode())
+        return hasher.hexdigest()
 
     def summary(self) -> dict:
-        """Returns a string representation of the catalog data manager as it currently exists"""
+        """
+        Returns a JSON-compatible description of the catalog data manager as it currently exists.  The expanded data
+        set can be huge, so it is described by its shape and a SHA-256 digest of its values, read one chunk at a time,
+        rather than listed row by row.
+        """
+        hasher = sha256()
+        for chunk in self.iter_final_data_chunks():
+            hasher.update(ascontiguousarray(chunk, dtype='<f8').tobytes())
+        num_rows, num_columns = self.expanded_catalog.shape if self._final_data_pending else self._final_data.shape
         return {
-            'base_data_in_rows': self._base_data,
+            'base_data_in_rows': self._base_data.tolist(),
             'correction_factors': [cf.describe() for cf in self._correction_factors],
-            'final_data_rows': self.final_data_matrix
+            'final_data_shape': [int(num_rows), int(num_columns)],
+            'final_data_digest': hasher.hexdigest(),
         }
 
+    @staticmethod
+    @profiled('expand_by_correction_factor')
+    def expand_by_correction_factor(data: ndarray, cf: CorrectionFactor, db_column: int, wb_column: int) -> ndarray:
+        """
+        Expands a data set by a single correction factor.  The original rows are kept first, followed by one full
+        corrected copy of the data set for each row of the correction factor, in correction factor row order.
+        Rather than looping over rows, the data set is tiled once, and then each correction is applied to a whole
+        column at a time by broadcasting the correction factor values, repeated once per original data row.
+
+        :param data: A 2D data array, indexed as [data_point, column]
+        :param cf: A fully defined correction factor
+        :param db_column: The zero-based dry-bulb column index, used for CombinedDbWb correction factors
+        :param wb_column: The zero-based wet-bulb column index, used for CombinedDbWb correction factors
+        :return: A new 2D data array with (1 + cf.num_corrections) times as many rows as the original
+        """
+        if cf.num_corrections < 1:
+            return data
+        num_rows = data.shape[0]
+
+        def per_row(cf_values: List[float]) -> ndarray:
+            return repeat(asarray(cf_values[:cf.num_corrections], dtype=float), num_rows)
+
+        corrected = tile(data, (cf.num_corrections, 1))
+        if cf.correction_type == CorrectionFactorType.Multiplier:
+            corrected[:, cf.base_column_index] *= per_row(cf.base_correction)
+        elif cf.correction_type == CorrectionFactorType.Replacement:
+            corrected[:, cf.base_column_index] = per_row(cf.base_correction)
+        elif cf.correction_type == CorrectionFactorType.CombinedDbWb:
+            corrected[:, db_column] = per_row(cf.base_correction_db)
+            corrected[:, wb_column] = per_row(cf.base_correction_wb)
+        for column_to_modify in cf.columns_to_modify:
+            corrected[:, column_to_modify] *= per_row(cf.mod_correction_data_column_map[column_to_modify])
+        return concatenate((data, corrected))
+
     class ProcessResult(Enum):
         OK = auto()
         ERROR = auto()
 
-    def apply_correction_factors(self, minimum_data_points: int, db_column: int, wb_column: int) -> ProcessResult:
+    @profiled('apply_correction_factors')
+    def apply_correction_factors(
+            self, minimum_data_points: int, db_column: int, wb_column: int, materialize: bool = True,
+            cancel_token: Optional[CancellationToken] = None
+    ) -> ProcessResult:
         """
         Process the base data and correction factors to create one large full dataset.
         Validates the data against a series of tests for data diversity and infinite/out-of-range.
 
+        :param minimum_data_points: The minimum number of expanded rows required by the equipment
+        :param db_column: The zero-based dry-bulb column index, used for CombinedDbWb correction factors
+        :param wb_column: The zero-based wet-bulb column index, used for CombinedDbWb correction factors
+        :param materialize: If True, the full expanded data set is built immediately, in memory, or in the
+                            ``backing_file`` if one is set.  If False, only the lazy ``expanded_catalog`` view is
+                            created and validated chunk by chunk, and the full data set is built later only if
+                            ``final_data`` is requested.
+        :param cancel_token: An optional CancellationToken, checked between expansion steps, which raises
+                             OperationCancelled if cancelled, rather than returning a ProcessResult
         :return: A ProcessResult enum instance for the success of the process.  If ERROR, then there is a
-                 ``last_error_message`` member variable with an explanation of what went wrong.
+                 ``last_error_message`` member variable with an explanation of what went wrong, and
+                 ``data_processed`` is only set when the result is OK.
         """
-        self.data_processed = True
-        self.final_data_matrix = self._base_data
-        for cf in self._correction_factors:
-            updated_data_matrix = deepcopy(self.final_data_matrix)  # deep is required for complex lists of lists
-            for cf_row in range(cf.num_corrections):  # each row of the cf data implies a new copy of the data set
-                for row in updated_data_matrix:
-                    new_row = list(row)  # list provides a deep copy of a simple list
-                    if cf.correction_type == CorrectionFactorType.Multiplier:
-                        new_row[cf.base_column_index] *= cf.base_correction[cf_row]
-                    elif cf.correction_type == CorrectionFactorType.Replacement:
-                        new_row[cf.base_column_index] = cf.base_correction[cf_row]
-                    elif cf.correction_type == CorrectionFactorType.CombinedDbWb:
-                        new_row[db_column] = cf.base_correction_db[cf_row]
-                        new_row[wb_column] = cf.base_correction_wb[cf_row]
-                    for column_to_modify in cf.columns_to_modify:
-                        new_row[column_to_modify] *= cf.mod_correction_data_column_map[column_to_modify][cf_row]
-                    self.final_data_matrix.append(new_row)
-        if len(self.final_data_matrix) < minimum_data_points:
-            self.last_error_message = f"Full catalog data set too small. \nData includes {len(self.final_data_matrix)} "
+        self.data_processed = False
+        self.expanded_catalog = ExpandedCatalog(self._base_data, self._correction_factors, db_column, wb_column)
+        backed_constant_columns = None
+        if materialize and self.backing_file is not None:
+            self._clear_expansion_levels()
+            backed_constant_columns = self._write_backing_file(cancel_token)
+            self._final_data_pending = False
+            self.last_expansion_steps = len(self._correction_factors)
+        elif materialize:
+            self._final_data = self._expand_incrementally(db_column, wb_column, cancel_token)
+            self._final_data_pending = False
+        else:
+            self._final_data = empty((0, 0))
+            self._final_data_pending = True
+            self.last_expansion_steps = 0
+        num_rows = len(self.expanded_catalog)
+        if num_rows < minimum_data_points:
+            self.last_error_message = f"Full catalog data set too small. \nData includes {num_rows} "
             self.last_error_message += f"rows, but this equipment requires at least {minimum_data_points}."
             return CatalogDataManager.ProcessResult.ERROR
         else:
-            if len(self.final_data_matrix) == 0:
+            if num_rows == 0:
                 self.last_error_message = "Catalog data appears empty!  Abort!"
                 return CatalogDataManager.ProcessResult.ERROR
-            for column_index in range(len(self.final_data_matrix[0])):
-                this_column_data = [row[column_index] for row in self.final_data_matrix]
-                if len(set(this_column_data)) == 1:
-                    self.last_error_message = f"Problem with data, column #{column_index} (zero-based) is constant "
-                    self.last_error_message += "after factors have been applied.  Each column should contain variation!"
-                    return CatalogDataManager.ProcessResult.ERROR
+            if backed_constant_columns is not None:
+                constant_columns = backed_constant_columns
+            elif materialize:
+                constant_columns = (self._final_data == self._final_data[0]).all(axis=0).nonzero()[0].tolist()
+            else:
+                constant_columns = self.expanded_catalog.constant_columns()
+            if len(constant_columns) > 0:
+                column_index = constant_columns[0]
+                self.last_error_message = f"Problem with data, column #{column_index} (zero-based) is constant "
+                self.last_error_message += "after factors have been applied.  Each column should contain variation!"
+                return CatalogDataManager.ProcessResult.ERROR
+        self.data_processed = True
         return CatalogDataManager.ProcessResult.OK
 
     def reset(self) -> None:
@@ -107,6 +429,10 @@ class CatalogDataManager:
         """
         self._correction_factors.clear()
         self.data_processed = False
-        self._base_data = []
-        self.final_data_matrix: List[List[float]] = []
+        self._base_data = empty((0, 0))
+        self._final_data = empty((0, 0))
+        self.expanded_catalog = ExpandedCatalog(self._base_data, [], 0, 0)
+        self._final_data_pending = False
+        self._clear_expansion_levels()
+        self.last_expansion_steps = 0
         self.last_error_message = ""
@@ -1,14 +1,44 @@
 from abc import abstractmethod
-from math import sqrt
-from typing import Callable, Dict, List, Tuple
-
-from scipy.optimize import curve_fit
-
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from json import dumps
+from math import ceil, sqrt
+from typing import Callable, Dict, List, Optional, Tuple
+
+from numpy import (
+    absolute, arange, array_split, asarray, column_stack, concatenate, divide, empty, full, isnan, nan, ndarray, ones,
+    percentile, sqrt as np_sqrt
+)
+from numpy.random import default_rng
+
+from energyplus_pet.equipment.common_curves import CommonCurves
 from energyplus_pet.equipment.equip_types import EquipType
 from energyplus_pet.equipment.column_header import ColumnHeaderArray
+from energyplus_pet.equipment.linear_fit import BootstrapLinearFit, LinearLeastSquares, NormalEquationAccumulator
+from energyplus_pet.exceptions import EnergyPlusPetException
+from energyplus_pet.profiling import profiled, span
+from energyplus_pet.progress import CancellationToken, check_cancelled, ProgressTracker
 from energyplus_pet.units import UnitType
 
 
+# IDF field values are padded out to this width so the field name comments line up, with at least two spaces
+_IDF_PREFERRED_SPACES = 16
+_IDF_PADDING = [' ' * max(2, _IDF_PREFERRED_SPACES - n) for n in range(_IDF_PREFERRED_SPACES)]
+
+
+@lru_cache(maxsize=1024)
+def _idf_object_template(object_name: str, field_names: Tuple[str, ...]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    """
+    Builds the value independent parts of an IDF object, which are the same every time an object type is written.
+
+    :param object_name: An IDF object name
+    :param field_names: The field names, in order
+    :return: A tuple of the object header line, and a (separator, comment) tuple for each field
+    """
+    last_index = len(field_names) - 1
+    return f"{object_name},\n", tuple((';' if i == last_index else ',', f"!-{n}\n") for i, n in enumerate(field_names))
+
+
 class BaseEquipment:
     """
     This class represents an abstract piece of equipment to be processed by this library.
@@ -119,6 +149,106 @@ class BaseEquipment:
         """
         pass
 
+    class EplusObject:
+        """A minimal class for one EnergyPlus input object, with the fields for both the IDF and EpJSON outputs"""
+        def __init__(self, object_type: str, name: str, idf_fields: List[Tuple], epjson_fields: Dict):
+            """
+            Constructor for the instance
+
+            :param object_type: The EnergyPlus object type, such as ``Curve:QuadLinear``
+            :param name: The object name
+            :param idf_fields: A list of (field name, field value) tuples, including the name, for
+                               ``fill_eplus_object_format``
+            :param epjson_fields: A dictionary of the EpJSON object fields, not including the name, which is the key
+            """
+            self.object_type = object_type
+            self.name = name
+            self.idf_fields = idf_fields
+            self.epjson_fields = epjson_fields
+
+    @abstractmethod
+    def eplus_coil_object(
+            self, coil_name: str, curve_names: Dict[str, str], node_prefix: str = 'Your Coil', companion_name: str = ''
+    ) -> EplusObject:  # pragma: no cover
+        """
+        Must be overridden to return the main EnergyPlus object for this type of equipment, with the given names, so
+        that many products can be written into one model with ``BulkExporter``.
+
+        :param coil_name: The name of the coil or heat pump object
+        :param curve_names: The names of the performance curve objects, keyed by the CurveFitOutput name
+        :param node_prefix: The prefix of the inlet and outlet node names
+        :param companion_name: The companion heat pump name, for equipment that has one
+        :return: An EplusObject instance
+        """
+        pass
+
+    @staticmethod
+    def eplus_linear_curve_object(curve_name: str, params: List[float]) -> EplusObject:
+        """
+        Builds the EnergyPlus curve object for the generated parameters of one of the linear ``CommonCurves``, which is
+        a ``Curve:QuadLinear`` for four independent variables, or a ``Curve:QuintLinear`` for five.
+
+        :param curve_name: The curve object name
+        :param params: The generated coefficients, with the constant coefficient first
+        :return: An EplusObject instance
+        """
+        variables = {5: 'wxyz', 6: 'vwxyz'}.get(len(params))
+        if variables is None:
+            raise EnergyPlusPetException(f"No linear curve object has {len(params)} coefficients")
+        limits_idf = []
+        limits_epjson = {}
+        for v in variables:
+            limits_idf.extend([(f"Minimum Value of {v}", -100), (f"Maximum Value of {v}", 100)])
+            limits_epjson.update({f"minimum_value_of_{v}": -100, f"maximum_value_of_{v}": 100})
+        coefficient_keys = ['coefficient1_constant'] + [f"coefficient{i + 2}_{v}" for i, v in enumerate(variables)]
+        return BaseEquipment.EplusObject(
+            'Curve:QuadLinear' if len(params) == 5 else 'Curve:QuintLinear',
+            curve_name,
+            [("Name", curve_name), *[(f"Coefficient{i}", p) for i, p in enumerate(params)], *limits_idf],
+            {**dict(zip(coefficient_keys, params)), **limits_epjson}
+        )
+
+    def eplus_curve_objects(self, curve_names: Dict[str, str]) -> List[EplusObject]:
+        """
+        Builds the curve objects for the generated parameters of every curve fit output with
+        ``eplus_linear_curve_object``, so the single product outputs match the ``BulkExporter`` curves exactly.
+
+        :param curve_names: The curve object names, keyed by the CurveFitOutput name
+        :return: A list of EplusObject instances, in the ``curve_fit_outputs`` order
+        """
+        return [
+            BaseEquipment.eplus_linear_curve_object(
+                curve_names[output.name], [float(p) for p in getattr(self, f"{output.name}_params")]
+            )
+            for output in self.curve_fit_outputs()
+        ]
+
+    @staticmethod
+    def eplus_objects_idf(eplus_objects: List[EplusObject]) -> str:
+        """
+        Builds a standalone IDF snippet from a list of objects, preceded by the version object
+
+        :param eplus_objects: The EplusObject instances, in output order
+        :return: String IDF representation
+        """
+        return '\n'.join([
+            BaseEquipment.current_eplus_version_object_idf(),
+            *[BaseEquipment.fill_eplus_object_format(o.object_type, o.idf_fields) for o in eplus_objects]
+        ])
+
+    @staticmethod
+    def eplus_objects_epjson(eplus_objects: List[EplusObject]) -> str:
+        """
+        Builds a standalone EpJSON document from a list of objects, with the version object, grouped by object type
+
+        :param eplus_objects: The EplusObject instances, in output order
+        :return: String EpJSON representation
+        """
+        epjson_object = BaseEquipment.current_eplus_version_object_epjson()
+        for o in eplus_objects:
+            epjson_object.setdefault(o.object_type, {})[o.name] = o.epjson_fields
+        return dumps(epjson_object, indent=2)
+
     @abstractmethod
     def get_number_of_progress_steps(self) -> int:  # pragma: no cover
         """
@@ -139,24 +269,439 @@ class BaseEquipment:
         """
         pass
 
+    class CurveFitOutput:
+        """A minimal class for describing one dependent variable that is generated from a curve fit"""
+        def __init__(
+                self, name: str, catalog_column: int, rated_value: float, eval_function: Callable,
+                independent_variable_set: str
+        ):
+            """
+            Constructor for the instance
+
+            :param name: The attribute name stem for this output on the equipment instance; the results are stored on
+                         the instance as ``catalog_<name>``, ``<name>_params``, ``<name>_avg_err``,
+                         ``predicted_<name>``, and ``percent_error_<name>``
+            :param catalog_column: The zero-based catalog data column holding the raw values of this output
+            :param rated_value: The rated value used to scale this output before curve fitting, in calculation units
+            :param eval_function: The curve evaluation function for this output, such as one from CommonCurves
+            :param independent_variable_set: The key of the independent variable matrix this output is fit against,
+                                             from the dictionary returned by ``scaled_independent_variables``
+            """
+            self.name = name
+            self.catalog_column = catalog_column
+            self.rated_value = rated_value
+            self.eval_function = eval_function
+            self.independent_variable_set = independent_variable_set
+
     @abstractmethod
+    def curve_fit_outputs(self) -> List[CurveFitOutput]:  # pragma: no cover
+        """
+        Must be overridden to return the set of dependent variables that are curve fit for this type of equipment.
+        This is called at generation time, so the rated values should be read from the current constant parameters.
+
+        :return: List of CurveFitOutput instances, in the order they should be reported
+        """
+        pass
+
+    @abstractmethod
+    def scaled_independent_variables(self, data: ndarray) -> Dict[str, ndarray]:  # pragma: no cover
+        """
+        Must be overridden to scale the raw catalog data into the independent variables used by the curve fits.
+
+        :param data: A 2D array of catalog data in calculation units, with one row per data point and one column per
+                     header column
+        :return: Dictionary of 2D arrays, with one row per data point and one column per independent variable, keyed
+                 by the ``independent_variable_set`` string used in ``curve_fit_outputs``
+        """
+        pass
+
+    class ChunkErrorStatistics:
+        """A minimal class for summarizing the prediction error of one output over one chunk of streamed data points"""
+        def __init__(self, start_row: int, num_rows: int, percent_errors: ndarray, residuals: ndarray):
+            """
+            Constructor for the instance, reducing the chunk arrays down to a few scalars so they can be discarded
+
+            :param start_row: The zero-based final data row index of the first row in this chunk
+            :param num_rows: The number of data rows in this chunk
+            :param percent_errors: The percent error at each point in the chunk, NaN where the catalog value is zero
+            :param residuals: The raw predicted minus catalog value at each point in the chunk
+            """
+            self.start_row = start_row
+            self.num_rows = num_rows
+            valid_errors = absolute(percent_errors[~isnan(percent_errors)])
+            self.mean_abs_percent_error = float(valid_errors.mean()) if valid_errors.size > 0 else nan
+            self.max_abs_percent_error = float(valid_errors.max()) if valid_errors.size > 0 else nan
+            self.rms_residual = float(np_sqrt((residuals ** 2).mean())) if num_rows > 0 else nan
+
     def generate_parameters(
-            self, data_manager, cb_progress_increment: Callable, cb_progress_done: Callable
-    ):  # pragma: no cover
+            self, data_manager, cb_progress_increment: Callable, cb_progress_done: Callable,
+            chunk_size: Optional[int] = None, cancel_token: Optional[CancellationToken] = None,
+            cb_progress_fraction: Optional[Callable[[float], None]] = None
+    ):
         """
-        Must be overridden to do the actual processing of parameters.  Most of these will follow a similar pattern of
-        taking the generic catalog data manager's final data set, creating meaningful data arrays in this equipment
-        instance, using SciPy to perform curve fitting, and finally calculating predicted model outputs from the
-        generated coefficients.
+        Does the actual processing of parameters.  This takes the catalog data manager's final data set, stores the
+        catalog arrays for each output on this instance, fits each output, and finally calculates predicted model
+        outputs from the generated coefficients.  The catalog-to-curve details come from the ``curve_fit_outputs`` and
+        ``scaled_independent_variables`` functions, so most equipment will not need to override this.
+
+        Outputs that share both a curve function and an independent variable set are fit together in one call to
+        ``do_curve_fits``, which factors the shared design matrix a single time for all of them.
+
+        If a chunk size is given, the data is instead streamed through ``generate_parameters_streaming``, which keeps
+        memory bounded no matter how large the expanded catalog is.
+
+        The cancellation token is checked between each chunk of rows while building the final data set, and before
+        each curve fit, and raises OperationCancelled once cancelled; the progress done callback is not called then.
+        The fraction progress callback counts each data row read, fit, and evaluated for each output as equal work.
 
         :param data_manager: A fully filled out catalog data manager instance
         :param cb_progress_increment: A callback function to alert the calling form/thread to increment progress.
-                                      This callback should not take any extra arguments.
+                                      This callback should not take any extra arguments.  It is called once after
+                                      reading the data, then once for each curve fit output.
         :param cb_progress_done: A callback function to alert the calling form/thread that the process is complete.
                                  This callback should accept a boolean success flag and a string error message as args.
+        :param chunk_size: If given, the maximum number of data rows to hold in memory at once while streaming
+        :param cancel_token: An optional CancellationToken to stop the process part way through
+        :param cb_progress_fraction: An optional callback taking the fraction of the process done, from 0 to 1
         :return: Nothing
         """
-        pass
+        if chunk_size is not None:
+            self.generate_parameters_streaming(
+                data_manager, cb_progress_increment, cb_progress_done, chunk_size, cancel_token, cb_progress_fraction
+            )
+            return
+        outputs = self.curve_fit_outputs()
+        num_rows = len(data_manager.expanded_catalog)
+        progress = ProgressTracker(num_rows * (1 + 2 * len(outputs)), cb_progress_fraction)
+        with span('read_catalog_data'):
+            data = data_manager.materialize_final_data(cancel_token, progress.advance)
+            independent_variables = self.scaled_independent_variables(data)
+            for output in outputs:
+                setattr(self, f"catalog_{output.name}", data[:, output.catalog_column])
+        cb_progress_increment()
+
+        fit_groups: Dict[Tuple[str, Callable], List[BaseEquipment.CurveFitOutput]] = {}
+        for output in outputs:
+            fit_groups.setdefault((output.independent_variable_set, output.eval_function), []).append(output)
+        for (variable_set, eval_function), group in fit_groups.items():
+            check_cancelled(cancel_token)
+            fit_responses = self.do_curve_fits(
+                eval_function,
+                independent_variables[variable_set],
+                [data[:, output.catalog_column] / output.rated_value for output in group]
+            )
+            for output, (params, avg_err) in zip(group, fit_responses):
+                setattr(self, f"{output.name}_params", params)
+                setattr(self, f"{output.name}_avg_err", avg_err)
+                progress.advance(num_rows)
+                cb_progress_increment()
+
+        # now just recalculate the values at each catalog data point
+        check_cancelled(cancel_token)
+        self.evaluate_generated_parameters(data, independent_variables)
+        progress.advance(num_rows * len(outputs))
+        cb_progress_done(True)
+
+    @profiled('evaluate_generated_parameters')
+    def evaluate_generated_parameters(self, data: ndarray, independent_variables: Dict[str, ndarray] = None) -> None:
+        """
+        Evaluates the already generated curves at every catalog data point, storing the ``catalog_<name>``,
+        ``predicted_<name>``, and ``percent_error_<name>`` arrays on this instance.  This is the last step of
+        ``generate_parameters``, and is also used to rebuild those arrays when the parameters are restored from a
+        saved session, without fitting again.
+
+        :param data: A 2D array of catalog data in calculation units, indexed as [data_point, column]
+        :param independent_variables: The result of ``scaled_independent_variables(data)``, if already calculated
+        :return: Nothing
+        """
+        if independent_variables is None:
+            independent_variables = self.scaled_independent_variables(data)
+        for output in self.curve_fit_outputs():
+            setattr(self, f"catalog_{output.name}", data[:, output.catalog_column])
+            predicted, percent_error = self.eval_output_at_points(
+                output, independent_variables[output.independent_variable_set], data[:, output.catalog_column]
+            )
+            setattr(self, f"predicted_{output.name}", predicted)
+            setattr(self, f"percent_error_{output.name}", percent_error)
+
+    def generate_parameters_streaming(
+            self, data_manager, cb_progress_increment: Callable, cb_progress_done: Callable, chunk_size: int = 65536,
+            cancel_token: Optional[CancellationToken] = None,
+            cb_progress_fraction: Optional[Callable[[float], None]] = None, max_plot_points: int = 10000
+    ):
+        """
+        Processes parameters with bounded memory, by streaming the final data set from the catalog data manager in
+        chunks of rows.  This makes two passes over the data.  The first pass adds each chunk to a
+        ``NormalEquationAccumulator`` for each group of outputs sharing a curve function and independent variables,
+        which are then solved for the coefficients and one-sigma error.  The second pass evaluates the generated
+        curves chunk by chunk, reducing each chunk to a ``ChunkErrorStatistics`` instance.
+
+        The full per-point catalog, predicted, and percent error arrays are not kept, since they are as large as the
+        data set itself.  Instead, each output gets a ``<name>_chunk_errors`` list of chunk statistics, and a
+        ``<name>_residual_rms`` scalar over the whole data set, and the point arrays only hold an evenly strided sample
+        of at most ``max_plot_points`` rows, so ``get_absolute_plot_data`` and ``get_error_plot_data`` still plot a
+        representative picture of the fit rather than nothing.  Only the linear ``CommonCurves`` can be accumulated
+        this way, so any other curve function raises an exception.
+
+        :param data_manager: A fully filled out catalog data manager instance, which can be lazily expanded
+        :param cb_progress_increment: A callback function with the same progress steps as ``generate_parameters``
+        :param cb_progress_done: A callback function to alert the calling form/thread that the process is complete
+        :param chunk_size: The maximum number of data rows to hold in memory at once
+        :param cancel_token: An optional CancellationToken, checked before each chunk of each pass
+        :param cb_progress_fraction: An optional callback taking the fraction of the process done, counting each row
+                                     of each pass as equal work
+        :param max_plot_points: The maximum number of rows kept in the catalog, predicted, and percent error arrays
+        :return: Nothing
+        """
+        outputs = self.curve_fit_outputs()
+        num_rows = len(data_manager.expanded_catalog)
+        progress = ProgressTracker(2 * num_rows, cb_progress_fraction)
+        fit_groups: Dict[Tuple[str, Callable], List[BaseEquipment.CurveFitOutput]] = {}
+        for output in outputs:
+            if output.eval_function not in CommonCurves.linear_curves():
+                raise EnergyPlusPetException(
+                    f"Output {output.name} does not use a linear curve, so it can't be fit by streaming data chunks"
+                )
+            fit_groups.setdefault((output.independent_variable_set, output.eval_function), []).append(output)
+
+        accumulators: Dict[Tuple[str, Callable], NormalEquationAccumulator] = {}
+        with span('accumulate_data_chunks'):
+            for chunk in data_manager.iter_final_data_chunks(chunk_size):
+                check_cancelled(cancel_token)
+                independent_variables = self.scaled_independent_variables(chunk)
+                for (variable_set, eval_function), group in fit_groups.items():
+                    design_matrix = CommonCurves.linear_design_matrix(independent_variables[variable_set])
+                    if (variable_set, eval_function) not in accumulators:
+                        accumulators[(variable_set, eval_function)] = NormalEquationAccumulator(
+                            design_matrix.shape[1], len(group)
+                        )
+                    accumulators[(variable_set, eval_function)].add(
+                        design_matrix,
+                        column_stack([chunk[:, output.catalog_column] / output.rated_value for output in group])
+                    )
+                progress.advance(chunk.shape[0])
+        if not accumulators:
+            raise EnergyPlusPetException("Catalog data appears empty, no chunks were available to fit")
+        cb_progress_increment()
+
+        for key, group in fit_groups.items():
+            accumulator = accumulators[key]
+            coefficients, average_errs = accumulator.solve()
+            num_points = max(accumulator.num_points, 1)
+            residual_rms = np_sqrt(accumulator.residual_sum_of_squares(coefficients) / num_points)
+            for i, output in enumerate(group):
+                setattr(self, f"{output.name}_params", coefficients[:, i].tolist())
+                setattr(self, f"{output.name}_avg_err", float(average_errs[i]))
+                # the accumulated residuals are in scaled units, so scale them back to raw catalog units
+                setattr(self, f"{output.name}_residual_rms", float(residual_rms[i]) * output.rated_value)
+                cb_progress_increment()
+
+        chunk_errors: Dict[str, List[BaseEquipment.ChunkErrorStatistics]] = {output.name: [] for output in outputs}
+        # every plot_stride-th row is kept for plotting, as (catalog, predicted, percent error) lists of chunk samples
+        plot_stride = max(1, ceil(num_rows / max(max_plot_points, 1)))
+        plot_samples: Dict[str, Tuple[List[ndarray], ...]] = {output.name: ([], [], []) for output in outputs}
+        start_row = 0
+        with span('evaluate_data_chunks'):
+            for chunk in data_manager.iter_final_data_chunks(chunk_size):
+                check_cancelled(cancel_token)
+                independent_variables = self.scaled_independent_variables(chunk)
+                sample_rows = arange((-start_row) % plot_stride, chunk.shape[0], plot_stride)
+                for output in outputs:
+                    catalog_values = chunk[:, output.catalog_column]
+                    predicted, percent_error = self.eval_output_at_points(
+                        output, independent_variables[output.independent_variable_set], catalog_values
+                    )
+                    for samples, values in zip(plot_samples[output.name], (catalog_values, predicted, percent_error)):
+                        samples.append(values[sample_rows])
+                    chunk_errors[output.name].append(
+                        BaseEquipment.ChunkErrorStatistics(
+                            start_row, chunk.shape[0], percent_error, predicted - catalog_values
+                        )
+                    )
+                start_row += chunk.shape[0]
+                progress.advance(chunk.shape[0])
+        for output in outputs:
+            setattr(self, f"{output.name}_chunk_errors", chunk_errors[output.name])
+            for attribute_prefix, samples in zip(('catalog', 'predicted', 'percent_error'), plot_samples[output.name]):
+                setattr(self, f"{attribute_prefix}_{output.name}", concatenate(samples) if samples else empty(0))
+        cb_progress_done(True)
+
+    class BootstrapResult:
+        """A minimal class for the bootstrap confidence intervals of the coefficients and predictions of one output"""
+        def __init__(
+                self, confidence: float, coefficient_samples: ndarray, prediction_lower: ndarray,
+                prediction_upper: ndarray
+        ):
+            """
+            Constructor for the instance
+
+            :param confidence: The confidence level of the intervals, such as 0.95
+            :param coefficient_samples: A (num_resamples, num_coefficients) array of the coefficients of each resample
+            :param prediction_lower: The lower prediction band at each catalog data point, in raw catalog units
+            :param prediction_upper: The upper prediction band at each catalog data point, in raw catalog units
+            """
+            tail_percent = 50.0 * (1.0 - confidence)
+            self.confidence = confidence
+            self.num_resamples = coefficient_samples.shape[0]
+            self.coefficient_samples = coefficient_samples
+            self.params_lower = percentile(coefficient_samples, tail_percent, axis=0)
+            self.params_upper = percentile(coefficient_samples, 100.0 - tail_percent, axis=0)
+            self.params_std = coefficient_samples.std(axis=0, ddof=1) if self.num_resamples > 1 else full(
+                coefficient_samples.shape[1], nan
+            )
+            self.prediction_lower = prediction_lower
+            self.prediction_upper = prediction_upper
+
+    @profiled('bootstrap_confidence_intervals')
+    def bootstrap_confidence_intervals(
+            self, data_manager, num_resamples: int = 1000, confidence: float = 0.95, seed: Optional[int] = None,
+            max_block_elements: int = 20_000_000
+    ) -> Dict[str, BootstrapResult]:
+        """
+        Estimates how stable the generated coefficients are, by refitting every output to bootstrap resamples of the
+        catalog data points, and taking percentile confidence intervals of the resampled coefficients, and prediction
+        bands of the resampled curves at each catalog data point.  The resamples are all solved together by
+        ``BootstrapLinearFit``, so this is only available when every output uses one of the linear ``CommonCurves``.
+        This is opt-in analysis on top of ``generate_parameters``, and it does not change the generated parameters.
+
+        :param data_manager: A fully filled out catalog data manager instance
+        :param num_resamples: The number of bootstrap resamples
+        :param confidence: The confidence level of the intervals and bands, between zero and one
+        :param seed: An optional random seed, so the same seed always gives the same intervals
+        :param max_block_elements: Bounds the size of the temporary arrays, see ``BootstrapLinearFit``
+        :return: A dictionary of BootstrapResult instances, keyed by the output name
+        """
+        if not 0.0 < confidence < 1.0:
+            raise EnergyPlusPetException(f"Bootstrap confidence level must be between zero and one, got {confidence}")
+        data = data_manager.final_data
+        outputs = self.curve_fit_outputs()
+        independent_variables = self.scaled_independent_variables(data)
+        fit_groups: Dict[Tuple[str, Callable], List[BaseEquipment.CurveFitOutput]] = {}
+        for output in outputs:
+            if output.eval_function not in CommonCurves.linear_curves():
+                raise EnergyPlusPetException(
+                    f"Output {output.name} does not use a linear curve, so it can't be bootstrapped"
+                )
+            fit_groups.setdefault((output.independent_variable_set, output.eval_function), []).append(output)
+        tail_percent = 50.0 * (1.0 - confidence)
+        results: Dict[str, BaseEquipment.BootstrapResult] = {}
+        for (variable_set, _), group in fit_groups.items():
+            design_matrix = CommonCurves.linear_design_matrix(independent_variables[variable_set])
+            samples = BootstrapLinearFit(
+                design_matrix, column_stack([data[:, output.catalog_column] / output.rated_value for output in group])
+            ).resample_coefficients(num_resamples, seed, max_block_elements)
+            # the (points, resamples) predictions can be large, so the bands are built a block of points at a time
+            block_size = max(1, max_block_elements // num_resamples)
+            for i, output in enumerate(group):
+                lower = empty(design_matrix.shape[0])
+                upper = empty(design_matrix.shape[0])
+                for start in range(0, design_matrix.shape[0], block_size):
+                    predictions = output.rated_value * (design_matrix[start:start + block_size] @ samples[:, :, i].T)
+                    lower[start:start + block_size] = percentile(predictions, tail_percent, axis=1)
+                    upper[start:start + block_size] = percentile(predictions, 100.0 - tail_percent, axis=1)
+                results[output.name] = BaseEquipment.BootstrapResult(confidence, samples[:, :, i], lower, upper)
+        return results
+
+    class CrossValidationResult:
+        """A minimal class for the held-out prediction error of one output from a k-fold cross validation"""
+        def __init__(self, num_folds: int, catalog_values: ndarray, held_out_predictions: ndarray, fold_rows: List):
+            """
+            Constructor for the instance, which calculates the error statistics
+
+            :param num_folds: The number of folds
+            :param catalog_values: The raw catalog values at every data point
+            :param held_out_predictions: The prediction at every data point from the fit that did not include it
+            :param fold_rows: A list of the data row index arrays of each fold
+            """
+            residuals = held_out_predictions - catalog_values
+            percent_errors = divide(
+                100.0 * residuals, catalog_values, out=full(catalog_values.shape, nan), where=catalog_values != 0.0
+            )
+            valid_errors = absolute(percent_errors[~isnan(percent_errors)])
+            self.num_folds = num_folds
+            self.held_out_predictions = held_out_predictions
+            self.rmse = float(np_sqrt((residuals ** 2).mean()))
+            self.max_abs_error = float(absolute(residuals).max())
+            self.bias = float(residuals.mean())
+            self.mean_abs_percent_error = float(valid_errors.mean()) if valid_errors.size > 0 else nan
+            self.fold_rmse = [float(np_sqrt((residuals[rows] ** 2).mean())) for rows in fold_rows]
+
+    @profiled('cross_validate')
+    def cross_validate(
+            self, data_manager, num_folds: int = 5, seed: Optional[int] = None, max_workers: Optional[int] = None
+    ) -> Dict[str, CrossValidationResult]:
+        """
+        Estimates how well the generated curves predict data they were not fit to, which the training point percent
+        errors can't show.  The final catalog rows are shuffled and split into folds, and for each fold every output is
+        fit on the other folds, and evaluated at the rows of the held out fold.  The scaled independent variables, and
+        the design matrices of the linear curves, are built a single time and sliced for each fold, and the folds are
+        run on a thread pool.  Only the LAPACK-backed least-squares solves of the linear curves release the GIL and
+        actually overlap; the nonlinear ``curve_fit`` fallback calls back into Python for every residual, so those fits
+        hold the GIL and effectively run one fold at a time.  The generated parameters on this instance are not changed.
+
+        :param data_manager: A fully filled out catalog data manager instance
+        :param num_folds: The number of folds, at least two and at most the number of data rows
+        :param seed: An optional random seed for shuffling the rows into folds, so the same seed gives the same folds
+        :param max_workers: The maximum number of threads, defaulting to the ThreadPoolExecutor default
+        :return: A dictionary of CrossValidationResult instances, keyed by the output name
+        """
+        data = data_manager.final_data
+        num_rows = data.shape[0]
+        if not 2 <= num_folds <= num_rows:
+            raise EnergyPlusPetException(
+                f"Cross validation needs between 2 and {num_rows} folds for this catalog, got {num_folds}"
+            )
+        outputs = self.curve_fit_outputs()
+        independent_variables = self.scaled_independent_variables(data)
+        fit_groups: Dict[Tuple[str, Callable], List[BaseEquipment.CurveFitOutput]] = {}
+        for output in outputs:
+            fit_groups.setdefault((output.independent_variable_set, output.eval_function), []).append(output)
+        design_matrices = {
+            key: CommonCurves.linear_design_matrix(independent_variables[key[0]])
+            for key in fit_groups if key[1] in CommonCurves.linear_curves()
+        }
+        dependent_variables = {
+            key: column_stack([data[:, output.catalog_column] / output.rated_value for output in group])
+            for key, group in fit_groups.items()
+        }
+        fold_rows = array_split(default_rng(seed).permutation(num_rows), num_folds)
+
+        def run_fold(held_out_rows: ndarray) -> Dict[str, ndarray]:
+            training = ones(num_rows, dtype=bool)
+            training[held_out_rows] = False
+            predictions = {}
+            for key, group in fit_groups.items():
+                variable_set, eval_function = key
+                if key in design_matrices:
+                    design = design_matrices[key]
+                    coefficients, _ = LinearLeastSquares(design[training]).solve(dependent_variables[key][training])
+                    scaled_predictions = design[held_out_rows] @ coefficients
+                    for i, output in enumerate(group):
+                        predictions[output.name] = output.rated_value * scaled_predictions[:, i]
+                    continue
+                fit_responses = self.do_curve_fits(
+                    eval_function, independent_variables[variable_set][training],
+                    list(dependent_variables[key][training].T)
+                )
+                held_out_variables = tuple(independent_variables[variable_set][held_out_rows].T)
+                for output, (params, _) in zip(group, fit_responses):
+                    predicted_values, _ = self.eval_curve_at_points(
+                        eval_function, held_out_variables, params, data[held_out_rows, output.catalog_column]
+                    )
+                    predictions[output.name] = output.rated_value * asarray(predicted_values)
+            return predictions
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fold_predictions = list(executor.map(run_fold, fold_rows))
+        results: Dict[str, BaseEquipment.CrossValidationResult] = {}
+        for output in outputs:
+            held_out_predictions = empty(num_rows)
+            for rows, predictions in zip(fold_rows, fold_predictions):
+                held_out_predictions[rows] = predictions[output.name]
+            results[output.name] = BaseEquipment.CrossValidationResult(
+                num_folds, data[:, output.catalog_column], held_out_predictions, fold_rows
+            )
+        return results
 
     @abstractmethod
     def get_absolute_plot_data(self) -> Tuple:  # pragma: no cover
@@ -196,33 +741,24 @@ class BaseEquipment:
         This function takes a list of (field name, parameter) tuples and processes
         them into a nicely formed EnergyPlus IDF object.
 
+        Each value is indented, followed by its separator and then padded so the field name comments line up.  Only
+        the padding depends on the values, so everything else for each object type and list of field names is built
+        once by ``_idf_object_template`` and cached, and each call just fills in the values and joins the pieces.
+
         :param object_name: An IDF object name
         :param fields: A list of tuples of the form (field name, field value)
         :return: String IDF object
         """
-        form = object_name + ',\n'
-        field_names = [x[0] for x in fields]
-        field_values = [x[1] for x in fields]
-        for i, fn in enumerate(field_names):
-            if i == len(field_names) - 1:
-                form += "{};{}!-" + fn + '\n'
-            else:
-                form += "{},{}!-" + fn + '\n'
-        preferred_spaces = 16
-        hanging_indent_string = " "*4
-        pads = []
-        string_fields = [str(x) for x in field_values]
-        for f in string_fields:
-            this_padding = preferred_spaces - len(f)
-            this_padding = max(2, this_padding)
-            pads.append(" "*this_padding)
-        all_tokens = []
-        for f, p in zip(string_fields, pads):
-            all_tokens.append(hanging_indent_string + f)
-            all_tokens.append(p)
-        return form.format(*all_tokens)
+        header, field_endings = _idf_object_template(object_name, tuple(f[0] for f in fields))
+        pieces = [header]
+        for (_, value), (separator, comment) in zip(fields, field_endings):
+            string_value = str(value)
+            padding = _IDF_PADDING[len(string_value)] if len(string_value) < _IDF_PREFERRED_SPACES else '  '
+            pieces.append(f"    {string_value}{separator}{padding}{comment}")
+        return ''.join(pieces)
 
     @staticmethod
+    @profiled('do_one_curve_fit')
     def do_one_curve_fit(
             eval_function: Callable,
             independent_variable_arrays: Tuple[List[float], ...],
@@ -239,6 +775,8 @@ class BaseEquipment:
         * X represents the independent variable data, which are passed into F as a tuple argument for each data point
         * A is a set of coefficients to be solved, which are passed to the function as scalar arguments
 
+        This is a single-output convenience wrapper around ``do_curve_fits``, see that function for solver details.
+
         :param eval_function: A function that takes a tuple of independent variable scalars and individual coefficient
                               values as trailing arguments. For example
                               ``def calc_one_output((one_flow_rate, one_inlet_temp), coeff_a, coeff_b) -> float``
@@ -249,27 +787,68 @@ class BaseEquipment:
         :return: Returns a tuple of two items: first is the actual list of solved parameters, and second is a one-sigma
                  average regression error which can be displayed to describe to the user just how good the curve fit is.
         """
-        curve_fit_response = curve_fit(
-            eval_function,
-            independent_variable_arrays,
-            dependent_variable_array
-        )
-        raw_parameters = curve_fit_response[0]
-        calculated_parameters = list(raw_parameters)
-        diagonal = curve_fit_response[1].diagonal()
-        square_roots = [sqrt(d) for d in diagonal]
-        average_err_one_sigma = sum(square_roots) / len(square_roots)
-        # average_err_one_sigma = average(sqrt(diag(curve_fit_response[1])))
-        return calculated_parameters, average_err_one_sigma
+        return BaseEquipment.do_curve_fits(
+            eval_function, column_stack(independent_variable_arrays), [dependent_variable_array]
+        )[0]
 
     @staticmethod
+    @profiled('do_curve_fits')
+    def do_curve_fits(
+            eval_function: Callable,
+            independent_variables: ndarray,
+            dependent_variable_arrays: List
+    ) -> List[Tuple[List[float], float]]:
+        """
+        Performs a curve fit operation for several dependent variable arrays that share the same evaluation function
+        and the same independent variable data.
+
+        If the evaluation function is one of the ``CommonCurves.linear_curves``, the model is linear in its
+        coefficients, and the design matrix is factored a single time and then solved for every dependent array at once
+        with a closed-form least-squares solve.  Any other function is treated as potentially nonlinear and falls back
+        to the iterative scipy.optimize.curve_fit solver, one dependent array at a time.
+
+        :param eval_function: A curve function, with the same signature described in ``do_one_curve_fit``
+        :param independent_variables: A 2D array with one row per data point and one column per independent variable
+        :param dependent_variable_arrays: A list of dependent variable arrays, each with one value per data point
+        :return: Returns a list with one entry per dependent array, each a tuple of two items: first is the list of
+                 solved parameters, and second is the one-sigma average regression error for that output.
+        """
+        if eval_function in CommonCurves.linear_curves():
+            solver = LinearLeastSquares(CommonCurves.linear_design_matrix(independent_variables))
+            coefficients, average_errs = solver.solve(column_stack(dependent_variable_arrays))
+            return [(coefficients[:, i].tolist(), float(e)) for i, e in enumerate(average_errs)]
+        # scipy takes a large share of the package import time, and is only needed for this nonlinear fallback path,
+        # so it is imported here rather than at the top of the module
+        from scipy.optimize import curve_fit
+        independent_variable_arrays = tuple(asarray(independent_variables, dtype=float).T)
+        responses = []
+        for dependent_variable_array in dependent_variable_arrays:
+            curve_fit_response = curve_fit(
+                eval_function,
+                independent_variable_arrays,
+                dependent_variable_array
+            )
+            raw_parameters = curve_fit_response[0]
+            calculated_parameters = list(raw_parameters)
+            diagonal = curve_fit_response[1].diagonal()
+            square_roots = [sqrt(d) for d in diagonal]
+            average_err_one_sigma = sum(square_roots) / len(square_roots)
+            responses.append((calculated_parameters, average_err_one_sigma))
+        return responses
+
+    @staticmethod
+    @profiled('eval_curve_at_points')
     def eval_curve_at_points(
             eval_function: Callable,
             independent_variable_arrays: Tuple[List[float], ...],
             generated_parameter_array: List[float],
             catalog_output_array: List[float],
     ) -> Tuple[List[float], List[float]]:
-        """Evaluates a given curve function at all data points given"""
+        """
+        Evaluates a given curve function at all data points given, one point at a time.  This works for any curve
+        function, but for the ``CommonCurves.linear_curves``, ``eval_linear_curve_at_points`` is much faster.
+        Percent error is undefined where the catalog value is zero, and is reported as NaN for those points.
+        """
         num_points = len(catalog_output_array)
         predicated_values = []
         error_values = []
@@ -278,12 +857,72 @@ class BaseEquipment:
                 [x[i] for x in independent_variable_arrays],
                 *generated_parameter_array
             ))
-            error_values.append(
-                100.0 * (predicated_values[i] - catalog_output_array[i]) /
-                catalog_output_array[i]
-            )
+            if catalog_output_array[i] == 0.0:
+                error_values.append(nan)
+            else:
+                error_values.append(
+                    100.0 * (predicated_values[i] - catalog_output_array[i]) /
+                    catalog_output_array[i]
+                )
         return predicated_values, error_values
 
+    @staticmethod
+    @profiled('eval_linear_curve_at_points')
+    def eval_linear_curve_at_points(
+            independent_variables: ndarray,
+            generated_parameter_array: List[float],
+            rated_value: float,
+            catalog_output_array,
+    ) -> Tuple[ndarray, ndarray]:
+        """
+        Evaluates one of the ``CommonCurves.linear_curves`` at all data points in a single matrix product, then scales
+        the result by the rated value to get back to raw catalog units.
+
+        Percent error is undefined where the catalog value is zero.  Rather than fail the whole evaluation, those points
+        are reported as NaN, which matplotlib skips over when plotting, and every other point is still calculated.
+
+        :param independent_variables: A 2D array with one row per data point and one column per independent variable,
+                                      in the same order that was used when generating the parameters
+        :param generated_parameter_array: The coefficients of the curve, with the constant coefficient first
+        :param rated_value: The rated value used to scale the dependent variable when the curve was generated
+        :param catalog_output_array: The original (unscaled) catalog values at each data point
+        :return: A tuple of two 1D arrays: the predicted raw values, and the percent error at each data point
+        """
+        x = asarray(independent_variables, dtype=float)
+        parameters = asarray(generated_parameter_array, dtype=float)
+        catalog_values = asarray(catalog_output_array, dtype=float)
+        predicted_values = rated_value * (parameters[0] + x @ parameters[1:])
+        error_values = divide(
+            100.0 * (predicted_values - catalog_values), catalog_values,
+            out=full(catalog_values.shape, nan), where=catalog_values != 0.0
+        )
+        return predicted_values, error_values
+
+    def eval_output_at_points(
+            self, output: CurveFitOutput, independent_variables: ndarray, catalog_output_array
+    ) -> Tuple[ndarray, ndarray]:
+        """
+        Evaluates the generated curve for one CurveFitOutput at all data points, using the vectorized evaluation for
+        linear curves, and the per-point evaluation for anything else.
+
+        :param output: A CurveFitOutput instance, where the parameters have already been generated on this instance
+        :param independent_variables: A 2D array with one row per data point and one column per independent variable
+        :param catalog_output_array: The original (unscaled) catalog values at each data point
+        :return: A tuple of two 1D arrays: the predicted raw values, and the percent error at each data point
+        """
+        params = getattr(self, f"{output.name}_params")
+        if output.eval_function in CommonCurves.linear_curves():
+            return self.eval_linear_curve_at_points(
+                independent_variables, params, output.rated_value, catalog_output_array
+            )
+        predicted_values, error_values = self.eval_curve_at_points(
+            lambda x, *coefficients: output.rated_value * output.eval_function(x, *coefficients),
+            tuple(asarray(independent_variables, dtype=float).T),
+            params,
+            catalog_output_array
+        )
+        return asarray(predicted_values), asarray(error_values)
+
     @staticmethod
     def current_eplus_version_object_idf() -> str:
         """Returns a version IDF object string to include in IDF outputs"""
@@ -1,3 +1,8 @@
+from typing import Callable, Tuple
+
+from numpy import asarray, column_stack, ndarray, ones
+
+
 class CommonCurves:
     """
     This class is just a collection of static curve evaluation functions.
@@ -45,3 +50,26 @@ class CommonCurves:
     @staticmethod
     def heat_pump_6_coefficient_curve_raw_value(x, a, b, c, d, e, f, scale):
         return scale * CommonCurves.heat_pump_6_coefficient_curve(x, a, b, c, d, e, f)
+
+    @staticmethod
+    def linear_curves() -> Tuple[Callable, ...]:
+        """
+        Returns the curve functions in this collection that are linear in their coefficients, all of the form
+        Y = A + B*x[0] + C*x[1] + ...  Curves in this list can be solved directly from a design matrix built by
+        ``linear_design_matrix`` rather than with an iterative curve fit.
+
+        :return: A tuple of curve evaluation functions
+        """
+        return CommonCurves.heat_pump_5_coefficient_curve, CommonCurves.heat_pump_6_coefficient_curve
+
+    @staticmethod
+    def linear_design_matrix(independent_variables) -> ndarray:
+        """
+        Builds the least-squares design matrix for any of the ``linear_curves``, which is just a leading column of ones
+        for the constant coefficient, followed by each independent variable column.
+
+        :param independent_variables: A 2D array with one row per data point and one column per independent variable
+        :return: A 2D array with one row per data point and one column per coefficient
+        """
+        x = asarray(independent_variables, dtype=float)
+        return column_stack((ones(x.shape[0]), x))
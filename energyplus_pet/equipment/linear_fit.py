@@ -0,0 +1,229 @@
+from typing import Optional, Tuple, Union
+
+from numpy import asarray, concatenate, empty, finfo, flatnonzero, full, identity, inf, maximum, ndarray, sqrt, zeros
+from numpy.linalg import eigh, pinv, qr, svd
+from numpy.random import default_rng
+
+from energyplus_pet.exceptions import EnergyPlusPetException
+
+
+class LinearLeastSquares:
+    """
+    This class is a closed-form least-squares solver for models that are linear in their coefficients, Y = X * A.
+    The design matrix X is factored a single time when the instance is constructed, using a reduced QR decomposition
+    followed by an SVD of the small triangular factor.  After that, solving for one or many dependent arrays is just a
+    couple of small matrix products, with no iteration and no calls back into Python per data point.
+
+    The coefficients and covariance match what scipy.optimize.curve_fit would converge to for the same linear model,
+    including the scaling of the covariance by the residual variance, so the one-sigma error metric reported to the
+    user is unchanged.  Rank-deficient design matrices are handled the same way SciPy handles them, by dropping
+    singular values below a relative threshold, which results in the minimum-norm solution.
+    """
+
+    def __init__(self, design_matrix: ndarray):
+        """
+        Factor a design matrix for later solves.
+
+        :param design_matrix: A 2D array with one row per data point and one column per coefficient to be solved.
+        """
+        self._x = asarray(design_matrix, dtype=float)
+        if self._x.ndim != 2:
+            raise EnergyPlusPetException(f"Design matrix must be two dimensional, got shape {self._x.shape}")
+        self.num_points, self.num_coefficients = self._x.shape
+        self._q, r = qr(self._x)
+        u, s, vt = svd(r, full_matrices=False)
+        threshold = finfo(float).eps * max(self._x.shape) * (s[0] if s.size > 0 else 0.0)
+        keep = s > threshold
+        self.rank = int(keep.sum())
+        self._u = u[:, keep]
+        self._s = s[keep]
+        self._vt = vt[keep]
+        # this is pinv(X^T X), the covariance before scaling by the residual variance, same as curve_fit builds
+        self.unscaled_covariance = (self._vt.T / self._s ** 2) @ self._vt
+
+    def solve(self, dependent_variables) -> Tuple[ndarray, Union[float, ndarray]]:
+        """
+        Solves the factored system for one or more dependent variable arrays.
+
+        :param dependent_variables: Either a 1D array with one value per data point, or a 2D array with one row per
+                                    data point and one column per dependent variable that shares this design matrix.
+        :return: A tuple of two items: first is the solved coefficients, and second is the one-sigma average
+                 regression error.  For 1D input these are a 1D array of coefficients and a scalar; for 2D input these
+                 are a (num_coefficients, num_outputs) array and a 1D array with one error value per output.
+        """
+        y = asarray(dependent_variables, dtype=float)
+        single_output = y.ndim == 1
+        y = y.reshape(self.num_points, -1)
+        projected = self._u.T @ (self._q.T @ y)
+        coefficients = self._vt.T @ (projected / self._s[:, None])
+        residuals = y - self._x @ coefficients
+        if self.num_points > self.num_coefficients:
+            residual_variance = (residuals ** 2).sum(axis=0) / (self.num_points - self.num_coefficients)
+        else:
+            residual_variance = full(y.shape[1], inf)  # covariance can't be estimated, same as SciPy
+        one_sigma = sqrt(self.unscaled_covariance.diagonal())[:, None] * sqrt(residual_variance)[None, :]
+        average_err_one_sigma = one_sigma.mean(axis=0)
+        if single_output:
+            return coefficients[:, 0], float(average_err_one_sigma[0])
+        return coefficients, average_err_one_sigma
+
+
+class NormalEquationAccumulator:
+    """
+    This class is a streaming least-squares solver for models that are linear in their coefficients, Y = X * A.
+    Rather than holding the whole design matrix in memory, chunks of rows are added one at a time, and only the small
+    normal equation sums are kept: X^T X, X^T Y, the per-output sum of Y^2, and the number of points.  Memory use is
+    therefore fixed by the number of coefficients and outputs, no matter how many data points are streamed through.
+
+    Solving the accumulated normal equations gives the same coefficients and one-sigma error metric as
+    ``LinearLeastSquares``, with the same relative threshold for dropping near-singular directions.  Because the
+    normal equations square the condition number of the design matrix, results agree with the factored solver to
+    fewer digits on badly conditioned data, but the scaled variables used by the equipment are all near unity.
+    """
+
+    def __init__(self, num_coefficients: int, num_outputs: int):
+        """
+        Create a new empty accumulator.
+
+        :param num_coefficients: The number of columns in each design matrix chunk
+        :param num_outputs: The number of dependent variables that share the design matrix
+        """
+        self.num_coefficients = num_coefficients
+        self.num_outputs = num_outputs
+        self.num_points = 0
+        self._xtx = zeros((num_coefficients, num_coefficients))
+        self._xty = zeros((num_coefficients, num_outputs))
+        self._yty = zeros(num_outputs)
+
+    def add(self, design_matrix_chunk, dependent_variables_chunk) -> None:
+        """
+        Adds a chunk of data points to the accumulated sums.
+
+        :param design_matrix_chunk: A 2D array with one row per data point in this chunk and one column per coefficient
+        :param dependent_variables_chunk: A 2D array with one row per data point in this chunk and one column per output
+        :return: None
+        """
+        x = asarray(design_matrix_chunk, dtype=float)
+        y = asarray(dependent_variables_chunk, dtype=float).reshape(x.shape[0], -1)
+        if x.ndim != 2 or x.shape[1] != self.num_coefficients or y.shape[1] != self.num_outputs:
+            raise EnergyPlusPetException(
+                f"Chunk shapes {x.shape} and {y.shape} do not match accumulator with {self.num_coefficients} "
+                f"coefficients and {self.num_outputs} outputs"
+            )
+        self._xtx += x.T @ x
+        self._xty += x.T @ y
+        self._yty += (y ** 2).sum(axis=0)
+        self.num_points += x.shape[0]
+
+    def residual_sum_of_squares(self, coefficients: ndarray) -> ndarray:
+        """
+        Calculates the sum of squared residuals for each output from the accumulated sums, without another data pass.
+
+        :param coefficients: A (num_coefficients, num_outputs) array of solved coefficients
+        :return: A 1D array with the residual sum of squares of each output
+        """
+        explained = (coefficients * self._xty).sum(axis=0)
+        ssr = self._yty - 2.0 * explained + (coefficients * (self._xtx @ coefficients)).sum(axis=0)
+        return maximum(ssr, 0.0)  # round-off can push an exact fit slightly negative
+
+    def solve(self) -> Tuple[ndarray, ndarray]:
+        """
+        Solves the accumulated normal equations for every output.
+
+        :return: A tuple of two items: first is a (num_coefficients, num_outputs) array of solved coefficients, and
+                 second is a 1D array with the one-sigma average regression error of each output.
+        """
+        eigenvalues, eigenvectors = eigh(self._xtx)
+        # eigenvalues of X^T X are the squared singular values of X, so threshold them the same way LinearLeastSquares
+        # thresholds singular values, and clip tiny negative values from round-off before taking the square root
+        singular_values = sqrt(maximum(eigenvalues, 0.0))
+        largest = singular_values.max() if singular_values.size > 0 else 0.0
+        keep = singular_values > finfo(float).eps * max(self.num_points, self.num_coefficients) * largest
+        v = eigenvectors[:, keep]
+        unscaled_covariance = (v / eigenvalues[keep]) @ v.T
+        coefficients = unscaled_covariance @ self._xty
+        if self.num_points > self.num_coefficients:
+            residual_variance = self.residual_sum_of_squares(coefficients) / (self.num_points - self.num_coefficients)
+        else:
+            residual_variance = full(self.num_outputs, inf)
+        one_sigma = sqrt(unscaled_covariance.diagonal())[:, None] * sqrt(residual_variance)[None, :]
+        return coefficients, one_sigma.mean(axis=0)
+
+
+class BootstrapLinearFit:
+    """
+    This class refits a model that is linear in its coefficients, Y = X * A, to many bootstrap resamples of the data
+    points at once.  A resample drawn with replacement is the same as weighting each original data point by the number
+    of times it was drawn, so every resample is just a weighted least-squares problem on the same design matrix.
+
+    The per-point products X_i * X_j and X_i * Y_k are built a single time, and then the weighted normal equation sums
+    for a whole block of resamples come from one matrix product of the (resamples, points) weight matrix with those
+    products.  The stack of small normal equation systems is then solved in one batched call, so there is no Python
+    loop over resamples.  Normal equations square the condition number of the design matrix, and the scaled equipment
+    variables are all close to unity and so nearly collinear with the constant column, so the columns are first
+    centered and scaled to unit variance, and the solved coefficients are transformed back to the original columns.
+    The weight matrix and products scale with the number of data points, so this is intended for catalog sized data,
+    not for huge expanded data sets.
+    """
+
+    def __init__(self, design_matrix: ndarray, dependent_variables):
+        """
+        Prepare the per-point products for later resampling.
+
+        :param design_matrix: A 2D array with one row per data point and one column per coefficient to be solved.
+        :param dependent_variables: Either a 1D array with one value per data point, or a 2D array with one row per
+                                    data point and one column per dependent variable that shares this design matrix.
+        """
+        x = asarray(design_matrix, dtype=float)
+        if x.ndim != 2:
+            raise EnergyPlusPetException(f"Design matrix must be two dimensional, got shape {x.shape}")
+        y = asarray(dependent_variables, dtype=float).reshape(x.shape[0], -1)
+        self.num_points, self.num_coefficients = x.shape
+        self.num_outputs = y.shape[1]
+        # X A = Z B with Z = X M, so the standardized solutions map back to the original coefficients as A = M B
+        means = x.mean(axis=0)
+        deviations = x.std(axis=0)
+        varying = deviations > 0.0
+        self._transform = identity(self.num_coefficients)
+        self._transform[varying, varying] = 1.0 / deviations[varying]
+        constant_columns = flatnonzero(~varying & (means != 0.0))
+        if constant_columns.size > 0:
+            c = constant_columns[0]
+            self._transform[c, varying] = -means[varying] / (deviations[varying] * means[c])
+        z = x @ self._transform
+        self._products = concatenate(
+            ((z[:, :, None] * z[:, None, :]).reshape(self.num_points, -1), (z[:, :, None] * y[:, None, :]).reshape(
+                self.num_points, -1
+            )),
+            axis=1
+        )
+        # the same relative cutoff LinearLeastSquares applies to singular values of X, squared for X^T X
+        self._rcond = (finfo(float).eps * max(self.num_points, self.num_coefficients)) ** 2
+
+    def resample_coefficients(
+            self, num_resamples: int, seed: Optional[int] = None, max_block_elements: int = 20_000_000
+    ) -> ndarray:
+        """
+        Draws bootstrap resamples of the data points and solves each one for the coefficients.
+
+        :param num_resamples: The number of resamples to draw
+        :param seed: An optional random seed, so the same seed always gives the same resamples
+        :param max_block_elements: The maximum size of the (resamples, points) weight matrix held at once, which sets
+                                   how many resamples are solved in each batch
+        :return: A (num_resamples, num_coefficients, num_outputs) array of the solved coefficients of each resample
+        """
+        if num_resamples < 1:
+            raise EnergyPlusPetException(f"At least one bootstrap resample is required, got {num_resamples}")
+        rng = default_rng(seed)
+        p, k = self.num_coefficients, self.num_outputs
+        coefficients = empty((num_resamples, p, k))
+        block_size = max(1, min(num_resamples, max_block_elements // max(self.num_points, 1)))
+        uniform = full(self.num_points, 1.0 / self.num_points)
+        for start in range(0, num_resamples, block_size):
+            stop = min(start + block_size, num_resamples)
+            weights = rng.multinomial(self.num_points, uniform, size=stop - start).astype(float)
+            sums = weights @ self._products
+            xtx = sums[:, :p * p].reshape(-1, p, p)
+            xty = sums[:, p * p:].reshape(-1, p, k)
+            coefficients[start:stop] = self._transform @ (pinv(xtx, rcond=self._rcond, hermitian=True) @ xty)
+        return coefficients
@@ -1,8 +1,8 @@
-from json import dumps
-from typing import Callable, List, Tuple
+from typing import Dict, List, Tuple
+
+from numpy import column_stack, ndarray
 
 from energyplus_pet.equipment.common_curves import CommonCurves
-from energyplus_pet.data_manager import CatalogDataManager
 from energyplus_pet.equipment.base import BaseEquipment
 from energyplus_pet.equipment.equip_types import EquipType
 from energyplus_pet.equipment.column_header import ColumnHeaderArray, ColumnHeader
@@ -123,73 +123,66 @@ class WaterToAirHeatPumpCoolingCurveFit(BaseEquipment):
     def headers(self) -> ColumnHeaderArray:
         return self._headers
 
-    def to_eplus_idf_object(self) -> str:
-        object_name = "Coil:Cooling:WaterToAirHeatPump:EquationFit"
-        fields = [
-            ("Name", 'Your Coil Name'),
-            ("Water Inlet Node Name", 'Your Coil Source Side Inlet Node'),
-            ("Water Outlet Node Name", 'Your Coil Source Side Outlet Node'),
-            ("Air Inlet Node Name", 'Your Coil Load Side Inlet Node'),
-            ("Air Outlet Node Name", 'Your Coil Load Side Outlet Node'),
-            ("Rated Air Flow Rate", self.rated_air_volume_flow),
-            ("Rated Water Flow Rate", self.rated_water_volume_flow),
-            ("Rated Total Cooling Capacity", self.rated_total_capacity),
-            ("Rated Sensible Cooling Capacity", self.rated_sensible_capacity),
-            ("Rated Cooling COP", round(self.rated_total_capacity / self.rated_cooling_power, 4)),
-            ("Rated Entering Water Temperature", ''),
-            ("Rated Entering Air Dry-Bulb Temp", ''),
-            ("Rated Entering Air Wet-Bulb Temp", ''),
-            ("Total Cooling Capacity Curve Name", 'TotalCapacityCurve'),
-            ("Sensible Cooling Capacity Curve Name", 'SensibleCapacityCurve'),
-            ("Cooling Power Consumption Curve Name", 'CoolingPowerCurve'),
-            ("Nominal Time for Condensate Removal to Begin", ''),
-            ("Ratio of Initial Moisture Evaporation Rate and Steady State Latent Capacity", '')
-        ]
-        coil_object_string = self.fill_eplus_object_format(object_name, fields)
-
-        quad_reused_limits = [
-            ("Minimum Value of w", -100), ("Maximum Value of w", 100),
-            ("Minimum Value of x", -100), ("Maximum Value of x", 100),
-            ("Minimum Value of y", -100), ("Maximum Value of y", 100),
-            ("Minimum Value of z", -100), ("Maximum Value of z", 100),
-        ]
-        quint_reused_limits = [
-            ("Minimum Value of v", -100), ("Maximum Value of v", 100),
-            ("Minimum Value of w", -100), ("Maximum Value of w", 100),
-            ("Minimum Value of x", -100), ("Maximum Value of x", 100),
-            ("Minimum Value of y", -100), ("Maximum Value of y", 100),
-            ("Minimum Value of z", -100), ("Maximum Value of z", 100),
-        ]
-
-        object_name = "Curve:QuadLinear"
-        fields = [
-            ("Name", "TotalCapacityCurve"),
-            *[(f"Coefficient{i}", self.total_capacity_params[i]) for i in range(5)],
-            *quad_reused_limits
-        ]
-        total_curve_output = self.fill_eplus_object_format(object_name, fields)
-
-        object_name = "Curve:QuintLinear"
-        fields = [
-            ("Name", "SensibleCapacityCurve"),
-            *[(f"Coefficient{i}", self.sensible_capacity_params[i]) for i in range(6)],
-            *quint_reused_limits
-        ]
-        sensible_curve_output = self.fill_eplus_object_format(object_name, fields)
+    def eplus_coil_object(
+            self, coil_name: str, curve_names: Dict[str, str], node_prefix: str = 'Your Coil', companion_name: str = ''
+    ) -> BaseEquipment.EplusObject:
+        return BaseEquipment.EplusObject(
+            "Coil:Cooling:WaterToAirHeatPump:EquationFit",
+            coil_name,
+            [
+                ("Name", coil_name),
+                ("Water Inlet Node Name", f"{node_prefix} Source Side Inlet Node"),
+                ("Water Outlet Node Name", f"{node_prefix} Source Side Outlet Node"),
+                ("Air Inlet Node Name", f"{node_prefix} Load Side Inlet Node"),
+                ("Air Outlet Node Name", f"{node_prefix} Load Side Outlet Node"),
+                ("Rated Air Flow Rate", self.rated_air_volume_flow),
+                ("Rated Water Flow Rate", self.rated_water_volume_flow),
+                ("Rated Total Cooling Capacity", self.rated_total_capacity),
+                ("Rated Sensible Cooling Capacity", self.rated_sensible_capacity),
+                ("Rated Cooling COP", round(self.rated_total_capacity / self.rated_cooling_power, 4)),
+                ("Rated Entering Water Temperature", ''),
+                ("Rated Entering Air Dry-Bulb Temp", ''),
+                ("Rated Entering Air Wet-Bulb Temp", ''),
+                ("Total Cooling Capacity Curve Name", curve_names['total_capacity']),
+                ("Sensible Cooling Capacity Curve Name", curve_names['sensible_capacity']),
+                ("Cooling Power Consumption Curve Name", curve_names['cooling_power']),
+                ("Nominal Time for Condensate Removal to Begin", ''),
+                ("Ratio of Initial Moisture Evaporation Rate and Steady State Latent Capacity", '')
+            ],
+            {
+                'water_inlet_node_name': f"{node_prefix} Source Side Inlet Node",
+                'water_outlet_node_name': f"{node_prefix} Source Side Outlet Node",
+                'air_inlet_node_name': f"{node_prefix} Load Side Inlet Node",
+                'air_outlet_node_name': f"{node_prefix} Load Side Outlet Node",
+                'gross_rated_total_cooling_capacity': self.rated_total_capacity,
+                'gross_rated_sensible_cooling_capacity': self.rated_sensible_capacity,
+                'gross_rated_cooling_cop': self.rated_total_capacity / self.rated_cooling_power,
+                'rated_air_flow_rate': self.rated_air_volume_flow,
+                'rated_water_flow_rate': self.rated_water_volume_flow,
+                'rated_entering_water_temperature': '',
+                'rated_entering_air_dry_bulb_temperature': '',
+                'rated_entering_air_wet_bulb_temperature': '',
+                'total_cooling_capacity_curve_name': curve_names['total_capacity'],
+                'sensible_cooling_capacity_curve_name': curve_names['sensible_capacity'],
+                'cooling_power_consumption_curve_name': curve_names['cooling_power'],
+                'nominal_time_for_condensate_removal_to_begin': '',
+                'ratio_of_initial_moisture_evaporation_rate_and_steady_state_latent_capacity': ''
+            }
+        )
 
-        object_name = "Curve:QuadLinear"
-        fields = [
-            ("Name", "CoolingPowerCurve"),
-            *[(f"Coefficient{i}", self.cooling_power_params[i]) for i in range(5)],
-            *quad_reused_limits
+    def _default_eplus_objects(self) -> List[BaseEquipment.EplusObject]:
+        curve_names = {
+            'total_capacity': 'TotalCapacityCurve',
+            'sensible_capacity': 'SensibleCapacityCurve',
+            'cooling_power': 'CoolingPowerCurve',
+        }
+        return [
+            self.eplus_coil_object('Your Coil Name', curve_names),
+            *self.eplus_curve_objects(curve_names)
         ]
-        power_curve_output = self.fill_eplus_object_format(object_name, fields)
 
-        return '\n'.join([
-            BaseEquipment.current_eplus_version_object_idf(),
-            coil_object_string,
-            total_curve_output, sensible_curve_output, power_curve_output
-        ])
+    def to_eplus_idf_object(self) -> str:
+        return self.eplus_objects_idf(self._default_eplus_objects())
 
     def to_parameter_summary(self) -> str:
         output = f"""{self.name()}
@@ -229,70 +222,7 @@ Rated Source-side Volumetric Flow Rate: {self.rated_water_volume_flow}
         return output
 
     def to_eplus_epjson_object(self) -> str:
-        coil_object = {'Your Coil Name': {
-            'water_inlet_node_name': 'Your Coil Source Side Inlet Node',
-            'water_outlet_node_name': 'Your Coil Source Side Outlet Node',
-            'air_inlet_node_name': 'Your Coil Load Side Inlet Node',
-            'air_outlet_node_name': 'Your Coil Load Side Outlet Node',
-            'gross_rated_total_cooling_capacity': self.rated_total_capacity,
-            'gross_rated_sensible_cooling_capacity': self.rated_sensible_capacity,
-            'gross_rated_cooling_cop': self.rated_total_capacity / self.rated_cooling_power,
-            'rated_air_flow_rate': self.rated_air_volume_flow,
-            'rated_water_flow_rate': self.rated_water_volume_flow,
-            'rated_entering_water_temperature': '',
-            'rated_entering_air_dry_bulb_temperature': '',
-            'rated_entering_air_wet_bulb_temperature': '',
-            'total_cooling_capacity_curve_name': 'TotalCapacityCurve',
-            'sensible_cooling_capacity_curve_name': 'SensibleCapacityCurve',
-            'cooling_power_consumption_curve_name': 'CoolingPowerCurve',
-            'nominal_time_for_condensate_removal_to_begin': '',
-            'ratio_of_initial_moisture_evaporation_rate_and_steady_state_latent_capacity': ''
-        }}
-        reused_limits_four = {
-            "minimum_value_of_w": -100, "maximum_value_of_w": 100,
-            "minimum_value_of_x": -100, "maximum_value_of_x": 100,
-            "minimum_value_of_y": -100, "maximum_value_of_y": 100,
-            "minimum_value_of_z": -100, "maximum_value_of_z": 100,
-        }
-        reused_limits_five = {
-            "minimum_value_of_v": -100, "maximum_value_of_v": 100,
-            "minimum_value_of_w": -100, "maximum_value_of_w": 100,
-            "minimum_value_of_x": -100, "maximum_value_of_x": 100,
-            "minimum_value_of_y": -100, "maximum_value_of_y": 100,
-            "minimum_value_of_z": -100, "maximum_value_of_z": 100,
-        }
-        quad_curves = {'TotalCapacityCurve': {
-            "coefficient1_constant": self.total_capacity_params[0],
-            "coefficient2_w": self.total_capacity_params[1],
-            "coefficient3_x": self.total_capacity_params[2],
-            "coefficient4_y": self.total_capacity_params[3],
-            "coefficient5_z": self.total_capacity_params[4],
-            **reused_limits_four
-        }, 'CoolingPowerCurve': {
-            "coefficient1_constant": self.cooling_power_params[0],
-            "coefficient2_w": self.cooling_power_params[1],
-            "coefficient3_x": self.cooling_power_params[2],
-            "coefficient4_y": self.cooling_power_params[3],
-            "coefficient5_z": self.cooling_power_params[4],
-            **reused_limits_four
-        }}
-        quint_curves = {'SensibleCapacityCurve': {
-            "coefficient1_constant": self.sensible_capacity_params[0],
-            "coefficient2_v": self.sensible_capacity_params[1],
-            "coefficient3_w": self.sensible_capacity_params[2],
-            "coefficient4_x": self.sensible_capacity_params[3],
-            "coefficient5_y": self.sensible_capacity_params[4],
-            "coefficient5_z": self.sensible_capacity_params[5],
-            **reused_limits_five
-        }}
-
-        epjson_object = {
-            **BaseEquipment.current_eplus_version_object_epjson(),
-            'Coil:Cooling:WaterToAirHeatPump:EquationFit': coil_object,
-            'Curve:QuadLinear': quad_curves,
-            'Curve:QuintLinear': quint_curves
-        }
-        return dumps(epjson_object, indent=2)
+        return self.eplus_objects_epjson(self._default_eplus_objects())
 
     def get_number_of_progress_steps(self) -> int:
         return 4  # read data, tc curve fit, sc curve fit, power curve fit
@@ -300,88 +230,43 @@ Rated Source-side Volumetric Flow Rate: {self.rated_water_volume_flow}
     def minimum_data_points_for_generation(self) -> int:
         return 6
 
-    def generate_parameters(
-            self, data_manager: CatalogDataManager, cb_progress_increment: Callable, cb_progress_done: Callable
-    ):
-        # step 1, read the data into arrays (will be used for both scaling calculations and plotting later)
-        # these should already be set to zero, but not sure if the main form will reinitialize the equip-instance or not
-        self.catalog_total_capacity = [x[5] for x in data_manager.final_data_matrix]
-        self.catalog_sensible_capacity = [x[6] for x in data_manager.final_data_matrix]
-        self.catalog_cooling_power = [x[7] for x in data_manager.final_data_matrix]
-        scaled_water_inlet_temp = []
-        scaled_water_flow_rate = []
-        scaled_air_inlet_db_temp = []
-        scaled_air_inlet_wb_temp = []
-        scaled_air_flow_rate = []
-        scaled_cooling_capacity = []
-        scaled_sensible_capacity = []
-        scaled_cooling_power = []
-        for data_row in data_manager.final_data_matrix:
-            scaled_water_inlet_temp.append((data_row[0] + 273.15) / (10.0 + 273.15))  # T_ref defined by HP model
-            scaled_water_flow_rate.append(data_row[1] / self.rated_water_volume_flow)
-            scaled_air_inlet_db_temp.append((data_row[2] + 273.15) / (10.0 + 273.15))
-            scaled_air_inlet_wb_temp.append((data_row[3] + 273.15) / (10.0 + 273.15))
-            scaled_air_flow_rate.append(data_row[4] / self.rated_air_volume_flow)
-            scaled_cooling_capacity.append(data_row[5] / self.rated_total_capacity)
-            scaled_sensible_capacity.append(data_row[6] / self.rated_sensible_capacity)
-            scaled_cooling_power.append(data_row[7] / self.rated_cooling_power)
-        cb_progress_increment()
-
-        four_independent_var_arrays = (
-            scaled_air_inlet_wb_temp,
-            scaled_water_inlet_temp,
-            scaled_air_flow_rate,
-            scaled_water_flow_rate
-        )
-        five_independent_var_arrays = (
-            scaled_air_inlet_db_temp,
-            scaled_air_inlet_wb_temp,
-            scaled_water_inlet_temp,
-            scaled_air_flow_rate,
-            scaled_water_flow_rate
-        )
-
-        self.total_capacity_params, self.total_capacity_avg_err = self.do_one_curve_fit(
-            CommonCurves.heat_pump_5_coefficient_curve,
-            four_independent_var_arrays,
-            scaled_cooling_capacity
-        )
-        cb_progress_increment()
-
-        self.sensible_capacity_params, self.sensible_capacity_avg_err = self.do_one_curve_fit(
-            CommonCurves.heat_pump_6_coefficient_curve,
-            five_independent_var_arrays,
-            scaled_sensible_capacity
-        )
-        cb_progress_increment()
-
-        self.cooling_power_params, self.cooling_power_avg_err = self.do_one_curve_fit(
-            CommonCurves.heat_pump_5_coefficient_curve,
-            four_independent_var_arrays,
-            scaled_cooling_power
-        )
-        cb_progress_increment()
+    def curve_fit_outputs(self) -> List[BaseEquipment.CurveFitOutput]:
+        return [
+            BaseEquipment.CurveFitOutput(
+                'total_capacity', 5, self.rated_total_capacity,
+                CommonCurves.heat_pump_5_coefficient_curve, 'four_independent_vars'
+            ),
+            BaseEquipment.CurveFitOutput(
+                'sensible_capacity', 6, self.rated_sensible_capacity,
+                CommonCurves.heat_pump_6_coefficient_curve, 'five_independent_vars'
+            ),
+            BaseEquipment.CurveFitOutput(
+                'cooling_power', 7, self.rated_cooling_power,
+                CommonCurves.heat_pump_5_coefficient_curve, 'four_independent_vars'
+            ),
+        ]
 
-        # now just recalculate the values at each catalog data point
-        self.predicted_total_capacity, self.percent_error_total_capacity = self.eval_curve_at_points(
-            lambda *x: CommonCurves.heat_pump_5_coefficient_curve_raw_value(*x, self.rated_total_capacity),
-            four_independent_var_arrays,
-            self.total_capacity_params,
-            self.catalog_total_capacity
-        )
-        self.predicted_sensible_capacity, self.percent_error_sensible_capacity = self.eval_curve_at_points(
-            lambda *x: CommonCurves.heat_pump_6_coefficient_curve_raw_value(*x, self.rated_sensible_capacity),
-            five_independent_var_arrays,
-            self.sensible_capacity_params,
-            self.catalog_sensible_capacity
-        )
-        self.predicted_cooling_power, self.percent_error_cooling_power = self.eval_curve_at_points(
-            lambda *x: CommonCurves.heat_pump_5_coefficient_curve_raw_value(*x, self.rated_cooling_power),
-            four_independent_var_arrays,
-            self.cooling_power_params,
-            self.catalog_cooling_power
-        )
-        cb_progress_done(True)
+    def scaled_independent_variables(self, data: ndarray) -> Dict[str, ndarray]:
+        scaled_water_inlet_temp = (data[:, 0] + 273.15) / (10.0 + 273.15)  # T_ref defined by HP model
+        scaled_water_flow_rate = data[:, 1] / self.rated_water_volume_flow
+        scaled_air_inlet_db_temp = (data[:, 2] + 273.15) / (10.0 + 273.15)
+        scaled_air_inlet_wb_temp = (data[:, 3] + 273.15) / (10.0 + 273.15)
+        scaled_air_flow_rate = data[:, 4] / self.rated_air_volume_flow
+        return {
+            'four_independent_vars': column_stack((
+                scaled_air_inlet_wb_temp,
+                scaled_water_inlet_temp,
+                scaled_air_flow_rate,
+                scaled_water_flow_rate
+            )),
+            'five_independent_vars': column_stack((
+                scaled_air_inlet_db_temp,
+                scaled_air_inlet_wb_temp,
+                scaled_water_inlet_temp,
+                scaled_air_flow_rate,
+                scaled_water_flow_rate
+            )),
+        }
 
     def get_absolute_plot_data(self) -> Tuple:
         return (
@@ -1,8 +1,8 @@
-from json import dumps
-from typing import Callable, List, Tuple
+from typing import Dict, List, Tuple
+
+from numpy import column_stack, ndarray
 
 from energyplus_pet.equipment.common_curves import CommonCurves
-from energyplus_pet.data_manager import CatalogDataManager
 from energyplus_pet.equipment.base import BaseEquipment
 from energyplus_pet.equipment.equip_types import EquipType
 from energyplus_pet.equipment.column_header import ColumnHeaderArray, ColumnHeader
@@ -117,54 +117,57 @@ class WaterToAirHeatPumpHeatingCurveFit(BaseEquipment):
     def headers(self) -> ColumnHeaderArray:
         return self._headers
 
-    def to_eplus_idf_object(self) -> str:
-        object_name = "Coil:Heating:WaterToAirHeatPump:EquationFit"
-        fields = [
-            ("Name", 'Your Coil Name'),
-            ("Water Inlet Node Name", 'Your Coil Source Side Inlet Node'),
-            ("Water Outlet Node Name", 'Your Coil Source Side Outlet Node'),
-            ("Air Inlet Node Name", 'Your Coil Load Side Inlet Node'),
-            ("Air Outlet Node Name", 'Your Coil Load Side Outlet Node'),
-            ("Rated Air Flow Rate", self.rated_air_volume_flow),
-            ("Rated Water Flow Rate", self.rated_water_volume_flow),
-            ("Gross Rated Heating Capacity", self.rated_heating_capacity),
-            ("Gross Rated Heating COP", round(self.rated_heating_capacity / self.rated_heating_power, 4)),
-            ("Rated Entering Water Temperature", ''),
-            ("Rated Entering Air Dry-Bulb Temp", ''),
-            ("Ratio of Rated Heating Capacity to Rated Cooling Capacity", ''),
-            ("Heating Capacity Curve Name", 'TotalCapacityCurve'),
-            ("Heating Power Consumption Curve Name", 'HeatingPowerCurve'),
-        ]
-        coil_object_string = self.fill_eplus_object_format(object_name, fields)
-
-        reused_limits = [
-            ("Minimum Value of w", -100), ("Maximum Value of w", 100),
-            ("Minimum Value of x", -100), ("Maximum Value of x", 100),
-            ("Minimum Value of y", -100), ("Maximum Value of y", 100),
-            ("Minimum Value of z", -100), ("Maximum Value of z", 100),
-        ]
-
-        object_name = "Curve:QuadLinear"
-        fields = [
-            ("Name", "TotalCapacityCurve"),
-            *[(f"Coefficient{i}", self.heating_capacity_params[i]) for i in range(5)],
-            *reused_limits
-        ]
-        total_curve_output = self.fill_eplus_object_format(object_name, fields)
+    def eplus_coil_object(
+            self, coil_name: str, curve_names: Dict[str, str], node_prefix: str = 'Your Coil', companion_name: str = ''
+    ) -> BaseEquipment.EplusObject:
+        return BaseEquipment.EplusObject(
+            "Coil:Heating:WaterToAirHeatPump:EquationFit",
+            coil_name,
+            [
+                ("Name", coil_name),
+                ("Water Inlet Node Name", f"{node_prefix} Source Side Inlet Node"),
+                ("Water Outlet Node Name", f"{node_prefix} Source Side Outlet Node"),
+                ("Air Inlet Node Name", f"{node_prefix} Load Side Inlet Node"),
+                ("Air Outlet Node Name", f"{node_prefix} Load Side Outlet Node"),
+                ("Rated Air Flow Rate", self.rated_air_volume_flow),
+                ("Rated Water Flow Rate", self.rated_water_volume_flow),
+                ("Gross Rated Heating Capacity", self.rated_heating_capacity),
+                ("Gross Rated Heating COP", round(self.rated_heating_capacity / self.rated_heating_power, 4)),
+                ("Rated Entering Water Temperature", ''),
+                ("Rated Entering Air Dry-Bulb Temp", ''),
+                ("Ratio of Rated Heating Capacity to Rated Cooling Capacity", ''),
+                ("Heating Capacity Curve Name", curve_names['heating_capacity']),
+                ("Heating Power Consumption Curve Name", curve_names['heating_power']),
+            ],
+            {
+                'water_inlet_node_name': f"{node_prefix} Source Side Inlet Node",
+                'water_outlet_node_name': f"{node_prefix} Source Side Outlet Node",
+                'air_inlet_node_name': f"{node_prefix} Load Side Inlet Node",
+                'air_outlet_node_name': f"{node_prefix} Load Side Outlet Node",
+                'rated_air_flow_rate': self.rated_air_volume_flow,
+                'rated_water_flow_rate': self.rated_water_volume_flow,
+                'gross_rated_heating_capacity': self.rated_heating_capacity,
+                'gross_rated_heating_cop': self.rated_heating_capacity / self.rated_heating_power,
+                'rated_entering_water_temperature': '',
+                'rated_entering_air_dry_bulb_temperature': '',
+                'ratio_of_rated_heating_capacity_to_rated_cooling_capacity': '',
+                'heating_capacity_curve_name': curve_names['heating_capacity'],
+                'heating_power_consumption_curve_name': curve_names['heating_power'],
+            }
+        )
 
-        object_name = "Curve:QuadLinear"
-        fields = [
-            ("Name", "HeatingPowerCurve"),
-            *[(f"Coefficient{i}", self.heating_power_params[i]) for i in range(5)],
-            *reused_limits
+    def _default_eplus_objects(self) -> List[BaseEquipment.EplusObject]:
+        curve_names = {
+            'heating_capacity': 'TotalCapacityCurve',
+            'heating_power': 'HeatingPowerCurve',
+        }
+        return [
+            self.eplus_coil_object('Your Coil Name', curve_names),
+            *self.eplus_curve_objects(curve_names)
         ]
-        sensible_curve_output = self.fill_eplus_object_format(object_name, fields)
 
-        return '\n'.join([
-            BaseEquipment.current_eplus_version_object_idf(),
-            coil_object_string,
-            total_curve_output, sensible_curve_output
-        ])
+    def to_eplus_idf_object(self) -> str:
+        return self.eplus_objects_idf(self._default_eplus_objects())
 
     def to_parameter_summary(self) -> str:
         output = f"""{self.name()}
@@ -198,49 +201,7 @@ Rated Source-side Volumetric Flow Rate: {self.rated_water_volume_flow}
         return output
 
     def to_eplus_epjson_object(self) -> str:
-        coil_object = {'Your Coil Name': {
-            'water_inlet_node_name': 'Your Coil Source Side Inlet Node',
-            'water_outlet_node_name': 'Your Coil Source Side Outlet Node',
-            'air_inlet_node_name': 'Your Coil Load Side Inlet Node',
-            'air_outlet_node_name': 'Your Coil Load Side Outlet Node',
-            'rated_air_flow_rate': self.rated_air_volume_flow,
-            'rated_water_flow_rate': self.rated_water_volume_flow,
-            'gross_rated_heating_capacity': self.rated_heating_capacity,
-            'gross_rated_heating_cop': self.rated_heating_capacity / self.rated_heating_power,
-            'rated_entering_water_temperature': '',
-            'rated_entering_air_dry_bulb_temperature': '',
-            'ratio_of_rated_heating_capacity_to_rated_cooling_capacity': '',
-            'heating_capacity_curve_name': 'TotalCapacityCurve',
-            'heating_power_consumption_curve_name': 'HeatingPowerCurve',
-        }}
-        reused_limits = {
-            "minimum_value_of_w": -100, "maximum_value_of_w": 100,
-            "minimum_value_of_x": -100, "maximum_value_of_x": 100,
-            "minimum_value_of_y": -100, "maximum_value_of_y": 100,
-            "minimum_value_of_z": -100, "maximum_value_of_z": 100,
-        }
-        curves = {'TotalCapacityCurve': {
-            "coefficient1_constant": self.heating_capacity_params[0],
-            "coefficient2_w": self.heating_capacity_params[1],
-            "coefficient3_x": self.heating_capacity_params[2],
-            "coefficient4_y": self.heating_capacity_params[3],
-            "coefficient5_z": self.heating_capacity_params[4],
-            **reused_limits
-        }, 'HeatingPowerCurve': {
-            "coefficient1_constant": self.heating_power_params[0],
-            "coefficient2_w": self.heating_power_params[1],
-            "coefficient3_x": self.heating_power_params[2],
-            "coefficient4_y": self.heating_power_params[3],
-            "coefficient5_z": self.heating_power_params[4],
-            **reused_limits
-        }}
-
-        epjson_object = {
-            **BaseEquipment.current_eplus_version_object_epjson(),
-            'Coil:Heating:WaterToAirHeatPump:EquationFit': coil_object,
-            'Curve:QuadLinear': curves
-        }
-        return dumps(epjson_object, indent=2)
+        return self.eplus_objects_epjson(self._default_eplus_objects())
 
     def get_number_of_progress_steps(self) -> int:
         return 3  # read data, hc curve fit, power curve fit
@@ -248,63 +209,31 @@ Rated Source-side Volumetric Flow Rate: {self.rated_water_volume_flow}
     def minimum_data_points_for_generation(self) -> int:
         return 5
 
-    def generate_parameters(
-            self, data_manager: CatalogDataManager, cb_progress_increment: Callable, cb_progress_done: Callable
-    ):
-        # step 1, read the data into arrays (will be used for both scaling calculations and plotting later)
-        # these should already be set to zero, but not sure if the main form will reinitialize the equip-instance or not
-        self.catalog_heating_capacity = [x[4] for x in data_manager.final_data_matrix]
-        self.catalog_heating_power = [x[5] for x in data_manager.final_data_matrix]
-        scaled_water_inlet_temp = []
-        scaled_water_flow_rate = []
-        scaled_air_inlet_temp = []
-        scaled_air_flow_rate = []
-        scaled_heating_capacity = []
-        scaled_heating_power = []
-        for data_row in data_manager.final_data_matrix:
-            scaled_water_inlet_temp.append((data_row[0] + 273.15) / (10.0 + 273.15))  # T_ref defined by HP model
-            scaled_water_flow_rate.append(data_row[1] / self.rated_water_volume_flow)
-            scaled_air_inlet_temp.append((data_row[2] + 273.15) / (10.0 + 273.15))
-            scaled_air_flow_rate.append(data_row[3] / self.rated_air_volume_flow)
-            scaled_heating_capacity.append(data_row[4] / self.rated_heating_capacity)
-            scaled_heating_power.append(data_row[5] / self.rated_heating_power)
-        cb_progress_increment()
-
-        independent_var_arrays = (
-            scaled_air_inlet_temp,
-            scaled_water_inlet_temp,
-            scaled_air_flow_rate,
-            scaled_water_flow_rate
-        )
-
-        self.heating_capacity_params, self.heating_capacity_avg_err = self.do_one_curve_fit(
-            CommonCurves.heat_pump_5_coefficient_curve,
-            independent_var_arrays,
-            scaled_heating_capacity
-        )
-        cb_progress_increment()
-
-        self.heating_power_params, self.heating_power_avg_err = self.do_one_curve_fit(
-            CommonCurves.heat_pump_5_coefficient_curve,
-            independent_var_arrays,
-            scaled_heating_power
-        )
-        cb_progress_increment()
+    def curve_fit_outputs(self) -> List[BaseEquipment.CurveFitOutput]:
+        return [
+            BaseEquipment.CurveFitOutput(
+                'heating_capacity', 4, self.rated_heating_capacity,
+                CommonCurves.heat_pump_5_coefficient_curve, 'independent_vars'
+            ),
+            BaseEquipment.CurveFitOutput(
+                'heating_power', 5, self.rated_heating_power,
+                CommonCurves.heat_pump_5_coefficient_curve, 'independent_vars'
+            ),
+        ]
 
-        # now just recalculate the values at each catalog data point
-        self.predicted_heating_capacity, self.percent_error_heating_capacity = self.eval_curve_at_points(
-            lambda *x: CommonCurves.heat_pump_5_coefficient_curve_raw_value(*x, self.rated_heating_capacity),
-            independent_var_arrays,
-            self.heating_capacity_params,
-            self.catalog_heating_capacity
-        )
-        self.predicted_heating_power, self.percent_error_heating_power = self.eval_curve_at_points(
-            lambda *x: CommonCurves.heat_pump_5_coefficient_curve_raw_value(*x, self.rated_heating_power),
-            independent_var_arrays,
-            self.heating_power_params,
-            self.catalog_heating_power
-        )
-        cb_progress_done(True)
+    def scaled_independent_variables(self, data: ndarray) -> Dict[str, ndarray]:
+        scaled_water_inlet_temp = (data[:, 0] + 273.15) / (10.0 + 273.15)  # T_ref defined by HP model
+        scaled_water_flow_rate = data[:, 1] / self.rated_water_volume_flow
+        scaled_air_inlet_temp = (data[:, 2] + 273.15) / (10.0 + 273.15)
+        scaled_air_flow_rate = data[:, 3] / self.rated_air_volume_flow
+        return {
+            'independent_vars': column_stack((
+                scaled_air_inlet_temp,
+                scaled_water_inlet_temp,
+                scaled_air_flow_rate,
+                scaled_water_flow_rate
+            )),
+        }
 
     def get_absolute_plot_data(self) -> Tuple:
         return (
@@ -1,8 +1,8 @@
-from json import dumps
-from typing import Callable, List, Tuple
+from typing import Dict, List, Tuple
+
+from numpy import column_stack, ndarray
 
 from energyplus_pet.equipment.common_curves import CommonCurves
-from energyplus_pet.data_manager import CatalogDataManager
 from energyplus_pet.equipment.base import BaseEquipment
 from energyplus_pet.equipment.equip_types import EquipType
 from energyplus_pet.equipment.column_header import ColumnHeaderArray, ColumnHeader
@@ -105,54 +105,60 @@ class WaterToWaterHeatPumpCoolingCurveFit(BaseEquipment):
     def headers(self) -> ColumnHeaderArray:
         return self._headers
 
-    def to_eplus_idf_object(self) -> str:
-        object_name = "HeatPump:WaterToWater:EquationFit:Cooling"
-        fields = [
-            ("Name", 'Your Cooling Coil Name'),
-            ("Source Side Inlet Node Name", 'Your Coil Source Side Inlet Node'),
-            ("Source Side Outlet Node Name", 'Your Coil Source Side Outlet Node'),
-            ("Load Side Inlet Node Name", 'Your Coil Load Side Inlet Node'),
-            ("Load Side Outlet Node Name", 'Your Coil Load Side Outlet Node'),
-            ("Reference Load Side Flow Rate", self.rated_load_volume_flow),
-            ("Reference Source Side Flow Rate", self.rated_source_volume_flow),
-            ("Reference Cooling Capacity", self.rated_total_capacity),
-            ("Reference Cooling Power Consumption", self.rated_cooling_power),
-            ("Cooling Capacity Curve Name", 'TotalCapacityCurve'),
-            ("Cooling Compressor Power Consumption Curve Name", 'CoolingPowerCurve'),
-            ("Reference Coefficient of Performance", round(self.rated_total_capacity / self.rated_cooling_power, 8)),
-            ("Sizing Factor", ''),
-            ("Companion Heating Heat Pump Name", 'Your Heating Coil Name')
-        ]
-        coil_object_string = self.fill_eplus_object_format(object_name, fields)
-
-        reused_limits = [
-            ("Minimum Value of w", -100), ("Maximum Value of w", 100),
-            ("Minimum Value of x", -100), ("Maximum Value of x", 100),
-            ("Minimum Value of y", -100), ("Maximum Value of y", 100),
-            ("Minimum Value of z", -100), ("Maximum Value of z", 100),
-        ]
-
-        object_name = "Curve:QuadLinear"
-        fields = [
-            ("Name", "TotalCapacityCurve"),
-            *[(f"Coefficient{i}", self.total_capacity_params[i]) for i in range(5)],
-            *reused_limits
-        ]
-        total_curve_output = self.fill_eplus_object_format(object_name, fields)
+    def eplus_coil_object(
+            self, coil_name: str, curve_names: Dict[str, str], node_prefix: str = 'Your Coil', companion_name: str = ''
+    ) -> BaseEquipment.EplusObject:
+        return BaseEquipment.EplusObject(
+            "HeatPump:WaterToWater:EquationFit:Cooling",
+            coil_name,
+            [
+                ("Name", coil_name),
+                ("Source Side Inlet Node Name", f"{node_prefix} Source Side Inlet Node"),
+                ("Source Side Outlet Node Name", f"{node_prefix} Source Side Outlet Node"),
+                ("Load Side Inlet Node Name", f"{node_prefix} Load Side Inlet Node"),
+                ("Load Side Outlet Node Name", f"{node_prefix} Load Side Outlet Node"),
+                ("Reference Load Side Flow Rate", self.rated_load_volume_flow),
+                ("Reference Source Side Flow Rate", self.rated_source_volume_flow),
+                ("Reference Cooling Capacity", self.rated_total_capacity),
+                ("Reference Cooling Power Consumption", self.rated_cooling_power),
+                ("Cooling Capacity Curve Name", curve_names['total_capacity']),
+                ("Cooling Compressor Power Consumption Curve Name", curve_names['cooling_power']),
+                (
+                    "Reference Coefficient of Performance",
+                    round(self.rated_total_capacity / self.rated_cooling_power, 8)
+                ),
+                ("Sizing Factor", ''),
+                ("Companion Heating Heat Pump Name", companion_name)
+            ],
+            {
+                'source_side_inlet_node_name': f"{node_prefix} Source Side Inlet Node",
+                'source_side_outlet_node_name': f"{node_prefix} Source Side Outlet Node",
+                'load_side_inlet_node_name': f"{node_prefix} Load Side Inlet Node",
+                'load_side_outlet_node_name': f"{node_prefix} Load Side Outlet Node",
+                'reference_load_side_flow_rate': self.rated_load_volume_flow,
+                'reference_source_side_flow_rate': self.rated_source_volume_flow,
+                'reference_cooling_capacity': self.rated_total_capacity,
+                'reference_cooling_power_consumption': self.rated_cooling_power,
+                'cooling_capacity_curve_name': curve_names['total_capacity'],
+                'cooling_compressor_power_curve_name': curve_names['cooling_power'],
+                'reference_coefficient_of_performance': self.rated_total_capacity / self.rated_cooling_power,
+                'sizing_factor': '',
+                'companion_heating_heat_pump_name': companion_name,
+            }
+        )
 
-        object_name = "Curve:QuadLinear"
-        fields = [
-            ("Name", "CoolingPowerCurve"),
-            *[(f"Coefficient{i}", self.cooling_power_params[i]) for i in range(5)],
-            *reused_limits
+    def _default_eplus_objects(self) -> List[BaseEquipment.EplusObject]:
+        curve_names = {
+            'total_capacity': 'TotalCapacityCurve',
+            'cooling_power': 'CoolingPowerCurve',
+        }
+        return [
+            self.eplus_coil_object('Your Cooling Coil Name', curve_names, 'Your Coil', 'Your Heating Coil Name'),
+            *self.eplus_curve_objects(curve_names)
         ]
-        power_curve_output = self.fill_eplus_object_format(object_name, fields)
 
-        return '\n'.join([
-            BaseEquipment.current_eplus_version_object_idf(),
-            coil_object_string,
-            total_curve_output, power_curve_output
-        ])
+    def to_eplus_idf_object(self) -> str:
+        return self.eplus_objects_idf(self._default_eplus_objects())
 
     def to_parameter_summary(self) -> str:
         output = f"""{self.name()}
@@ -186,49 +192,7 @@ Rated Source-side Volumetric Flow Rate: {self.rated_source_volume_flow}
         return output
 
     def to_eplus_epjson_object(self) -> str:
-        coil_object = {'Your Cooling Coil Name': {
-            'source_side_inlet_node_name': 'Your Coil Source Side Inlet Node',
-            'source_side_outlet_node_name': 'Your Coil Source Side Outlet Node',
-            'load_side_inlet_node_name': 'Your Coil Load Side Inlet Node',
-            'load_side_outlet_node_name': 'Your Coil Load Side Outlet Node',
-            'reference_load_side_flow_rate': self.rated_load_volume_flow,
-            'reference_source_side_flow_rate': self.rated_source_volume_flow,
-            'reference_cooling_capacity': self.rated_total_capacity,
-            'reference_cooling_power_consumption': self.rated_cooling_power,
-            'cooling_capacity_curve_name': 'TotalCapacityCurve',
-            'cooling_compressor_power_curve_name': 'CoolingPowerCurve',
-            'reference_coefficient_of_performance': self.rated_total_capacity / self.rated_cooling_power,
-            'sizing_factor': '',
-            'companion_heating_heat_pump_name': 'Your Heating Coil Name',
-        }}
-        reused_limits = {
-            "minimum_value_of_w": -100, "maximum_value_of_w": 100,
-            "minimum_value_of_x": -100, "maximum_value_of_x": 100,
-            "minimum_value_of_y": -100, "maximum_value_of_y": 100,
-            "minimum_value_of_z": -100, "maximum_value_of_z": 100,
-        }
-        curves = {'TotalCapacityCurve': {
-            "coefficient1_constant": self.total_capacity_params[0],
-            "coefficient2_w": self.total_capacity_params[1],
-            "coefficient3_x": self.total_capacity_params[2],
-            "coefficient4_y": self.total_capacity_params[3],
-            "coefficient5_z": self.total_capacity_params[4],
-            **reused_limits
-        }, 'CoolingPowerCurve': {
-            "coefficient1_constant": self.cooling_power_params[0],
-            "coefficient2_w": self.cooling_power_params[1],
-            "coefficient3_x": self.cooling_power_params[2],
-            "coefficient4_y": self.cooling_power_params[3],
-            "coefficient5_z": self.cooling_power_params[4],
-            **reused_limits
-        }}
-
-        epjson_object = {
-            **BaseEquipment.current_eplus_version_object_epjson(),
-            'HeatPump:WaterToWater:EquationFit:Cooling': coil_object,
-            'Curve:QuadLinear': curves
-        }
-        return dumps(epjson_object, indent=2)
+        return self.eplus_objects_epjson(self._default_eplus_objects())
 
     def get_number_of_progress_steps(self) -> int:
         return 3  # read data, tc curve fit, power curve fit
@@ -236,63 +200,31 @@ Rated Source-side Volumetric Flow Rate: {self.rated_source_volume_flow}
     def minimum_data_points_for_generation(self) -> int:
         return 5
 
-    def generate_parameters(
-            self, data_manager: CatalogDataManager, cb_progress_increment: Callable, cb_progress_done: Callable
-    ):
-        # step 1, read the data into arrays (will be used for both scaling calculations and plotting later)
-        # these should already be set to zero, but not sure if the main form will reinitialize the equip-instance or not
-        self.catalog_total_capacity = [x[4] for x in data_manager.final_data_matrix]
-        self.catalog_cooling_power = [x[5] for x in data_manager.final_data_matrix]
-        scaled_source_side_inlet_temp = []
-        scaled_source_side_flow_rate = []
-        scaled_load_side_inlet_temp = []
-        scaled_load_side_flow_rate = []
-        scaled_cooling_capacity = []
-        scaled_cooling_power = []
-        for data_row in data_manager.final_data_matrix:
-            scaled_source_side_inlet_temp.append((data_row[0] + 273.15) / (10.0 + 273.15))  # T_ref defined by HP model
-            scaled_source_side_flow_rate.append(data_row[1] / self.rated_source_volume_flow)
-            scaled_load_side_inlet_temp.append((data_row[2] + 273.15) / (10.0 + 273.15))
-            scaled_load_side_flow_rate.append(data_row[3] / self.rated_load_volume_flow)
-            scaled_cooling_capacity.append(data_row[4] / self.rated_total_capacity)
-            scaled_cooling_power.append(data_row[5] / self.rated_cooling_power)
-        cb_progress_increment()
-
-        independent_var_arrays = (
-            scaled_load_side_inlet_temp,
-            scaled_source_side_inlet_temp,
-            scaled_load_side_flow_rate,
-            scaled_source_side_flow_rate
-        )
-
-        self.total_capacity_params, self.total_capacity_avg_err = self.do_one_curve_fit(
-            CommonCurves.heat_pump_5_coefficient_curve,
-            independent_var_arrays,
-            scaled_cooling_capacity
-        )
-        cb_progress_increment()
-
-        self.cooling_power_params, self.cooling_power_avg_err = self.do_one_curve_fit(
-            CommonCurves.heat_pump_5_coefficient_curve,
-            independent_var_arrays,
-            scaled_cooling_power
-        )
-        cb_progress_increment()
+    def curve_fit_outputs(self) -> List[BaseEquipment.CurveFitOutput]:
+        return [
+            BaseEquipment.CurveFitOutput(
+                'total_capacity', 4, self.rated_total_capacity,
+                CommonCurves.heat_pump_5_coefficient_curve, 'independent_vars'
+            ),
+            BaseEquipment.CurveFitOutput(
+                'cooling_power', 5, self.rated_cooling_power,
+                CommonCurves.heat_pump_5_coefficient_curve, 'independent_vars'
+            ),
+        ]
 
-        # now just recalculate the values at each catalog data point
-        self.predicted_total_capacity, self.percent_error_total_capacity = self.eval_curve_at_points(
-            lambda *x: CommonCurves.heat_pump_5_coefficient_curve_raw_value(*x, self.rated_total_capacity),
-            independent_var_arrays,
-            self.total_capacity_params,
-            self.catalog_total_capacity
-        )
-        self.predicted_cooling_power, self.percent_error_cooling_power = self.eval_curve_at_points(
-            lambda *x: CommonCurves.heat_pump_5_coefficient_curve_raw_value(*x, self.rated_cooling_power),
-            independent_var_arrays,
-            self.cooling_power_params,
-            self.catalog_cooling_power
-        )
-        cb_progress_done(True)
+    def scaled_independent_variables(self, data: ndarray) -> Dict[str, ndarray]:
+        scaled_source_side_inlet_temp = (data[:, 0] + 273.15) / (10.0 + 273.15)  # T_ref defined by HP model
+        scaled_source_side_flow_rate = data[:, 1] / self.rated_source_volume_flow
+        scaled_load_side_inlet_temp = (data[:, 2] + 273.15) / (10.0 + 273.15)
+        scaled_load_side_flow_rate = data[:, 3] / self.rated_load_volume_flow
+        return {
+            'independent_vars': column_stack((
+                scaled_load_side_inlet_temp,
+                scaled_source_side_inlet_temp,
+                scaled_load_side_flow_rate,
+                scaled_source_side_flow_rate
+            )),
+        }
 
     def get_absolute_plot_data(self) -> Tuple:
         return (
@@ -1,3 +1,8 @@
 class EnergyPlusPetException(Exception):
     """Catch-all for exceptions that could occur related to known program phenomena"""
     pass
+
+
+class OperationCancelled(EnergyPlusPetException):
+    """Raised from inside a long running operation when its cancellation token was cancelled or timed out"""
+    pass
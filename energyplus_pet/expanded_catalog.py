@@ -0,0 +1,175 @@
+from typing import Iterator, List, Tuple
+
+from numpy import arange, asarray, empty, int64, integer, maximum, minimum, ndarray
+
+from energyplus_pet.correction_factor import CorrectionFactor, CorrectionFactorType
+
+
+class ExpandedCatalog:
+    """
+    This class is a lazy, read-only view of the catalog data set after it has been expanded by a list of correction
+    factors.  Only the base data and the correction factor tables are kept; any row, slice of rows, or column of the
+    expanded data set is computed on demand, so the full product of the base data and every factor never has to exist
+    in memory at once.
+
+    The expanded row order is identical to ``CatalogDataManager.expand_by_correction_factor`` applied once per factor:
+    each factor keeps the previous rows first, then appends one corrected copy of them per correction row.  That means
+    an expanded row index is a mixed-radix number, where the lowest "digit" is the base data row, and each following
+    digit, with radix (1 + num_corrections), says which row of that factor was applied, with zero meaning none.
+    """
+
+    def __init__(self, base_data, correction_factors: List[CorrectionFactor], db_column: int, wb_column: int):
+        """
+        Create a new lazy expanded catalog.
+
+        :param base_data: The 2D base data array, indexed as [data_point, column]
+        :param correction_factors: The fully defined correction factors, in the order they are applied
+        :param db_column: The zero-based dry-bulb column index, used for CombinedDbWb correction factors
+        :param wb_column: The zero-based wet-bulb column index, used for CombinedDbWb correction factors
+        """
+        self._base_data = asarray(base_data, dtype=float)
+        self.num_columns = self._base_data.shape[1] if self._base_data.ndim == 2 else 0
+        # each factor is stored as a list of (column, is_replacement, per-correction-row values) operations, in the
+        # same order the row-by-row expansion applies them, so each column can be computed independently
+        self._factor_operations: List[List[Tuple[int, bool, ndarray]]] = []
+        self._level_sizes: List[int] = [self._base_data.shape[0]]
+        for cf in correction_factors:
+            if cf.num_corrections < 1:
+                continue
+            operations = []
+            if cf.correction_type == CorrectionFactorType.Multiplier:
+                operations.append((cf.base_column_index, False, self._cf_values(cf, cf.base_correction)))
+            elif cf.correction_type == CorrectionFactorType.Replacement:
+                operations.append((cf.base_column_index, True, self._cf_values(cf, cf.base_correction)))
+            elif cf.correction_type == CorrectionFactorType.CombinedDbWb:
+                operations.append((db_column, True, self._cf_values(cf, cf.base_correction_db)))
+                operations.append((wb_column, True, self._cf_values(cf, cf.base_correction_wb)))
+            for column_to_modify in cf.columns_to_modify:
+                operations.append(
+                    (column_to_modify, False, self._cf_values(cf, cf.mod_correction_data_column_map[column_to_modify]))
+                )
+            # python negative indices on the column are resolved here once, so they can be compared to a column number
+            operations = [(c % self.num_columns if self.num_columns else c, r, v) for c, r, v in operations]
+            self._factor_operations.append(operations)
+            self._level_sizes.append(self._level_sizes[-1] * (1 + cf.num_corrections))
+
+    @staticmethod
+    def _cf_values(cf: CorrectionFactor, values: List[float]) -> ndarray:
+        """Returns the first num_corrections values of a correction factor array as a float array"""
+        return asarray(values[:cf.num_corrections], dtype=float)
+
+    def __len__(self) -> int:
+        """Returns the number of rows in the fully expanded data set"""
+        return self._level_sizes[-1]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Returns the (rows, columns) shape of the fully expanded data set, like a NumPy array would"""
+        return len(self), self.num_columns
+
+    def _decompose(self, row_indices: ndarray) -> Tuple[ndarray, List[ndarray]]:
+        """Splits expanded row indices into base data row indices and the applied row of each correction factor"""
+        remaining = row_indices
+        factor_rows = []
+        for level_size in reversed(self._level_sizes[:-1]):
+            factor_rows.append(remaining // level_size - 1)  # -1 means this factor was not applied to the row
+            remaining = remaining % level_size
+        factor_rows.reverse()
+        return remaining, factor_rows
+
+    def _column_values(self, column_index: int, base_rows: ndarray, factor_rows: List[ndarray]) -> ndarray:
+        """Computes a single column at already decomposed row indices, applying each factor in order"""
+        values = self._base_data[base_rows, column_index]
+        for operations, applied_rows in zip(self._factor_operations, factor_rows):
+            mask = applied_rows >= 0
+            for operation_column, is_replacement, cf_values in operations:
+                if operation_column != column_index:
+                    continue
+                if is_replacement:
+                    values[mask] = cf_values[applied_rows[mask]]
+                else:
+                    values[mask] *= cf_values[applied_rows[mask]]
+        return values
+
+    def _checked_indices(self, row_indices) -> ndarray:
+        """Converts row indices to an int64 array, wrapping negative indices and checking bounds"""
+        indices = asarray(row_indices, dtype=int64)
+        indices = indices + (indices < 0) * len(self)
+        if indices.size > 0 and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"Row index out of range for expanded catalog with {len(self)} rows")
+        return indices
+
+    def rows(self, row_indices) -> ndarray:
+        """
+        Computes expanded rows on demand.
+
+        :param row_indices: A 1D array or list of (possibly negative) expanded row indices
+        :return: A new 2D array with one row per requested index
+        """
+        indices = self._checked_indices(row_indices)
+        base_rows, factor_rows = self._decompose(indices)
+        response = empty((indices.size, self.num_columns))
+        for column_index in range(self.num_columns):
+            response[:, column_index] = self._column_values(column_index, base_rows, factor_rows)
+        return response
+
+    def __getitem__(self, key) -> ndarray:
+        """Supports integer, slice, and index array access to rows, returning newly computed arrays"""
+        if isinstance(key, (int, integer)):
+            return self.rows([key])[0]
+        if isinstance(key, slice):
+            return self.rows(arange(*key.indices(len(self))))
+        return self.rows(key)
+
+    def iter_chunks(self, chunk_size: int = 65536) -> Iterator[ndarray]:
+        """
+        Iterates over the expanded data set in fixed size chunks of rows, so only one chunk is in memory at a time.
+
+        :param chunk_size: The maximum number of rows in each chunk; the last chunk may be smaller
+        :return: An iterator of 2D arrays
+        """
+        for start in range(0, len(self), chunk_size):
+            yield self.rows(arange(start, min(start + chunk_size, len(self))))
+
+    def column(self, column_index: int, start: int = 0, stop: int = None) -> ndarray:
+        """
+        Computes one column of the expanded data set, or a range of it, without computing any other columns.
+
+        :param column_index: The zero-based header column index
+        :param start: The first expanded row to include
+        :param stop: One past the last expanded row to include, defaulting to the end of the data set
+        :return: A new 1D array of column values
+        """
+        indices = arange(*slice(start, stop).indices(len(self)))
+        base_rows, factor_rows = self._decompose(indices)
+        return self._column_values(column_index % self.num_columns, base_rows, factor_rows)
+
+    def column_ranges(self, chunk_size: int = 65536) -> Tuple[ndarray, ndarray]:
+        """
+        Reduces every column of the expanded data set to its minimum and maximum values, one chunk at a time.
+
+        :param chunk_size: The maximum number of rows computed at once
+        :return: A tuple of two 1D arrays, the minimum and maximum of each column
+        """
+        minimums = empty(self.num_columns)
+        maximums = empty(self.num_columns)
+        for i, chunk in enumerate(self.iter_chunks(chunk_size)):
+            if i == 0:
+                minimums[:] = chunk.min(axis=0)
+                maximums[:] = chunk.max(axis=0)
+            else:
+                minimum(minimums, chunk.min(axis=0), out=minimums)
+                maximum(maximums, chunk.max(axis=0), out=maximums)
+        return minimums, maximums
+
+    def constant_columns(self, chunk_size: int = 65536) -> List[int]:
+        """
+        Finds columns that have no variation over the entire expanded data set, which is the data diversity check.
+
+        :param chunk_size: The maximum number of rows computed at once
+        :return: A list of zero-based column indices that are constant; empty if every column varies
+        """
+        if len(self) == 0:
+            return []
+        minimums, maximums = self.column_ranges(chunk_size)
+        return [int(c) for c in (minimums == maximums).nonzero()[0]]
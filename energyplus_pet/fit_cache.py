@@ -0,0 +1,204 @@
+from argparse import ArgumentParser
+from hashlib import sha256
+from json import dumps
+from os import replace, utime
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Dict, List, Optional
+from zipfile import BadZipFile
+
+from numpy import asarray, load, savez
+
+from energyplus_pet.equipment.base import BaseEquipment
+
+# bump this whenever the fitting code changes in a way that would change the generated results, so stale entries
+# from an older version are simply never hit again, and eventually get evicted
+CACHE_FORMAT_VERSION = 1
+
+
+class FitCache:
+    """
+    This class is a persistent, size-bounded cache of generated parameters, stored as one ``.npz`` file per entry in
+    a cache directory.  Each entry is keyed by a stable hash of everything that goes into a fit: the equipment type,
+    the constant parameter values, the base catalog data, and the correction factor definitions.  When the same
+    catalog is processed again, the generated ``<name>_params``, ``<name>_avg_err``, and the catalog, predicted, and
+    percent error arrays are restored straight onto the equipment instance instead of refitting.
+
+    Entries are evicted least recently used first once there are more than ``max_entries``, where the file
+    modification time is the last use time, so the ordering survives across processes and runs.  Entries are written
+    to a temporary file and then moved into place, so several batch worker processes can share one cache directory.
+
+    The cache is bounded by entry count only, there is no byte budget.  Each entry holds the catalog, predicted, and
+    percent error arrays of every output, so its size grows with the expanded catalog, at roughly 24 bytes per
+    expanded data row per output plus about 1 kB of overhead, and the disk use is up to ``max_entries`` times that.
+    Lower ``max_entries`` for very large catalogs, and use ``describe`` to check the actual size.
+    """
+
+    def __init__(self, cache_directory: str, max_entries: int = 512):
+        """
+        Create a new cache instance, creating the cache directory if needed
+
+        :param cache_directory: The directory to store cache entries in
+        :param max_entries: The maximum number of entries to keep before evicting the least recently used ones; this
+                            is the only bound, so the disk use also depends on the catalog sizes
+        """
+        self.cache_directory = Path(cache_directory)
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(equipment: BaseEquipment, data_manager, constant_parameters: Dict[str, float]) -> str:
+        """
+        Builds the stable hash key for one fit.
+
+        :param equipment: The equipment instance, which provides the equipment type
+        :param data_manager: The catalog data manager, which provides the digest of the base data and correction factors
+        :param constant_parameters: The constant parameter values, keyed by parameter ID
+        :return: A hex string key
+        """
+        hasher = sha256()
+        hasher.update(dumps({
+            'version': CACHE_FORMAT_VERSION,
+            'equipment_type': equipment.this_type().name,
+            'constant_parameters': {k: float(v) for k, v in sorted(constant_parameters.items())},
+            'catalog': data_manager.content_digest(),
+        }, sort_keys=True).encode())
+        return hasher.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_directory / f"{key}.npz"
+
+    def entry_paths(self) -> List[Path]:
+        """Returns the paths of all entries currently in the cache"""
+        return list(self.cache_directory.glob('*.npz'))
+
+    def restore(self, key: str, equipment: BaseEquipment) -> bool:
+        """
+        Restores a cached fit onto the equipment instance, if the key is in the cache.
+
+        :param key: A key from ``cache_key``
+        :param equipment: The equipment instance to restore the generated results onto
+        :return: True for a cache hit, where the results were restored, or False for a miss
+        """
+        path = self._entry_path(key)
+        attributes = {}
+        try:
+            with load(path) as entry:
+                for output in equipment.curve_fit_outputs():
+                    attributes[f"{output.name}_params"] = entry[f"{output.name}_params"].tolist()
+                    attributes[f"{output.name}_avg_err"] = float(entry[f"{output.name}_avg_err"])
+                    for attribute_prefix in ('catalog', 'predicted', 'percent_error'):
+                        attribute_name = f"{attribute_prefix}_{output.name}"
+                        attributes[attribute_name] = entry[attribute_name]
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        except (OSError, ValueError, KeyError, BadZipFile, EOFError):  # a corrupt or truncated entry
+            path.unlink(missing_ok=True)  # it would never load, so remove it rather than miss on it every time
+            self.misses += 1
+            return False
+        for attribute_name, value in attributes.items():
+            setattr(equipment, attribute_name, value)
+        try:
+            utime(path)  # mark the entry as most recently used
+        except FileNotFoundError:  # another process evicted it after it was loaded, which is still a hit
+            pass
+        self.hits += 1
+        return True
+
+    def store(self, key: str, equipment: BaseEquipment) -> None:
+        """
+        Stores the generated results from the equipment instance in the cache, and evicts old entries if needed.
+
+        :param key: A key from ``cache_key``
+        :param equipment: The equipment instance, where parameters have already been generated
+        :return: Nothing
+        """
+        arrays = {}
+        for output in equipment.curve_fit_outputs():
+            arrays[f"{output.name}_params"] = asarray(getattr(equipment, f"{output.name}_params"), dtype=float)
+            arrays[f"{output.name}_avg_err"] = asarray(getattr(equipment, f"{output.name}_avg_err"), dtype=float)
+            for attribute_prefix in ('catalog', 'predicted', 'percent_error'):
+                attribute_name = f"{attribute_prefix}_{output.name}"
+                arrays[attribute_name] = asarray(getattr(equipment, attribute_name), dtype=float)
+        with NamedTemporaryFile(dir=self.cache_directory, suffix='.tmp', delete=False) as temp_file:
+            savez(temp_file, **arrays)
+        replace(temp_file.name, self._entry_path(key))
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used entries until there are at most ``max_entries``.
+
+        :return: The number of entries removed
+        """
+        entries = []
+        for path in self.entry_paths():
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:  # another process evicted it first
+                pass
+        entries.sort()
+        num_to_remove = max(len(entries) - self.max_entries, 0)
+        for _, path in entries[:num_to_remove]:
+            path.unlink(missing_ok=True)
+        return num_to_remove
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Removes a single entry from the cache.
+
+        :param key: A key from ``cache_key``
+        :return: True if an entry was removed
+        """
+        path = self._entry_path(key)
+        existed = path.exists()
+        path.unlink(missing_ok=True)
+        return existed
+
+    def clear(self) -> int:
+        """
+        Removes every entry from the cache.
+
+        :return: The number of entries removed
+        """
+        entries = self.entry_paths()
+        for path in entries:
+            path.unlink(missing_ok=True)
+        return len(entries)
+
+    def describe(self) -> str:
+        """Returns a one line description of the cache contents and the hit and miss counts of this instance"""
+        entries = self.entry_paths()
+        size_mb = sum(p.stat().st_size for p in entries) / 1e6
+        return (
+            f"Fit cache {self.cache_directory}: {len(entries)} entries ({size_mb:.2f} MB), "
+            f"{self.hits} hits, {self.misses} misses"
+        )
+
+
+def main_fit_cache(args: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point for inspecting and invalidating a fit cache directory.
+
+    :param args: Optional command line argument list, defaulting to sys.argv
+    :return: Process exit code
+    """
+    parser = ArgumentParser(description="Inspect or invalidate an EnergyPlus PET fit cache directory")
+    parser.add_argument('cache_directory', help="The fit cache directory")
+    parser.add_argument('--clear', action='store_true', help="Remove every cached fit")
+    parser.add_argument('--invalidate', nargs='*', default=[], metavar='KEY', help="Remove the cached fits for keys")
+    options = parser.parse_args(args)
+    cache = FitCache(options.cache_directory)
+    if options.clear:
+        print(f"Removed {cache.clear()} cached fits")
+    for key in options.invalidate:
+        print(f"{key}: {'removed' if cache.invalidate(key) else 'not found'}")
+    print(cache.describe())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_fit_cache())
@@ -9,7 +9,7 @@ from tksheet import Sheet
 
 from energyplus_pet.equipment.base import BaseEquipment
 from energyplus_pet.exceptions import EnergyPlusPetException
-from energyplus_pet.units import unit_class_factory, unit_instance_factory
+from energyplus_pet.units import unit_class_factory
 from energyplus_pet.forms.basic_message_form import PetMessageForm
 
 
@@ -280,15 +280,13 @@ to paste/cleanup the data in a spreadsheet, then copy the data and paste directl
                     self.wait_window(pmf)
                     self.cancel()
                     return
-                for r in range(self.table.total_rows()):
-                    if r == 0:
-                        self.table.set_cell_data(r, c, self.columnar[c].preferred_unit_string)
-                    else:
-                        cell_value = float(self.table.data[r][c])
-                        unit_value = unit_instance_factory(cell_value, self.columnar[c].unit_type)
-                        unit_value.units = current_unit_id
-                        unit_value.convert_to_calculation_unit()
-                        self.table.set_cell_data(r, c, unit_value.value)
+                self.table.set_cell_data(0, c, self.columnar[c].preferred_unit_string)
+                # convert the whole column at once, rather than creating a unit value instance per cell
+                converted_values = self.columnar[c].unit_type_class.convert_array_to_calculation_unit(
+                    [float(self.table.data[r][c]) for r in range(1, self.table.total_rows())], current_unit_id
+                )
+                for r, converted_value in enumerate(converted_values.tolist(), start=1):
+                    self.table.set_cell_data(r, c, converted_value)
         self.need_to_conform_units = False
         self.refresh_done_conform_button_text()
 
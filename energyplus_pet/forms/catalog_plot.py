@@ -39,7 +39,7 @@ class CatalogDataPlotForm(Toplevel):
             line_unit_type = eq.headers().unit_array()[col_num]
             dummy_unit_instance = unit_instance_factory(0.0, line_unit_type)
             line_unit_string = dummy_unit_instance.get_unit_string_map()[dummy_unit_instance.calculation_unit_id()]
-            data_vector = [_row[col_num] for _row in cdm.final_data_matrix]
+            data_vector = cdm.column(col_num)
             # could allow x_values to be passed in if we want a specific plot shape
             x_values = list(range(len(data_vector)))
             plot_data.append(
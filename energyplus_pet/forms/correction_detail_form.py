@@ -11,7 +11,7 @@ from energyplus_pet.correction_factor import CorrectionFactor, CorrectionFactorT
 from energyplus_pet.equipment.base import BaseEquipment
 from energyplus_pet.forms.basic_message_form import PetMessageForm
 from energyplus_pet.exceptions import EnergyPlusPetException
-from energyplus_pet.units import unit_class_factory, unit_instance_factory, TemperatureValue, UnitType
+from energyplus_pet.units import unit_class_factory, TemperatureValue
 
 
 class DetailedCorrectionFactorForm(Toplevel):
@@ -347,12 +347,10 @@ The correction factor requires multiplier values for the following {len(_cf.colu
                 self.wait_window(pmf)
                 self.cancel()
                 return
-            for r in range(self.table.total_rows()):
-                cell_value = float(self.table.data[r][0])
-                unit_value = unit_instance_factory(cell_value, self.replacement_column_unit_type)
-                unit_value.units = current_db_unit_id
-                unit_value.convert_to_calculation_unit()
-                self.table.set_cell_data(r, 0, unit_value.value)
+            column_values = [float(self.table.data[r][0]) for r in range(self.table.total_rows())]
+            converted_values = self.unit_type_class.convert_array_to_calculation_unit(column_values, current_db_unit_id)
+            for r, converted_value in enumerate(converted_values.tolist()):
+                self.table.set_cell_data(r, 0, converted_value)
             self._tk_var_replacement_units_string.set(self.preferred_replacement_unit_string)
         elif self.completed_factor.correction_type == CorrectionFactorType.CombinedDbWb:
             db_units_string = self._tk_var_db_units_string.get()
@@ -363,12 +361,10 @@ The correction factor requires multiplier values for the following {len(_cf.colu
                 self.wait_window(pmf)
                 self.cancel()
                 return
-            for r in range(self.table.total_rows()):
-                cell_value = float(self.table.data[r][0])
-                unit_value = unit_instance_factory(cell_value, UnitType.Temperature)
-                unit_value.units = current_db_unit_id
-                unit_value.convert_to_calculation_unit()
-                self.table.set_cell_data(r, 0, unit_value.value)
+            column_values = [float(self.table.data[r][0]) for r in range(self.table.total_rows())]
+            converted_values = TemperatureValue.convert_array_to_calculation_unit(column_values, current_db_unit_id)
+            for r, converted_value in enumerate(converted_values.tolist()):
+                self.table.set_cell_data(r, 0, converted_value)
             self._tk_var_db_units_string.set(self.preferred_db_wb_unit_string)
             wb_units_string = self._tk_var_wb_units_string.get()
             try:
@@ -378,12 +374,10 @@ The correction factor requires multiplier values for the following {len(_cf.colu
                 self.wait_window(pmf)
                 self.cancel()
                 return
-            for r in range(self.table.total_rows()):
-                cell_value = float(self.table.data[r][1])
-                unit_value = unit_instance_factory(cell_value, UnitType.Temperature)
-                unit_value.units = current_wb_unit_id
-                unit_value.convert_to_calculation_unit()
-                self.table.set_cell_data(r, 1, unit_value.value)
+            column_values = [float(self.table.data[r][1]) for r in range(self.table.total_rows())]
+            converted_values = TemperatureValue.convert_array_to_calculation_unit(column_values, current_wb_unit_id)
+            for r, converted_value in enumerate(converted_values.tolist()):
+                self.table.set_cell_data(r, 1, converted_value)
             self._tk_var_wb_units_string.set(self.preferred_db_wb_unit_string)
         self.need_to_conform_units = False
         self._refresh_done_conform_button_text()
@@ -0,0 +1,72 @@
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+
+class GuiDispatcher:
+    """
+    This class carries tasks from background threads to the GUI main thread, without the main thread polling for them.
+
+    A background thread calls ``post`` with a task, which is added to a pending list, and the wake function is called
+    only if no wake-up is already outstanding.  The wake function should signal the GUI event loop, such as with a
+    Tk ``event_generate`` of a virtual event, and the main thread handler of that event calls ``drain`` to run every
+    pending task.  A burst of posts between two drains therefore costs a single wake-up.  Tasks posted with a coalesce
+    key replace any pending task with the same key, keeping its place in line, so a flood of progress updates only
+    ever runs the latest one, while tasks without a key, such as the completion message, always run, in order.
+    """
+
+    def __init__(self, wake: Callable[[], None]):
+        """
+        Create a new dispatcher, with no pending tasks
+
+        :param wake: A function, safe to call from any thread, that makes the main thread call ``drain`` soon
+        """
+        self._wake = wake
+        self._lock = Lock()
+        self._pending: List[Callable[[], None]] = []
+        self._keyed_positions: Dict[str, int] = {}  # the pending list index of the task for each coalesce key
+        self._wake_pending = False
+        self.num_posted = 0
+        self.num_wakes = 0
+
+    def post(self, task: Callable[[], None], coalesce_key: Optional[str] = None) -> None:
+        """
+        Queues a task to run on the main thread; this is safe to call from any thread
+
+        :param task: A function taking no arguments, run on the main thread
+        :param coalesce_key: If given, the task replaces any pending task posted with the same key
+        :return: Nothing, but any exception from the wake function is raised here, with the task still pending
+        """
+        with self._lock:
+            self.num_posted += 1
+            if coalesce_key is not None and coalesce_key in self._keyed_positions:
+                self._pending[self._keyed_positions[coalesce_key]] = task
+            else:
+                if coalesce_key is not None:
+                    self._keyed_positions[coalesce_key] = len(self._pending)
+                self._pending.append(task)
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+            self.num_wakes += 1
+        try:
+            self._wake()
+        except Exception:
+            # clear the flag, otherwise every later post would wait on a wake-up that is never coming
+            with self._lock:
+                self._wake_pending = False
+            raise
+
+    def drain(self) -> int:
+        """
+        Runs every pending task, in the order they were first posted; this must be called on the main thread
+
+        :return: The number of tasks run
+        """
+        with self._lock:
+            tasks = self._pending
+            self._pending = []
+            self._keyed_positions = {}
+            self._wake_pending = False
+        for task in tasks:
+            task()
+        return len(tasks)
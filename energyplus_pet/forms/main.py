@@ -1,15 +1,15 @@
 from platform import system
 from json import dumps
 from pathlib import Path
-from queue import Queue
 from subprocess import check_call
 from threading import Thread
 from tkinter import BOTH, LEFT, RIGHT, TOP, BOTTOM, X, Y  # widget sides and directions to use in widget.pack commands
 from tkinter import END  # key used when adding data to the scrolledText object
-from tkinter import IntVar, StringVar  # GUI variables
+from tkinter import DoubleVar, StringVar  # GUI variables
 from tkinter import NSEW, EW, S  # sticky cardinal directions to use in widget grid commands
 from tkinter import SUNKEN, DISABLED, ACTIVE  # attributes used to modify widget appearance
 from tkinter import Tk, Button, Frame, Label, PhotoImage, scrolledtext, Scrollbar, Menu  # widgets
+from tkinter import TclError  # raised by Tk calls once the window is destroyed
 from tkinter import messagebox, filedialog  # simple dialogs for user messages
 from tkinter.ttk import LabelFrame, Progressbar, Treeview, Separator, Notebook  # ttk widgets
 from webbrowser import open as browser_open
@@ -20,14 +20,15 @@ from energyplus_pet import NAME, NICE_NAME, VERSION
 from energyplus_pet.forms.correction_detail_form import DetailedCorrectionFactorForm
 from energyplus_pet.data_manager import CatalogDataManager
 from energyplus_pet.equipment.base import BaseEquipment
-from energyplus_pet.equipment.manager import EquipmentFactory
 from energyplus_pet.equipment.equip_types import EquipType, EquipTypeUniqueStrings as ETString
 from energyplus_pet.forms.constant_parameters import ConstantParameterEntryForm
 from energyplus_pet.forms.correction_summary_form import CorrectionFactorSummaryForm
+from energyplus_pet.forms.gui_dispatch import GuiDispatcher
 from energyplus_pet.forms.header_preview import RequiredDataPreviewForm
-from energyplus_pet.forms.catalog_plot import CatalogDataPlotForm
-from energyplus_pet.forms.comparison_plot import ComparisonPlot
 from energyplus_pet.forms.base_data_form import MainDataForm
+from energyplus_pet.pipeline import Pipeline
+from energyplus_pet.progress import CancellationToken
+from energyplus_pet.session import load_session, save_session, SESSION_FILE_SUFFIX
 
 
 class EnergyPlusPetWindow(Tk):
@@ -67,9 +68,9 @@ class EnergyPlusPetWindow(Tk):
             else:
                 print(f"Could not set icon for Windows, expecting to find it at {self.icon_path}")
 
-        # setup event listeners
-        self._gui_queue = Queue()
-        self._check_queue()
+        # setup event listeners, background threads wake the main loop with a virtual event rather than it polling
+        self._gui_dispatcher = GuiDispatcher(self._wake_gui_thread)
+        self.bind(self._gui_dispatch_event, self._handle_gui_dispatch)
 
         # define the Tk.Variable instances that will be used to communicate with the GUI widgets
         self._define_tk_variables()
@@ -79,16 +80,33 @@ class EnergyPlusPetWindow(Tk):
         self.update()
         self.minsize(self.winfo_width(), self.winfo_height())
 
-        # set up some important member variables
-        self._equip_instance: BaseEquipment = BaseEquipment()  # sits as a dummy value initially, may not be necessary
-        self._catalog_data_manager = CatalogDataManager()
+        # set up some important member variables, the forms here just collect inputs and hand them to the pipeline
+        self._pipeline = Pipeline()
+        self._equip_instance = BaseEquipment()  # sits as a dummy value initially, may not be necessary
         self._thread_running = False
+        self._cancel_token = CancellationToken()  # replaced with a fresh token for each background generation
+        self._generation_progress_start = 0.0  # the progress bar value when the background generation started
 
         # window setup operations
         self._update_status_bar("Program Initialized")
         self._refresh_gui_state()
         self.bind('<Key>', self._handle_button_pressed)
 
+    @property
+    def _equip_instance(self) -> BaseEquipment:
+        """Returns the equipment instance currently selected in the pipeline"""
+        return self._pipeline.equipment
+
+    @_equip_instance.setter
+    def _equip_instance(self, equip_instance: BaseEquipment) -> None:
+        """Sets the equipment instance in the pipeline directly"""
+        self._pipeline.equipment = equip_instance
+
+    @property
+    def _catalog_data_manager(self) -> CatalogDataManager:
+        """Returns the catalog data manager owned by the pipeline"""
+        return self._pipeline.data_manager
+
     def _handle_button_pressed(self, event):
         # relevant_modifiers
         # mod_shift = 0x1
@@ -107,20 +125,24 @@ class EnergyPlusPetWindow(Tk):
             if self._button_save_data['state'] != DISABLED:
                 self._save_data_to_file()
 
-    def _check_queue(self):
-        """Checks the GUI queue for actions and sets a timer to check again each time"""
-        while True:
-            # noinspection PyBroadException
-            try:
-                task = self._gui_queue.get(block=False)
-                self.after_idle(task)
-            except Exception:
-                break
-        self.after(100, self._check_queue)
+    _gui_dispatch_event = '<<GuiDispatch>>'
+
+    def _wake_gui_thread(self) -> None:
+        """Background thread function to wake the main loop to run the pending GUI tasks"""
+        try:
+            self.event_generate(self._gui_dispatch_event, when='tail')
+        except (TclError, RuntimeError):
+            # TclError if the window was already destroyed, RuntimeError if the main loop is exiting or the interpreter
+            # is shutting down, either way a background thread outlived the GUI, and there is nothing left to update
+            pass
+
+    def _handle_gui_dispatch(self, _event=None) -> None:
+        """Main thread handler of the wake up event, which runs every pending GUI task at once"""
+        self._gui_dispatcher.drain()
 
     def _define_tk_variables(self):
         """Creates and initializes all the Tk.Variable instances used in the GUI for two-way communication"""
-        self._tk_var_progress = IntVar(value=0)
+        self._tk_var_progress = DoubleVar(value=0)  # fractional, so the fitting can report partial steps
         self._tk_var_status_equip = StringVar(value="Selected Equipment: NONE")
         self._tk_var_status_data = StringVar(value="Catalog Data: NOT READY")
         self._tk_var_status_status = StringVar(value="Program Initialized")
@@ -167,6 +189,10 @@ class EnergyPlusPetWindow(Tk):
     def _build_menu(self):
         """Builds out the menubar at the top of thw window"""
         menubar = Menu(self)
+        menu_file = Menu(menubar, tearoff=0)
+        menu_file.add_command(label="Open Session...", command=self._open_session)
+        menu_file.add_command(label="Save Session...", command=self._save_session)
+        menubar.add_cascade(label="File", menu=menu_file)
         menu_help = Menu(menubar, tearoff=0)
         menu_help.add_command(label="Open online documentation...", command=self._help_documentation)
         menu_help.add_command(label="Open examples folder...", command=self._open_examples)
@@ -229,6 +255,10 @@ class EnergyPlusPetWindow(Tk):
         Label(container, text="...and watch the progress here:").pack(side=TOP, padx=3, pady=3)
         self._progress = Progressbar(container, variable=self._tk_var_progress)
         self._progress.pack(side=TOP, padx=3, pady=3, fill=X)
+        self._button_cancel = Button(
+            container, text="Cancel Parameter Generation", command=self._cancel_generation, state=DISABLED
+        )
+        self._button_cancel.pack(side=TOP, padx=3, pady=3, fill=X)
         Separator(container, orient='horizontal').pack(fill=X, padx=3, pady=3)
         Label(container, text="Once complete, use Ctrl-s to save data:").pack(side=TOP, padx=3, pady=3)
         self._button_save_data = Button(
@@ -266,6 +296,7 @@ class EnergyPlusPetWindow(Tk):
 
     def _refresh_gui_state(self):
         """Checks current instance flags and sets button states appropriately"""
+        self._button_cancel['state'] = ACTIVE if self._thread_running and not self._cancel_token.cancelled else DISABLED
         if self._thread_running:
             self._button_engage['state'] = DISABLED
             self._button_catalog['state'] = DISABLED
@@ -334,6 +365,46 @@ class EnergyPlusPetWindow(Tk):
         except Exception as e:  # noqa  any file issue could happen
             messagebox.showerror(self._program_name, "Could not save data to file")
 
+    def _save_session(self):
+        """Saves the current session to a compact binary file that can be reopened later"""
+        if self._thread_running or self._equip_instance is None:
+            messagebox.showwarning(self._program_name, "Select equipment, and wait for any processing, before saving")
+            return
+        file_path = filedialog.asksaveasfilename(
+            parent=self, filetypes=(('Session File', SESSION_FILE_SUFFIX),), defaultextension=SESSION_FILE_SUFFIX,
+            confirmoverwrite=True
+        )
+        if file_path is None or file_path == ():
+            return
+        try:
+            save_session(self._pipeline, file_path)
+        except Exception as e:  # noqa  any file issue could happen
+            messagebox.showerror(self._program_name, f"Could not save session to file: {e}")
+            return
+        self._update_status_bar(f"Saved session to {Path(file_path).name}")
+
+    def _open_session(self):
+        """Replaces the current session with one opened from a session file"""
+        if self._thread_running:
+            return
+        file_path = filedialog.askopenfilename(parent=self, filetypes=(('Session File', SESSION_FILE_SUFFIX),))
+        if file_path is None or file_path == ():
+            return
+        try:
+            self._pipeline = load_session(file_path)
+        except Exception as e:  # noqa  any file or data issue could happen
+            messagebox.showerror(self._program_name, f"Could not open session file: {e}")
+            return
+        if self._pipeline.outputs:
+            self._update_par_box(self._pipeline.outputs['summary'])
+            self._update_idf_box(self._pipeline.outputs['idf'])
+            self._update_json_box(self._pipeline.outputs['epjson'])
+        else:
+            self._update_all_output_boxes('Session opened; run the catalog wizard to generate parameters')
+        self._tk_var_progress.set(0)
+        self._update_status_bar(f"Opened session from {Path(file_path).name}")
+        self._refresh_gui_state()
+
     def _reinitialize(self):
         self._update_all_output_boxes('Messages and results will appear here')
         self._equip_instance = None
@@ -360,12 +431,9 @@ class EnergyPlusPetWindow(Tk):
         potential_new_equip_type = ETString.get_equip_type_from_unique_string(node_tag)
         if not self._catalog_data_manager.data_processed:
             # then we are just selecting a new equip type, select it and move on
-            potential_equip = EquipmentFactory.instance_factory(potential_new_equip_type)
-            if potential_equip is None:
+            if not self._pipeline.select_equipment(potential_new_equip_type).success:
                 messagebox.showwarning("Not Implemented Yet", "This type has not been implemented yet, sorry!")
                 return
-            self._equip_instance = potential_equip
-            self._catalog_data_manager.reset()
             self._tk_var_progress.set(0)
             self._update_status_bar("New Equipment Type Selected")
             self._refresh_gui_state()
@@ -427,7 +495,12 @@ class EnergyPlusPetWindow(Tk):
                 self._update_all_output_boxes('Correction factor form cancelled; reopen wizard to try again')
                 self._tk_var_progress.set(0)
                 return
-            self._catalog_data_manager.add_correction_factor(cfd_form.completed_factor)
+            stage_result = self._pipeline.add_correction_factors([cfd_form.completed_factor])
+            if not stage_result.success:
+                self._update_status_bar('Error adding correction factor')
+                self._update_all_output_boxes(f"Error adding correction! Message: \n\n{stage_result.error_message}")
+                self._tk_var_progress.set(0)
+                return
         self._update_status_bar('Correction factor details complete')
         self._handler_thread_increment()
 
@@ -439,20 +512,19 @@ class EnergyPlusPetWindow(Tk):
             self._update_all_output_boxes('Main catalog data form cancelled; reopen wizard to try again')
             self._tk_var_progress.set(0)
             return
-        self._catalog_data_manager.add_base_data(main_catalog_data_form.final_base_data_rows)
+        stage_result = self._pipeline.add_base_data(main_catalog_data_form.final_base_data_rows)
+        if not stage_result.success:
+            self._update_status_bar('Error adding catalog data')
+            self._update_all_output_boxes(f"Error adding catalog data! Message: \n\n{stage_result.error_message}")
+            self._tk_var_progress.set(0)
+            return
         self._handler_thread_increment()
 
         # then process the base data and correction factors into a full data set
-        response_status = self._catalog_data_manager.apply_correction_factors(
-            self._equip_instance.minimum_data_points_for_generation(),
-            self._equip_instance.headers().get_db_column(),
-            self._equip_instance.headers().get_wb_column()
-        )
-        if response_status == CatalogDataManager.ProcessResult.ERROR:
+        stage_result = self._pipeline.apply_correction_factors()
+        if not stage_result.success:
             self._update_status_bar('Error processing catalog data')
-            self._update_all_output_boxes(
-                f"Error processing data! Message: \n\n{self._catalog_data_manager.last_error_message}"
-            )
+            self._update_all_output_boxes(f"Error processing data! Message: \n\n{stage_result.error_message}")
             self._tk_var_progress.set(0)
             return
         self._handler_thread_increment()
@@ -466,13 +538,19 @@ class EnergyPlusPetWindow(Tk):
                 self._update_all_output_boxes('Constant parameter data form cancelled; reopen wizard to try again')
                 self._tk_var_progress.set(0)
                 return
-            for k, v in cde.parameter_value_map.items():
-                self._equip_instance.set_required_constant_parameter(k, v)
+            stage_result = self._pipeline.set_constant_parameters(cde.parameter_value_map)
+            if not stage_result.success:
+                self._update_status_bar('Error setting constant parameters')
+                self._update_all_output_boxes(f"Error setting parameters! Message: \n\n{stage_result.error_message}")
+                self._tk_var_progress.set(0)
+                return
         self._handler_thread_increment()
 
         # and actually, if the data doesn't have diversity, we should accept it, but not allow creating parameters
         # the user should be able to reopen the wizard and add more data to variables or whatever
         # then display the catalog data plot form for inspection
+        # the plot forms pull in matplotlib, which is slow to import, so they are only imported once they are needed
+        from energyplus_pet.forms.catalog_plot import CatalogDataPlotForm
         cdf = CatalogDataPlotForm(self, self._catalog_data_manager, self._equip_instance)
         cdf.wait_window()
         if cdf.exit_code == CatalogDataPlotForm.ExitCode.CANCEL:
@@ -489,27 +567,34 @@ class EnergyPlusPetWindow(Tk):
 
         # the parameter generation process could be lengthy, so we put it in a background thread
         self._update_status_bar('Starting parameter generation process')
+        self._handler_thread_increment()
+        self._generation_progress_start = self._tk_var_progress.get()
+        self._cancel_token = CancellationToken()
         self._thread_running = True
         self._refresh_gui_state()
-        thd = Thread(target=self._worker_generate_params, args=(self._equip_instance, self._catalog_data_manager))
+        thd = Thread(target=self._worker_generate_params)
         thd.daemon = True
         thd.start()
-        self._handler_thread_increment()
 
-    def _worker_generate_params(self, equip_instance: BaseEquipment, data: CatalogDataManager) -> None:
+    def _worker_generate_params(self) -> None:
         """
-        Function that will be in a background thread, calls the equipment to generate parameters.
-        Equipment instance passed in will be mutated so that when the main thread accesses it, it will be updated.
+        Function that will be in a background thread, runs the pipeline parameter generation and export stages.
+        The pipeline equipment instance will be mutated so that when the main thread accesses it, it will be updated.
 
-        :param equip_instance: An equipment instance constructed by the main form
-        :param data: A fully populated catalog data manager, with final data ready for the equipment to process
         :return: Nothing
         """
-        try:
-            equip_instance.generate_parameters(data, self._callback_thread_increment, self._callback_thread_done)
-        except Exception as e:  # any type of exception
-            self._callback_thread_done(False, "Error occurred! " + str(e))
+        stage_result = self._pipeline.generate_parameters(
+            cancel_token=self._cancel_token, cb_progress_fraction=self._callback_thread_progress
+        )
+        if stage_result.cancelled:
+            self._callback_thread_done(False, 'Parameter generation cancelled; reopen wizard to try again')
             return
+        if stage_result.success:
+            stage_result = self._pipeline.export()
+        if not stage_result.success:
+            self._callback_thread_done(False, f"Error occurred! {stage_result.describe()}")
+            return
+        self._callback_thread_done(True)
 
     def _update_status_bar(self, extra_message: str) -> None:
         """
@@ -528,13 +613,28 @@ class EnergyPlusPetWindow(Tk):
             self._tk_var_status_data.set("Catalog Data: READY")
         self._tk_var_status_status.set(extra_message)
 
+    def _cancel_generation(self) -> None:
+        """Asks the background parameter generation to stop, which it does at its next cancellation check"""
+        self._cancel_token.cancel()
+        self._update_status_bar('Cancelling parameter generation')
+        self._refresh_gui_state()
+
     def _handler_thread_increment(self) -> None:
         """Main thread handler for a progress increment step"""
         self._tk_var_progress.set(self._tk_var_progress.get() + 1)
 
     def _callback_thread_increment(self) -> None:
         """Background thread callback function for inserting a progress increment step in the GUI queue"""
-        self._gui_queue.put(self._handler_thread_increment)
+        self._gui_dispatcher.post(self._handler_thread_increment)
+
+    def _handler_thread_progress(self, fraction: float) -> None:
+        """Main thread handler for a fraction of the parameter generation being done, spread over its progress steps"""
+        steps = self._equip_instance.get_number_of_progress_steps()
+        self._tk_var_progress.set(self._generation_progress_start + fraction * steps)
+
+    def _callback_thread_progress(self, fraction: float) -> None:
+        """Background thread callback function for inserting a parameter generation fraction in the GUI queue"""
+        self._gui_dispatcher.post(lambda: self._handler_thread_progress(fraction), coalesce_key='progress')
 
     def _update_par_box(self, content: str) -> None:
         """
@@ -589,9 +689,10 @@ class EnergyPlusPetWindow(Tk):
         self._refresh_gui_state()
         self._update_status_bar('Finished Parameter Generation')
         if success:
-            self._update_par_box(self._equip_instance.to_parameter_summary())
-            self._update_idf_box(self._equip_instance.to_eplus_idf_object())
-            self._update_json_box(self._equip_instance.to_eplus_epjson_object())
+            self._update_par_box(self._pipeline.outputs['summary'])
+            self._update_idf_box(self._pipeline.outputs['idf'])
+            self._update_json_box(self._pipeline.outputs['epjson'])
+            from energyplus_pet.forms.comparison_plot import ComparisonPlot  # lazy import of matplotlib, see above
             self.wait_window(ComparisonPlot(self, self._catalog_data_manager, self._equip_instance))
             self._tk_var_progress.set(100)
         else:
@@ -599,7 +700,7 @@ class EnergyPlusPetWindow(Tk):
 
     def _callback_thread_done(self, success: bool, err_message: str = '') -> None:
         """Background thread callback function for inserting a progress done step in the GUI queue"""
-        self._gui_queue.put(lambda: self._handler_thread_done(success, err_message))
+        self._gui_dispatcher.post(lambda: self._handler_thread_done(success, err_message))
 
     def run(self) -> None:
         """Executes the Tk main loop to handle all GUI events and update"""
@@ -0,0 +1,320 @@
+from enum import auto, Enum
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Union
+
+from numpy import asarray
+
+from energyplus_pet.correction_factor import CorrectionFactor
+from energyplus_pet.data_manager import CatalogDataManager
+from energyplus_pet.equipment.base import BaseEquipment
+from energyplus_pet.equipment.equip_types import EquipType, EquipTypeUniqueStrings
+from energyplus_pet.equipment.manager import EquipmentFactory
+from energyplus_pet.exceptions import EnergyPlusPetException, OperationCancelled
+from energyplus_pet.fit_cache import FitCache
+from energyplus_pet.profiling import span
+from energyplus_pet.progress import CancellationToken
+
+
+class Pipeline:
+    """
+    This class runs the parameter generation workflow as plain Python, without any GUI.  The stages are the same ones
+    the GUI catalog data wizard walks the user through: select the equipment, add correction factors, add base data,
+    apply the correction factors, set the constant parameters, generate parameters, and export the outputs.
+
+    Each stage is a method that returns a ``StageResult`` with the stage timing and, if something went wrong, a
+    structured error, rather than raising.  The results of every stage run so far are kept in ``stage_results``.
+    Nothing here imports tkinter or matplotlib, so this can be used for batch processing or services, and the GUI just
+    collects the inputs with its forms and hands them to an instance of this class.
+
+    If a ``FitCache`` is given, the generate parameters stage first looks up the catalog in the cache, and only fits
+    on a miss, storing the new results for next time.
+    """
+
+    class Stage(Enum):
+        SelectEquipment = auto()
+        AddCorrectionFactors = auto()
+        AddBaseData = auto()
+        ApplyCorrectionFactors = auto()
+        SetConstantParameters = auto()
+        GenerateParameters = auto()
+        Export = auto()
+
+    class StageResult:
+        """A minimal class for describing the outcome of running one pipeline stage"""
+        def __init__(self, stage: 'Pipeline.Stage', elapsed_seconds: float, error: Optional[Exception] = None):
+            """
+            Constructor for the instance
+
+            :param stage: The Pipeline.Stage that was run
+            :param elapsed_seconds: The wall clock time spent in the stage
+            :param error: The exception that stopped the stage, or None if it was successful
+            """
+            self.stage = stage
+            self.elapsed_seconds = elapsed_seconds
+            self.success = error is None
+            self.cancelled = isinstance(error, OperationCancelled)
+            self.error_type = '' if error is None else type(error).__name__
+            self.error_message = '' if error is None else str(error)
+
+        def describe(self) -> str:
+            """Returns a one line description of this stage result"""
+            status = 'OK' if self.success else f"FAILED ({self.error_type}: {self.error_message})"
+            return f"{self.stage.name}: {status} in {self.elapsed_seconds:.4f} s"
+
+    def __init__(self, fit_cache: Optional[FitCache] = None):
+        """
+        Create a new empty pipeline, with no equipment selected yet
+
+        :param fit_cache: An optional FitCache to look up and store generated parameters
+        """
+        self.equipment: Optional[BaseEquipment] = None
+        self.data_manager = CatalogDataManager()
+        self.stage_results: List[Pipeline.StageResult] = []
+        self.outputs: Dict[str, str] = {}
+        self.constant_parameters: Dict[str, float] = {}
+        self.fit_cache = fit_cache
+        self.fit_cache_hit = False
+
+    def _run_stage(self, stage: Stage, action: Callable[[], None]) -> StageResult:
+        """Runs a single stage action, timing it and capturing any exception into the stage result"""
+        start = perf_counter()
+        error = None
+        try:
+            with span(stage.name):
+                action()
+        except Exception as e:  # any type of exception is reported back as a structured stage error
+            error = e
+        result = Pipeline.StageResult(stage, perf_counter() - start, error)
+        self.stage_results.append(result)
+        return result
+
+    def _require_equipment(self) -> BaseEquipment:
+        """Returns the selected equipment instance, raising if none has been selected yet"""
+        if self.equipment is None:
+            raise EnergyPlusPetException("No equipment has been selected in this pipeline")
+        return self.equipment
+
+    @property
+    def succeeded(self) -> bool:
+        """Returns True if every stage run so far was successful"""
+        return all(r.success for r in self.stage_results)
+
+    @property
+    def first_failure(self) -> Optional[StageResult]:
+        """Returns the first failed stage result, or None if there were no failures"""
+        return next((r for r in self.stage_results if not r.success), None)
+
+    def select_equipment(self, equip_type: Union[EquipType, str]) -> StageResult:
+        """
+        Selects a new equipment type, which also clears out any catalog data from a previous equipment.
+
+        :param equip_type: An EquipType enum value, or an EquipTypeUniqueStrings string
+        :return: A StageResult for this stage
+        """
+        def action():
+            resolved_type = equip_type
+            if isinstance(equip_type, str):
+                resolved_type = EquipTypeUniqueStrings.get_equip_type_from_unique_string(equip_type)
+            equip_instance = EquipmentFactory.instance_factory(resolved_type) if resolved_type is not None else None
+            if equip_instance is None:
+                raise EnergyPlusPetException(f"Unknown or unsupported equipment type: {equip_type}")
+            self.equipment = equip_instance
+            self.data_manager.reset()
+            self.outputs.clear()
+            self.constant_parameters = {}
+            self.fit_cache_hit = False
+
+        return self._run_stage(Pipeline.Stage.SelectEquipment, action)
+
+    def add_correction_factors(self, correction_factors: List[Union[CorrectionFactor, dict]]) -> StageResult:
+        """
+        Checks and adds correction factors to the catalog data, in the order they will be applied.
+
+        :param correction_factors: A list of CorrectionFactor instances, or dictionaries in the form of ``to_dict``
+        :return: A StageResult for this stage
+        """
+        def action():
+            headers = self._require_equipment().headers()
+            for cf in correction_factors:
+                if isinstance(cf, dict):
+                    cf = CorrectionFactor.from_dict(cf)
+                if not cf.check_ok(headers.get_db_column(), headers.get_wb_column()):
+                    raise EnergyPlusPetException(
+                        f"Correction factor {cf.name} is invalid: {'; '.join(cf.check_ok_messages)}"
+                    )
+                self.data_manager.add_correction_factor(cf)
+
+        return self._run_stage(Pipeline.Stage.AddCorrectionFactors, action)
+
+    def add_base_data(self, base_data) -> StageResult:
+        """
+        Adds the base catalog data, in calculation units and equipment header column order.
+
+        :param base_data: A list of data point rows, or a 2D array
+        :return: A StageResult for this stage
+        """
+        def action():
+            num_columns = len(self._require_equipment().headers())
+            data = asarray(base_data, dtype=float)
+            if data.ndim == 2 and data.shape[1] != num_columns:
+                raise EnergyPlusPetException(
+                    f"Base data has {data.shape[1]} columns, but this equipment requires {num_columns}"
+                )
+            self.data_manager.add_base_data(data)
+
+        return self._run_stage(Pipeline.Stage.AddBaseData, action)
+
+    def apply_correction_factors(
+            self, materialize: bool = True, backing_file: Optional[str] = None,
+            cancel_token: Optional[CancellationToken] = None
+    ) -> StageResult:
+        """
+        Expands the base data by the correction factors and checks the final data set for size and diversity.
+
+        :param materialize: Passed through to ``CatalogDataManager.apply_correction_factors``
+        :param backing_file: An optional ``.npy`` file path to hold the expanded data set as a memmap, instead of
+                             holding it in memory, see ``CatalogDataManager.backing_file``.  This only applies to this
+                             call, the data manager's own ``backing_file`` setting is restored afterwards.
+        :param cancel_token: An optional CancellationToken, checked between expansion steps
+        :return: A StageResult for this stage
+        """
+        def action():
+            equip_instance = self._require_equipment()
+            previous_backing_file = self.data_manager.backing_file
+            if backing_file is not None:
+                self.data_manager.backing_file = backing_file
+            try:
+                status = self.data_manager.apply_correction_factors(
+                    equip_instance.minimum_data_points_for_generation(),
+                    equip_instance.headers().get_db_column(),
+                    equip_instance.headers().get_wb_column(),
+                    materialize,
+                    cancel_token
+                )
+            finally:
+                self.data_manager.backing_file = previous_backing_file
+            if status == CatalogDataManager.ProcessResult.ERROR:
+                raise EnergyPlusPetException(self.data_manager.last_error_message)
+
+        return self._run_stage(Pipeline.Stage.ApplyCorrectionFactors, action)
+
+    def set_constant_parameters(self, parameter_values: Dict[str, float]) -> StageResult:
+        """
+        Sets every required constant parameter for the equipment.
+
+        :param parameter_values: A dictionary of values in calculation units, keyed by the required parameter ID
+        :return: A StageResult for this stage, failed if any required parameter is missing
+        """
+        def action():
+            equip_instance = self._require_equipment()
+            for parameter in equip_instance.get_required_constant_parameters():
+                if parameter.id not in parameter_values:
+                    raise EnergyPlusPetException(
+                        f"Missing required constant parameter '{parameter.id}' ({parameter.title})"
+                    )
+                equip_instance.set_required_constant_parameter(parameter.id, float(parameter_values[parameter.id]))
+                self.constant_parameters[parameter.id] = float(parameter_values[parameter.id])
+
+        return self._run_stage(Pipeline.Stage.SetConstantParameters, action)
+
+    def generate_parameters(
+            self, cb_progress_increment: Optional[Callable] = None, chunk_size: Optional[int] = None,
+            cancel_token: Optional[CancellationToken] = None,
+            cb_progress_fraction: Optional[Callable[[float], None]] = None
+    ) -> StageResult:
+        """
+        Generates the equipment parameters from the final catalog data, or restores them from the fit cache.
+        Streamed fits do not keep the per-point arrays, so they are never cached.
+
+        :param cb_progress_increment: An optional callback, called with no arguments at each equipment progress step
+        :param chunk_size: Passed through to ``BaseEquipment.generate_parameters`` to stream the data in chunks
+        :param cancel_token: An optional CancellationToken to stop the fitting part way through, in which case the
+                             stage result is failed, with ``cancelled`` set
+        :param cb_progress_fraction: An optional callback taking the fraction of the fitting done, from 0 to 1
+        :return: A StageResult for this stage
+        """
+        def action():
+            def done(success: bool = True, message: str = '') -> None:
+                if not success:
+                    raise EnergyPlusPetException(f"Parameter generation failed: {message}")
+
+            equip_instance = self._require_equipment()
+            increment = cb_progress_increment or (lambda: None)
+            self.fit_cache_hit = False
+            cache_key = None
+            if self.fit_cache is not None and chunk_size is None:
+                cache_key = FitCache.cache_key(equip_instance, self.data_manager, self.constant_parameters)
+                if self.fit_cache.restore(cache_key, equip_instance):
+                    self.fit_cache_hit = True
+                    for _ in range(equip_instance.get_number_of_progress_steps()):
+                        increment()
+                    if cb_progress_fraction is not None:
+                        cb_progress_fraction(1.0)
+                    return
+            equip_instance.generate_parameters(
+                self.data_manager, increment, done, chunk_size, cancel_token, cb_progress_fraction
+            )
+            if cache_key is not None:
+                self.fit_cache.store(cache_key, equip_instance)
+
+        return self._run_stage(Pipeline.Stage.GenerateParameters, action)
+
+    def export(self) -> StageResult:
+        """
+        Builds the output strings from the generated parameters, stored in ``outputs`` with the keys
+        ``summary``, ``idf``, and ``epjson``.
+
+        :return: A StageResult for this stage
+        """
+        def action():
+            equip_instance = self._require_equipment()
+            outputs = {}
+            with span('to_parameter_summary'):
+                outputs['summary'] = equip_instance.to_parameter_summary()
+            with span('to_eplus_idf_object'):
+                outputs['idf'] = equip_instance.to_eplus_idf_object()
+            with span('to_eplus_epjson_object'):
+                outputs['epjson'] = equip_instance.to_eplus_epjson_object()
+            self.outputs = outputs
+
+        return self._run_stage(Pipeline.Stage.Export, action)
+
+    def run(
+            self, definition: dict, cb_progress_increment: Optional[Callable] = None,
+            cancel_token: Optional[CancellationToken] = None, timeout_seconds: Optional[float] = None
+    ) -> bool:
+        """
+        Runs every stage in order from a catalog definition dictionary, stopping at the first failed stage.  The stage
+        results and outputs of any earlier run on this pipeline are cleared first.
+
+        The definition dictionary has these keys, and all data must already be in calculation units:
+
+        - ``equipment_type``: An ``EquipTypeUniqueStrings`` string, such as ``WAHP_Cooling_CurveFit``
+        - ``constant_parameters``: A dictionary of required constant parameter values, keyed by the parameter ID
+        - ``correction_factors``: An optional list of dictionaries, in the form of ``CorrectionFactor.to_dict``
+        - ``base_data``: The base catalog data as a list of data point rows, in equipment header column order
+
+        :param definition: A catalog definition dictionary, typically read from a JSON file
+        :param cb_progress_increment: An optional callback, called with no arguments at each equipment progress step
+        :param cancel_token: An optional CancellationToken to stop the run part way through the expansion or fitting
+        :param timeout_seconds: If given, and no cancel token is given, the run is cancelled after this many seconds
+        :return: True if every stage succeeded, with the results in ``outputs``, otherwise False, and the details are
+                 available from ``first_failure``
+        """
+        self.stage_results = []  # so succeeded and first_failure only describe this run
+        self.outputs = {}
+        if cancel_token is None and timeout_seconds is not None:
+            cancel_token = CancellationToken(timeout_seconds)
+        stages = [
+            lambda: self.select_equipment(definition.get('equipment_type', '')),
+            lambda: self.add_correction_factors(definition.get('correction_factors', [])),
+            lambda: self.add_base_data(definition.get('base_data', [])),
+            lambda: self.apply_correction_factors(cancel_token=cancel_token),
+            lambda: self.set_constant_parameters(definition.get('constant_parameters', {})),
+            lambda: self.generate_parameters(cb_progress_increment, cancel_token=cancel_token),
+            lambda: self.export(),
+        ]
+        for stage in stages:
+            if not stage().success:
+                return False
+        return True
@@ -0,0 +1,214 @@
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from io import StringIO
+from json import dumps
+from threading import Lock, local
+from time import perf_counter
+import tracemalloc
+from tracemalloc import get_traced_memory, is_tracing, start as start_tracemalloc, stop as stop_tracemalloc
+from typing import Callable, Dict, List, Optional
+
+_ACTIVE_PROFILER: Optional['Profiler'] = None
+# reset_peak was added in Python 3.9; without it only the overall peak memory is reported, not the peak of each span
+_RESET_PEAK: Optional[Callable[[], None]] = getattr(tracemalloc, 'reset_peak', None)
+_NO_SPAN = nullcontext()
+
+
+def span(name: str):
+    """
+    Returns a context manager that times a named section of the workflow on the active profiler.  When no profiler is
+    active this returns a shared do-nothing context, so leaving the spans in hot code costs almost nothing.
+
+    :param name: The span name, such as ``apply_correction_factors``, which is used to group the report totals
+    :return: A context manager to wrap the section in
+    """
+    if _ACTIVE_PROFILER is None:
+        return _NO_SPAN
+    return _ACTIVE_PROFILER.span(name)
+
+
+def profiled(name: str) -> Callable:
+    """
+    Decorates a function so each call to it is recorded as a span on the active profiler.
+
+    :param name: The span name
+    :return: The decorator
+    """
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE_PROFILER is None:
+                return function(*args, **kwargs)
+            with _ACTIVE_PROFILER.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Profiler:
+    """
+    This class collects timing spans, and optionally peak memory and a cProfile function profile, for one run of the
+    parameter generation workflow, and builds a JSON report from them.
+
+    The workflow code calls the module level ``span`` function around each interesting section, which only records
+    anything while a profiler is active, so use an instance as a context manager around the run to activate it.
+    Spans can be nested, and the report lists each span with its depth, start time, duration, and, when memory tracing
+    is enabled, the peak traced memory while the span was open, plus totals for each span name.  The per-span peaks
+    need ``tracemalloc.reset_peak``, from Python 3.9, so on older versions only the overall peak is recorded.
+    """
+
+    class Span:
+        """A minimal class for one recorded span"""
+        def __init__(self, name: str, depth: int, start: float):
+            """
+            Constructor for the instance
+
+            :param name: The span name
+            :param depth: The nesting depth, where zero is a top level span
+            :param start: The start time in seconds, relative to the profiler activation
+            """
+            self.name = name
+            self.depth = depth
+            self.start = start
+            self.seconds = 0.0
+            self.peak_memory_bytes: Optional[int] = None
+
+        def to_dict(self) -> dict:
+            response = {'name': self.name, 'depth': self.depth, 'start': self.start, 'seconds': self.seconds}
+            if self.peak_memory_bytes is not None:
+                response['peak_memory_bytes'] = self.peak_memory_bytes
+            return response
+
+    def __init__(self, trace_memory: bool = False, use_cprofile: bool = False, cprofile_limit: int = 30):
+        """
+        Create a new, inactive profiler
+
+        :param trace_memory: If True, tracemalloc is used to record the peak memory overall, and within each span if
+                             the Python version supports it
+        :param use_cprofile: If True, the whole run is also profiled with cProfile, which is much more intrusive
+        :param cprofile_limit: The number of functions, sorted by cumulative time, to include in the report
+        """
+        self.trace_memory = trace_memory
+        self.use_cprofile = use_cprofile
+        self.cprofile_limit = cprofile_limit
+        self.spans: List[Profiler.Span] = []
+        self.total_seconds = 0.0
+        self.peak_memory_bytes: Optional[int] = None
+        self._cprofile = None  # a cProfile.Profile instance, only while profiling with cProfile
+        self._started_tracemalloc = False
+        self._start_time = 0.0
+        self._lock = Lock()
+        self._thread_state = local()  # each thread nests its own spans
+
+    def __enter__(self) -> 'Profiler':
+        global _ACTIVE_PROFILER
+        self.spans.clear()
+        if self.trace_memory:
+            if not is_tracing():
+                start_tracemalloc()
+                self._started_tracemalloc = True
+            if _RESET_PEAK is not None:
+                _RESET_PEAK()
+        if self.use_cprofile:
+            # cProfile and pstats are only imported when asked for, so importing this module stays cheap
+            from cProfile import Profile
+            self._cprofile = Profile()
+            self._cprofile.enable()
+        self._start_time = perf_counter()
+        _ACTIVE_PROFILER = self
+        return self
+
+    def __exit__(self, *_) -> None:
+        global _ACTIVE_PROFILER
+        _ACTIVE_PROFILER = None
+        self.total_seconds = perf_counter() - self._start_time
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.trace_memory:
+            self.peak_memory_bytes = max(
+                [get_traced_memory()[1]] + [s.peak_memory_bytes for s in self.spans if s.peak_memory_bytes is not None]
+            )
+            if self._started_tracemalloc:
+                stop_tracemalloc()
+                self._started_tracemalloc = False
+
+    @contextmanager
+    def span(self, name: str):
+        """Records one span on this profiler, see the module level ``span`` function"""
+        stack = getattr(self._thread_state, 'stack', None)
+        if stack is None:
+            stack = self._thread_state.stack = []
+        this_span = Profiler.Span(name, len(stack), perf_counter() - self._start_time)
+        with self._lock:
+            self.spans.append(this_span)
+        trace_span_memory = self.trace_memory and _RESET_PEAK is not None
+        if trace_span_memory:
+            # the peak is reset for each span, so the enclosing spans are given the peak so far before it is lost
+            peak_so_far = get_traced_memory()[1]
+            for open_span in stack:
+                open_span.peak_memory_bytes = max(open_span.peak_memory_bytes, peak_so_far)
+            _RESET_PEAK()
+            this_span.peak_memory_bytes = 0
+        stack.append(this_span)
+        start = perf_counter()
+        try:
+            yield this_span
+        finally:
+            this_span.seconds = perf_counter() - start
+            stack.pop()
+            if trace_span_memory:
+                peak = get_traced_memory()[1]
+                this_span.peak_memory_bytes = max(this_span.peak_memory_bytes, peak)
+                for open_span in stack:
+                    open_span.peak_memory_bytes = max(open_span.peak_memory_bytes, peak)
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """Returns the call count, total seconds, and maximum seconds of each span name"""
+        response: Dict[str, Dict[str, float]] = {}
+        for s in self.spans:
+            total = response.setdefault(s.name, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            total['count'] += 1
+            total['seconds'] += s.seconds
+            total['max_seconds'] = max(total['max_seconds'], s.seconds)
+        return response
+
+    def _cprofile_functions(self) -> List[dict]:
+        """Returns the cProfile statistics of the top functions by cumulative time"""
+        from pstats import Stats
+        stats = Stats(self._cprofile, stream=StringIO())
+        entries = []
+        for (file_name, line, function), (_, num_calls, total_time, cumulative_time, _) in stats.stats.items():
+            entries.append({
+                'function': f"{file_name}:{line}({function})",
+                'calls': num_calls,
+                'total_seconds': total_time,
+                'cumulative_seconds': cumulative_time,
+            })
+        entries.sort(key=lambda e: e['cumulative_seconds'], reverse=True)
+        return entries[:self.cprofile_limit]
+
+    def report(self) -> dict:
+        """Returns the whole report as a JSON-compatible dictionary"""
+        response = {
+            'total_seconds': self.total_seconds,
+            'peak_memory_bytes': self.peak_memory_bytes,
+            'totals': self.totals(),
+            'spans': [s.to_dict() for s in self.spans],
+        }
+        if self._cprofile is not None:
+            response['cprofile'] = self._cprofile_functions()
+        return response
+
+    def to_json(self) -> str:
+        """Returns the report as a JSON string"""
+        return dumps(self.report(), indent=2)
+
+    def dump_json(self, file_path: str) -> None:
+        """
+        Writes the report to a JSON file
+
+        :param file_path: The file path to write to
+        :return: Nothing
+        """
+        with open(file_path, 'w') as f:
+            f.write(self.to_json())
@@ -0,0 +1,101 @@
+from threading import Event
+from time import monotonic
+from typing import Callable, Optional
+
+from energyplus_pet.exceptions import OperationCancelled
+
+
+class CancellationToken:
+    """
+    This class lets one thread ask a long running operation on another thread to stop.  The operation calls ``check``
+    between units of work, such as each chunk of expanded rows or each curve fit, which raises ``OperationCancelled``
+    once ``cancel`` has been called, or once the optional timeout has passed, so the operation unwinds cleanly at the
+    next check rather than being killed part way through.
+    """
+
+    def __init__(self, timeout_seconds: Optional[float] = None):
+        """
+        Create a new token, which is not cancelled
+
+        :param timeout_seconds: If given, the token cancels itself this many seconds after being created
+        """
+        self.timeout_seconds = timeout_seconds
+        self._deadline = None if timeout_seconds is None else monotonic() + timeout_seconds
+        self._event = Event()
+        self.reason = ''
+
+    def cancel(self, reason: str = 'Cancelled by user') -> None:
+        """
+        Asks the operation to stop at its next check; this is safe to call from any thread, and more than once
+
+        :param reason: The message of the OperationCancelled exception, only the first reason is kept
+        :return: Nothing
+        """
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Returns True if the token has been cancelled, or the timeout has passed"""
+        if not self._event.is_set() and self._deadline is not None and monotonic() >= self._deadline:
+            self.cancel(f"Timed out after {self.timeout_seconds} seconds")
+        return self._event.is_set()
+
+    def check(self) -> None:
+        """Raises OperationCancelled if the token has been cancelled, or the timeout has passed"""
+        if self.cancelled:
+            raise OperationCancelled(self.reason)
+
+
+def check_cancelled(cancel_token: Optional[CancellationToken]) -> None:
+    """
+    Raises OperationCancelled if a token was given and it has been cancelled, so callers can skip the None check.
+
+    :param cancel_token: An optional CancellationToken
+    :return: Nothing
+    """
+    if cancel_token is not None:
+        cancel_token.check()
+
+
+class ProgressTracker:
+    """
+    This class turns units of work done, such as data rows processed, into a fraction of the whole operation done, and
+    passes it on to a callback.  The callback is only called when the fraction has grown by at least ``min_step``, or
+    reached the end, so a loop over many small chunks does not flood a GUI event queue with updates.
+    """
+
+    def __init__(self, total_work: float, cb_fraction: Optional[Callable[[float], None]], min_step: float = 0.005):
+        """
+        Create a new tracker, with no work done yet
+
+        :param total_work: The total units of work in the operation
+        :param cb_fraction: A callback taking the fraction done, from 0 to 1, or None to just track the work
+        :param min_step: The smallest change in fraction that is reported
+        """
+        self.total_work = max(float(total_work), 1.0)
+        self.work_done = 0.0
+        self._cb_fraction = cb_fraction
+        self._min_step = min_step
+        self._last_reported = 0.0
+
+    @property
+    def fraction(self) -> float:
+        """Returns the fraction of the operation done, from 0 to 1"""
+        return min(self.work_done / self.total_work, 1.0)
+
+    def advance(self, work: float) -> None:
+        """
+        Records more work done, reporting the new fraction if it has grown enough
+
+        :param work: The units of work just done
+        :return: Nothing
+        """
+        self.work_done += work
+        fraction = self.fraction
+        if self._cb_fraction is not None and (
+                fraction - self._last_reported >= self._min_step or (fraction >= 1.0 > self._last_reported)
+        ):
+            self._last_reported = fraction
+            self._cb_fraction(fraction)
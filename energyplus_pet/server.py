@@ -0,0 +1,335 @@
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, JSONDecodeError, loads
+from math import ceil
+from threading import BoundedSemaphore, Lock
+from time import perf_counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from energyplus_pet.fit_cache import FitCache
+from energyplus_pet.pipeline import Pipeline
+
+
+def fit_definition(
+        definition: dict, cache_directory: Optional[str] = None, cache_size: int = 512,
+        timeout_seconds: Optional[float] = None
+) -> dict:
+    """
+    Runs the whole pipeline for one catalog definition.  This is run inside the worker processes, so it never raises,
+    and returns only plain JSON-compatible data, which is cheap to send back to the server process.
+
+    :param definition: A catalog definition dictionary, see ``Pipeline.run`` for the format
+    :param cache_directory: An optional fit cache directory, shared by all the worker processes
+    :param cache_size: The maximum number of entries to keep in the fit cache, a count rather than a byte limit
+    :param timeout_seconds: If given, the fit is cancelled after this many seconds, freeing the worker process
+    :return: A response dictionary with ``success``, and either ``idf``, ``epjson``, ``summary``, and ``metrics``, or
+             an ``error`` message
+    """
+    try:
+        pipeline = Pipeline(FitCache(cache_directory, cache_size) if cache_directory else None)
+        if not pipeline.run(definition, timeout_seconds=timeout_seconds):
+            failure = pipeline.first_failure
+            return {
+                'success': False,
+                'error': f"{failure.stage.name} stage failed: {failure.error_type}: {failure.error_message}",
+            }
+        equipment = pipeline.equipment
+        outputs = {}
+        for output in equipment.curve_fit_outputs():
+            percent_errors = [abs(e) for e in getattr(equipment, f"percent_error_{output.name}") if e == e]
+            outputs[output.name] = {
+                'params': [float(p) for p in getattr(equipment, f"{output.name}_params")],
+                'avg_err': float(getattr(equipment, f"{output.name}_avg_err")),
+                'mean_abs_percent_error': sum(percent_errors) / len(percent_errors) if percent_errors else None,
+                'max_abs_percent_error': max(percent_errors) if percent_errors else None,
+            }
+        return {
+            'success': True,
+            'idf': pipeline.outputs['idf'],
+            'epjson': pipeline.outputs['epjson'],
+            'summary': pipeline.outputs['summary'],
+            'metrics': {
+                'num_data_rows': int(pipeline.data_manager.final_data.shape[0]),
+                'fit_cache_hit': pipeline.fit_cache_hit,
+                'stage_seconds': {r.stage.name: r.elapsed_seconds for r in pipeline.stage_results},
+                'outputs': outputs,
+            },
+        }
+    except Exception as e:  # any type of exception is reported back to the client instead
+        return {'success': False, 'error': f"{type(e).__name__}: {e}"}
+
+
+class FittingService:
+    """
+    This class queues fitting jobs onto a bounded pool of worker processes, and keeps the service metrics.
+
+    At most ``num_workers`` jobs run at once, and at most ``max_queue`` more wait for a worker.  When both are full, new
+    jobs are rejected straight away rather than queued, so a client that sends more than the service can handle gets a
+    quick answer and can retry later, and memory use stays bounded.  A job only frees its slot when it finishes, even
+    if the client stopped waiting for it because of a timeout, but each job is also given the timeout as its own
+    cancellation deadline, so a timed out job stops at its next cancellation check rather than holding the worker.
+    """
+
+    class JobResult:
+        """A minimal class for the outcome of submitting one job"""
+        def __init__(self, status: int, body: dict):
+            """
+            Constructor for the instance
+
+            :param status: The HTTP status code to respond with
+            :param body: The JSON-compatible response body
+            """
+            self.status = status
+            self.body = body
+
+    def __init__(
+            self, num_workers: int = 2, max_queue: int = 16, timeout_seconds: float = 60.0,
+            cache_directory: Optional[str] = None, cache_size: int = 512, latency_window: int = 1000
+    ):
+        """
+        Create a new service, which starts the worker process pool
+
+        :param num_workers: The number of worker processes
+        :param max_queue: The number of jobs allowed to wait for a worker, beyond the ones already running
+        :param timeout_seconds: How long a request waits for its job to finish before giving up
+        :param cache_directory: An optional fit cache directory, shared by all the worker processes
+        :param cache_size: The maximum number of entries to keep in the fit cache, a count rather than a byte limit
+        :param latency_window: The number of most recent requests used for the latency percentiles
+        """
+        self.num_workers = num_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.cache_directory = cache_directory
+        self.cache_size = cache_size
+        self._executor = ProcessPoolExecutor(max_workers=num_workers)
+        self._slots = BoundedSemaphore(num_workers + max_queue)
+        self._lock = Lock()
+        self._pending = 0
+        self._futures: Set[Future] = set()  # the submitted jobs that have not finished, so shutdown can cancel them
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._counts: Dict[str, int] = {'requests': 0, 'succeeded': 0, 'failed': 0, 'rejected': 0, 'timed_out': 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def _job_finished(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._futures.discard(future)
+        self._slots.release()
+
+    def submit(self, definition: dict) -> JobResult:
+        """
+        Runs one fitting job, waiting for the result up to the timeout.
+
+        :param definition: A catalog definition dictionary, see ``Pipeline.run`` for the format
+        :return: A JobResult, with status 200 for a successful fit, 422 for a catalog that could not be fit, 503 if the
+                 queue is full or the worker pool is shut down or broken, or 504 if the job did not finish in time
+        """
+        self._count('requests')
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            return FittingService.JobResult(503, {'success': False, 'error': 'Fitting queue is full, retry later'})
+        start = perf_counter()
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(
+                fit_definition, definition, self.cache_directory, self.cache_size, self.timeout_seconds
+            )
+        except RuntimeError as e:  # the pool is shut down, or broken (BrokenProcessPool is a RuntimeError)
+            self._job_finished(None)  # no future will ever call back, so give the slot back here
+            self._count('rejected')
+            return FittingService.JobResult(
+                503, {'success': False, 'error': f"Fitting workers are unavailable: {type(e).__name__}: {e}"}
+            )
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._job_finished)
+        try:
+            response = future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()  # this only helps if the job is still queued, a running job stops at its own deadline
+            self._count('timed_out')
+            response = None
+        except Exception as e:  # the worker process itself died
+            response = {'success': False, 'error': f"Worker failure: {type(e).__name__}: {e}"}
+        elapsed = perf_counter() - start
+        with self._lock:
+            self._latencies.append(elapsed)
+        if response is None:
+            return FittingService.JobResult(
+                504, {'success': False, 'error': f"Fit did not finish within {self.timeout_seconds} seconds"}
+            )
+        response['elapsed_seconds'] = elapsed
+        self._count('succeeded' if response['success'] else 'failed')
+        return FittingService.JobResult(200 if response['success'] else 422, response)
+
+    @staticmethod
+    def percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+        """
+        Returns the nearest-rank percentile of a sorted list.
+
+        :param sorted_values: The values, sorted ascending
+        :param percent: The percentile, between 0 and 100
+        :return: The percentile value, or None if there are no values
+        """
+        if not sorted_values:
+            return None
+        rank = max(1, ceil(percent / 100.0 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    def metrics(self) -> dict:
+        """Returns the request counts, the current queue state, and the recent request latency percentiles"""
+        with self._lock:
+            counts = dict(self._counts)
+            latencies = sorted(self._latencies)
+            pending = self._pending
+        return {
+            **counts,
+            'pending': pending,
+            'num_workers': self.num_workers,
+            'max_queue': self.max_queue,
+            'latency_seconds': {
+                'count': len(latencies),
+                'p50': self.percentile(latencies, 50),
+                'p90': self.percentile(latencies, 90),
+                'p99': self.percentile(latencies, 99),
+                'max': latencies[-1] if latencies else None,
+            },
+        }
+
+    def shutdown(self) -> None:
+        """Stops the worker process pool, cancelling any queued jobs"""
+        # this cancels the queued jobs itself, since the shutdown cancel_futures argument is new in Python 3.9
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+
+class FittingRequestHandler(BaseHTTPRequestHandler):
+    """
+    This class handles the HTTP requests of a ``FittingServer``.  ``POST /fit`` takes a catalog definition JSON body,
+    as described in ``Pipeline.run``, and responds with the IDF, epJSON, summary, and fit metrics.  ``GET /metrics``
+    responds with the service metrics, and ``GET /health`` just responds that the server is up.
+    """
+
+    server: 'FittingServer'
+
+    def _respond(self, status: int, body: dict, extra_headers: Tuple[Tuple[str, str], ...] = ()) -> None:
+        payload = dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in extra_headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:  # noqa: N802, the name is required by BaseHTTPRequestHandler
+        if self.path == '/metrics':
+            self._respond(200, self.server.service.metrics())
+        elif self.path == '/health':
+            self._respond(200, {'status': 'ok'})
+        else:
+            self._respond(404, {'success': False, 'error': f"Unknown path {self.path}"})
+
+    def do_POST(self) -> None:  # noqa: N802, the name is required by BaseHTTPRequestHandler
+        if self.path != '/fit':
+            self._respond(404, {'success': False, 'error': f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._respond(400, {'success': False, 'error': "Content-Length header is not a valid length"})
+            return
+        if length > self.server.max_request_bytes:
+            message = f"Request body is larger than {self.server.max_request_bytes} bytes"
+            self._respond(413, {'success': False, 'error': message})
+            return
+        try:
+            definition = loads(self.rfile.read(length))
+        except (JSONDecodeError, UnicodeDecodeError) as e:
+            self._respond(400, {'success': False, 'error': f"Request body is not valid JSON: {e}"})
+            return
+        if not isinstance(definition, dict):
+            self._respond(400, {'success': False, 'error': "Request body must be a JSON object"})
+            return
+        job_result = self.server.service.submit(definition)
+        extra_headers = (('Retry-After', '1'),) if job_result.status == 503 else ()
+        self._respond(job_result.status, job_result.body, extra_headers)
+
+    def log_message(self, message_format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(message_format, *args)
+
+
+class FittingServer(ThreadingHTTPServer):
+    """
+    This class is the HTTP server of the fitting service.  Each request is handled on its own thread, which just waits
+    on the ``FittingService`` worker processes, so the fitting itself never blocks the server.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+            self, service: FittingService, host: str = '127.0.0.1', port: int = 0,
+            max_request_bytes: int = 64 * 1024 * 1024, verbose: bool = False
+    ):
+        """
+        Create a new server, bound and listening, but not yet serving; call ``serve_forever`` to start
+
+        :param service: The FittingService to run jobs on
+        :param host: The host address to bind, which defaults to localhost only
+        :param port: The port to bind, where zero picks any free port, available from ``server_address`` after
+        :param max_request_bytes: Request bodies larger than this are rejected
+        :param verbose: If True, each request is logged to stderr
+        """
+        super().__init__((host, port), FittingRequestHandler)
+        self.service = service
+        self.max_request_bytes = max_request_bytes
+        self.verbose = verbose
+
+
+def main_server(args: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point for running the fitting service.
+
+    :param args: Optional command line argument list, defaulting to sys.argv
+    :return: Process exit code
+    """
+    parser = ArgumentParser(description="Serve EnergyPlus PET parameter generation over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="Host address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    parser.add_argument('--workers', type=int, default=2, help="Number of worker processes")
+    parser.add_argument('--max-queue', type=int, default=16, help="Number of jobs allowed to wait for a worker")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Seconds a request waits for its fit")
+    parser.add_argument('--cache-dir', default=None, help="Fit cache directory, so unchanged catalogs are not refit")
+    parser.add_argument('--cache-size', type=int, default=512, help=(
+        "Maximum number of cached fits to keep; this is a count, not a size limit, and each entry grows with the "
+        "expanded catalog size"
+    ))
+    parser.add_argument('--verbose', action='store_true', help="Log each request")
+    options = parser.parse_args(args)
+    service = FittingService(options.workers, options.max_queue, options.timeout, options.cache_dir, options.cache_size)
+    server = FittingServer(service, options.host, options.port, verbose=options.verbose)
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_server())
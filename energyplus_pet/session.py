@@ -0,0 +1,115 @@
+from json import dumps, loads
+from pathlib import Path
+from typing import Optional
+from zipfile import BadZipFile
+
+from numpy import asarray, frombuffer, load, savez_compressed, uint8
+
+from energyplus_pet.exceptions import EnergyPlusPetException
+from energyplus_pet.fit_cache import FitCache
+from energyplus_pet.pipeline import Pipeline
+
+# bump this whenever the layout of the session file changes in a way older readers could not handle
+SESSION_FORMAT_VERSION = 1
+SESSION_FILE_SUFFIX = '.npz'
+# the metadata entries every session file has, whatever state the pipeline was saved in
+SESSION_METADATA_KEYS = ('equipment_type', 'constant_parameters', 'correction_factors', 'data_processed', 'fitted')
+
+
+def save_session(pipeline: Pipeline, file_path: str) -> None:
+    """
+    Saves a pipeline session to a compressed NumPy ``.npz`` container, which can be restored with ``load_session``.
+
+    The base data and the generated coefficients and errors are stored as binary float arrays.  The equipment type,
+    constant parameters, and correction factor definitions are small, so they are stored together as a JSON metadata
+    entry inside the same container.  The expanded final data set, and the catalog, predicted, and percent error
+    arrays, are as large as the expanded catalog and are fully determined by the other entries, so they are left out,
+    and recomputed on load.
+
+    :param pipeline: The pipeline to save, which should at least have equipment selected
+    :param file_path: The file path to write to, which should end with ``.npz`` or NumPy will append it
+    :return: Nothing
+    """
+    equipment = pipeline.equipment
+    if equipment is None:
+        raise EnergyPlusPetException("No equipment has been selected, so there is no session to save")
+    fitted = bool(pipeline.outputs)
+    metadata = {
+        'format_version': SESSION_FORMAT_VERSION,
+        'equipment_type': equipment.this_type().name,
+        'constant_parameters': pipeline.constant_parameters,
+        'correction_factors': [cf.to_dict() for cf in pipeline.data_manager.correction_factors],
+        'data_processed': pipeline.data_manager.data_processed,
+        'fitted': fitted,
+    }
+    # stored as raw bytes rather than a string or object array, so loading never needs pickle
+    arrays = {
+        'metadata': frombuffer(dumps(metadata).encode('utf-8'), dtype=uint8),
+        'base_data': pipeline.data_manager.base_data,
+    }
+    if fitted:
+        for output in equipment.curve_fit_outputs():
+            arrays[f"params_{output.name}"] = asarray(getattr(equipment, f"{output.name}_params"), dtype=float)
+            arrays[f"avg_err_{output.name}"] = asarray(getattr(equipment, f"{output.name}_avg_err"), dtype=float)
+    savez_compressed(file_path, **arrays)
+
+
+def load_session(file_path: str, fit_cache: Optional[FitCache] = None) -> Pipeline:
+    """
+    Restores a pipeline session saved with ``save_session``.  The stages are replayed in order, the correction factors
+    are reapplied to recompute the final data set, and if the session had been fit, the saved coefficients are
+    restored and evaluated at the catalog data points, and the outputs exported, without fitting again.
+
+    :param file_path: The session file path
+    :param fit_cache: An optional FitCache for the restored pipeline to use for later fits
+    :return: A new Pipeline instance in the same state as the saved one
+    """
+    if not Path(file_path).exists():
+        raise EnergyPlusPetException(f"Session file does not exist: {file_path}")
+    try:
+        with load(file_path, allow_pickle=False) as container:
+            arrays = {name: container[name] for name in container.files}
+        if 'metadata' not in arrays or 'base_data' not in arrays:
+            raise EnergyPlusPetException(f"File {file_path} is not a session, it has no metadata or base data")
+        metadata = loads(arrays['metadata'].tobytes().decode('utf-8'))
+    except (OSError, ValueError, BadZipFile, EOFError) as e:  # corrupt, truncated, or not a NumPy container at all
+        raise EnergyPlusPetException(f"Could not read session file {file_path}: {type(e).__name__}: {e}") from e
+    if not isinstance(metadata, dict):
+        raise EnergyPlusPetException(f"Session file {file_path} metadata is not a JSON object")
+    if metadata.get('format_version', 0) > SESSION_FORMAT_VERSION:
+        raise EnergyPlusPetException(
+            f"Session file format version {metadata['format_version']} is newer than this version can read"
+        )
+    missing_keys = [k for k in SESSION_METADATA_KEYS if k not in metadata]
+    if missing_keys:
+        raise EnergyPlusPetException(f"Session file {file_path} metadata is missing {', '.join(missing_keys)}")
+    pipeline = Pipeline(fit_cache)
+    stages = [lambda: pipeline.select_equipment(metadata['equipment_type'])]
+    if metadata['correction_factors']:
+        stages.append(lambda: pipeline.add_correction_factors(metadata['correction_factors']))
+    if arrays['base_data'].size > 0:
+        stages.append(lambda: pipeline.add_base_data(arrays['base_data']))
+    if metadata['data_processed']:
+        stages.append(lambda: pipeline.apply_correction_factors())
+    if metadata['constant_parameters']:
+        stages.append(lambda: pipeline.set_constant_parameters(metadata['constant_parameters']))
+    for stage in stages:
+        stage_result = stage()
+        if not stage_result.success:
+            raise EnergyPlusPetException(f"Could not restore session from {file_path}: {stage_result.describe()}")
+    if metadata['fitted']:
+        equipment = pipeline.equipment
+        missing_arrays = [
+            name for output in equipment.curve_fit_outputs()
+            for name in (f"params_{output.name}", f"avg_err_{output.name}") if name not in arrays
+        ]
+        if missing_arrays:
+            raise EnergyPlusPetException(f"Session file {file_path} is missing {', '.join(missing_arrays)}")
+        for output in equipment.curve_fit_outputs():
+            setattr(equipment, f"{output.name}_params", arrays[f"params_{output.name}"].tolist())
+            setattr(equipment, f"{output.name}_avg_err", float(arrays[f"avg_err_{output.name}"]))
+        equipment.evaluate_generated_parameters(pipeline.data_manager.final_data)
+        stage_result = pipeline.export()
+        if not stage_result.success:
+            raise EnergyPlusPetException(f"Could not restore session from {file_path}: {stage_result.describe()}")
+    return pipeline
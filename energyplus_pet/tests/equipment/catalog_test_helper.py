@@ -0,0 +1,54 @@
+from numpy import arange
+
+from energyplus_pet.correction_factor import CorrectionFactor, CorrectionFactorType
+from energyplus_pet.equipment.base import BaseEquipment
+from energyplus_pet.equipment.common_curves import CommonCurves
+from energyplus_pet.equipment.equip_types import EquipType
+from energyplus_pet.equipment.manager import EquipmentFactory
+
+
+def wwhp_heating_definition(sku: str) -> dict:
+    """Returns a small water to water heat pump heating catalog definition, in the ``Pipeline.run`` format"""
+    base_data = []
+    for i in range(8):
+        load_temp, source_temp, load_flow, source_flow = 30.0 + i, 5.0 + (i % 3), 0.001 * (1 + i % 2), 0.002
+        capacity = 10000.0 + 100.0 * load_temp - 150.0 * source_temp + 2e6 * load_flow
+        power = 3000.0 + 40.0 * load_temp + 20.0 * source_temp + 1e5 * load_flow
+        base_data.append([load_temp, source_temp, load_flow, source_flow, capacity, power])
+    cf = CorrectionFactor('source_flow')
+    cf.correction_type = CorrectionFactorType.Multiplier
+    cf.num_corrections = 2
+    cf.base_column_index = 3
+    cf.base_correction = [0.8, 1.2]
+    cf.columns_to_modify = [4, 5]
+    cf.mod_correction_data_column_map = {4: [0.97, 1.02], 5: [1.01, 0.99]}
+    return {
+        'sku': sku,
+        'equipment_type': 'WWHP_Heating_CurveFit',
+        'constant_parameters': {'vl': 0.0015, 'vs': 0.002, 'qc': 14000.0, 'cp': 4500.0},
+        'correction_factors': [cf.to_dict()],
+        'base_data': base_data,
+    }
+
+
+def equipment_with_results(equip_type: EquipType, offset: float = 0.0) -> BaseEquipment:
+    """
+    Returns an equipment instance with the default constant parameters and made up generated results, without any
+    fitting, for tests of the code that only consumes the generated results.
+
+    :param equip_type: The type of equipment to create
+    :param offset: Added to every made up coefficient, so different whole number offsets give different curves
+    :return: An equipment instance that looks like parameters have already been generated
+    """
+    equipment = EquipmentFactory.instance_factory(equip_type)
+    for parameter in equipment.get_required_constant_parameters():
+        equipment.set_required_constant_parameter(parameter.id, parameter.default_value)
+    for i, output in enumerate(equipment.curve_fit_outputs()):
+        num_coefficients = 6 if output.eval_function is CommonCurves.heat_pump_6_coefficient_curve else 5
+        setattr(equipment, f"{output.name}_params", [offset + 0.01 * i + 0.1 * c for c in range(num_coefficients)])
+        setattr(equipment, f"{output.name}_avg_err", 0.01 * (i + 1))
+        catalog = arange(1.0, 5.0)
+        setattr(equipment, f"catalog_{output.name}", catalog)
+        setattr(equipment, f"predicted_{output.name}", catalog * 1.01)
+        setattr(equipment, f"percent_error_{output.name}", catalog * 0.0 + 1.0)
+    return equipment
@@ -1,10 +1,25 @@
 from unittest import TestCase
+from unittest.mock import patch
 
+from numpy import column_stack, exp, isnan
+
+from energyplus_pet.equipment.common_curves import CommonCurves
 from energyplus_pet.equipment.equip_types import EquipType
 from energyplus_pet.equipment.base import BaseEquipment
+from energyplus_pet.exceptions import EnergyPlusPetException
+from energyplus_pet.pipeline import Pipeline
+from energyplus_pet.tests.equipment.catalog_test_helper import wwhp_heating_definition
 
 
 class TestBaseEquipmentFunctions(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # one fitted catalog, shared by the tests of the fit diagnostics, none of which change the fit
+        cls.pipeline = Pipeline()
+        if not cls.pipeline.run(wwhp_heating_definition('A')):
+            raise EnergyPlusPetException("Could not fit the shared test catalog")
+
     def test_a(self):
         eq = BaseEquipment()
         self.assertEqual(eq.this_type(), EquipType.InvalidType)
@@ -16,4 +31,127 @@ class TestBaseEquipmentFunctions(TestCase):
 """
         output = eq.fill_eplus_object_format(object_name, fields)
         self.assertEqual(expected, output)
+        fields = [('Name', 'A Much Longer Coil Name Value'), ('Exactly Fourteen', 'x' * 14), ('Blank', ''), ('N', -1.5)]
+        expected = """Object,
+    A Much Longer Coil Name Value,  !-Name
+    xxxxxxxxxxxxxx,  !-Exactly Fourteen
+    ,                !-Blank
+    -1.5;            !-N
+"""
+        self.assertEqual(expected, eq.fill_eplus_object_format(object_name, fields))
+        expected = "Object,\n    1;               !-Only\n"
+        self.assertEqual(expected, eq.fill_eplus_object_format(object_name, [('Only', 1)]))
         self.assertIsInstance(eq.get_extra_regression_metrics(), tuple)
+
+    def test_linear_and_nonlinear_curve_fits(self):
+        x_1 = [0.8, 0.9, 1.0, 1.1, 1.2, 0.85, 0.95, 1.05]
+        x_2 = [1.0, 1.2, 0.9, 1.1, 0.8, 1.15, 1.05, 0.95]
+        x_3 = [1.1, 0.9, 1.0, 0.8, 1.2, 1.05, 0.85, 0.95]
+        x_4 = [0.9, 1.0, 1.1, 1.2, 0.8, 0.95, 1.15, 1.05]
+        y = [1.0 + 2.0 * a + 3.0 * b - 1.0 * c + 0.5 * d for a, b, c, d in zip(x_1, x_2, x_3, x_4)]
+        params, avg_err = BaseEquipment.do_one_curve_fit(
+            CommonCurves.heat_pump_5_coefficient_curve, (x_1, x_2, x_3, x_4), y
+        )
+        self.assertIsInstance(params, list)
+        [self.assertAlmostEqual(e, c, 6) for e, c in zip([1.0, 2.0, 3.0, -1.0, 0.5], params)]
+        self.assertAlmostEqual(0.0, avg_err, 6)
+
+        # a curve that is not linear in its coefficients should still be solved through the iterative fallback
+        def exponential_curve(x, a, b):
+            return a * exp(b * x[0])
+
+        y = [2.0 * exp(0.5 * a) for a in x_1]
+        params, _ = BaseEquipment.do_one_curve_fit(exponential_curve, (x_1,), y)
+        [self.assertAlmostEqual(e, c, 4) for e, c in zip([2.0, 0.5], params)]
+
+    def test_eval_linear_curve_at_points(self):
+        x_1 = [0.8, 0.9, 1.0, 1.1]
+        x_2 = [1.0, 1.2, 0.9, 1.1]
+        params = [0.5, 1.5, -0.25]
+        catalog = [20.0, 0.0, 22.0, 25.0]
+        predicted, percent_error = BaseEquipment.eval_linear_curve_at_points(
+            column_stack((x_1, x_2)), params, 10.0, catalog
+        )
+        looped_predicted, looped_percent_error = BaseEquipment.eval_curve_at_points(
+            lambda x, a, b, c: 10.0 * (a + b * x[0] + c * x[1]), (x_1, x_2), params, catalog
+        )
+        [self.assertAlmostEqual(e, c, 10) for e, c in zip(looped_predicted, predicted)]
+        # a zero catalog value has an undefined percent error, and should come back as NaN in both versions
+        self.assertTrue(isnan(percent_error[1]))
+        self.assertTrue(isnan(looped_percent_error[1]))
+        for i in [0, 2, 3]:
+            self.assertAlmostEqual(looped_percent_error[i], percent_error[i], 10)
+
+    def test_batched_curve_fits_match_individual_fits(self):
+        x_1 = [0.8, 0.9, 1.0, 1.1, 1.2, 0.85, 0.95, 1.05]
+        x_2 = [1.0, 1.2, 0.9, 1.1, 0.8, 1.15, 1.05, 0.95]
+        x_3 = [1.1, 0.9, 1.0, 0.8, 1.2, 1.05, 0.85, 0.95]
+        x_4 = [0.9, 1.0, 1.1, 1.2, 0.8, 0.95, 1.15, 1.05]
+        y_a = [1.0 + 2.0 * a + 3.0 * b - 1.0 * c + 0.5 * d + 0.01 * (-1) ** i
+               for i, (a, b, c, d) in enumerate(zip(x_1, x_2, x_3, x_4))]
+        y_b = [0.2 - 1.0 * a + 0.5 * b + 1.5 * c - 0.25 * d for a, b, c, d in zip(x_1, x_2, x_3, x_4)]
+        curve = CommonCurves.heat_pump_5_coefficient_curve
+        batched = BaseEquipment.do_curve_fits(curve, column_stack((x_1, x_2, x_3, x_4)), [y_a, y_b])
+        self.assertEqual(2, len(batched))
+        for y, (batched_params, batched_err) in zip([y_a, y_b], batched):
+            params, avg_err = BaseEquipment.do_one_curve_fit(curve, (x_1, x_2, x_3, x_4), y)
+            [self.assertAlmostEqual(e, c, 10) for e, c in zip(params, batched_params)]
+            self.assertAlmostEqual(avg_err, batched_err, 10)
+
+    def test_bootstrap_confidence_intervals(self):
+        pipeline = self.pipeline
+        equipment = pipeline.equipment
+        results = equipment.bootstrap_confidence_intervals(pipeline.data_manager, 200, 0.9, seed=5)
+        self.assertEqual({output.name for output in equipment.curve_fit_outputs()}, set(results))
+        num_points = pipeline.data_manager.final_data.shape[0]
+        for output in equipment.curve_fit_outputs():
+            result = results[output.name]
+            self.assertEqual(200, result.num_resamples)
+            self.assertEqual(0.9, result.confidence)
+            self.assertTrue((result.params_lower <= result.params_upper).all())
+            self.assertTrue((result.params_std >= 0.0).all())
+            self.assertEqual((num_points,), result.prediction_lower.shape)
+            self.assertTrue((result.prediction_lower <= result.prediction_upper).all())
+            predicted = getattr(equipment, f"predicted_{output.name}")
+            # the fitted curve sits inside its own bootstrap band, allowing for round-off where the band is very thin
+            self.assertTrue((result.prediction_lower <= predicted + 1e-6 * abs(predicted)).all())
+            self.assertTrue((predicted - 1e-6 * abs(predicted) <= result.prediction_upper).all())
+        same = equipment.bootstrap_confidence_intervals(pipeline.data_manager, 200, 0.9, seed=5)
+        first_output = equipment.curve_fit_outputs()[0].name
+        self.assertEqual(results[first_output].params_lower.tolist(), same[first_output].params_lower.tolist())
+        with self.assertRaises(EnergyPlusPetException):
+            equipment.bootstrap_confidence_intervals(pipeline.data_manager, confidence=1.5)
+
+    def test_cross_validate(self):
+        pipeline = self.pipeline
+        equipment = pipeline.equipment
+        params_before = equipment.total_capacity_params
+        results = equipment.cross_validate(pipeline.data_manager, 4, seed=2)
+        self.assertEqual(params_before, equipment.total_capacity_params)
+        num_points = pipeline.data_manager.final_data.shape[0]
+        for output in equipment.curve_fit_outputs():
+            result = results[output.name]
+            self.assertEqual(4, result.num_folds)
+            self.assertEqual(4, len(result.fold_rmse))
+            self.assertEqual((num_points,), result.held_out_predictions.shape)
+            self.assertGreaterEqual(result.max_abs_error, result.rmse)
+            self.assertGreaterEqual(result.rmse, abs(result.bias))
+            # held out points are predicted worse than the training points, which the fit has already seen
+            training_rmse = (((getattr(equipment, f"predicted_{output.name}") - getattr(
+                equipment, f"catalog_{output.name}"
+            )) ** 2).mean()) ** 0.5
+            self.assertGreater(result.rmse, training_rmse)
+
+        # wrapping the linear curve makes it look nonlinear, so the scipy fallback should give the same results
+        def wrapped_curve(x, a, b, c, d, e):
+            return CommonCurves.heat_pump_5_coefficient_curve(x, a, b, c, d, e)
+
+        linear_outputs = equipment.curve_fit_outputs()
+        for output in linear_outputs:
+            output.eval_function = wrapped_curve
+        with patch.object(equipment, 'curve_fit_outputs', lambda: linear_outputs):
+            nonlinear_results = equipment.cross_validate(pipeline.data_manager, 4, seed=2, max_workers=1)
+        for output in linear_outputs:
+            self.assertAlmostEqual(results[output.name].rmse, nonlinear_results[output.name].rmse, delta=1e-3)
+        with self.assertRaises(EnergyPlusPetException):
+            equipment.cross_validate(pipeline.data_manager, 1)
@@ -0,0 +1,107 @@
+from unittest import TestCase
+
+from numpy import array, column_stack, diag, inf, linspace, ones, sqrt
+from scipy.optimize import curve_fit
+
+from energyplus_pet.equipment.common_curves import CommonCurves
+from energyplus_pet.equipment.linear_fit import BootstrapLinearFit, LinearLeastSquares, NormalEquationAccumulator
+from energyplus_pet.exceptions import EnergyPlusPetException
+
+
+class TestLinearLeastSquares(TestCase):
+
+    @staticmethod
+    def _noisy_data():
+        x_1 = linspace(0.8, 1.2, 20)
+        x_2 = array([1.0, 1.1, 0.9, 1.05] * 5)
+        noise = array([0.01, -0.02, 0.015, -0.005] * 5)
+        y_a = 1.0 + 2.0 * x_1 + 3.0 * x_2 + noise
+        y_b = -0.5 + 0.25 * x_1 - 1.5 * x_2 - noise
+        return x_1, x_2, y_a, y_b
+
+    def test_matches_scipy_curve_fit(self):
+        x_1, x_2, y_a, _ = self._noisy_data()
+
+        def curve(x, a, b, c):
+            return a + b * x[0] + c * x[1]
+
+        scipy_params, scipy_covariance = curve_fit(curve, (x_1, x_2), y_a)
+        solver = LinearLeastSquares(column_stack((ones(20), x_1, x_2)))
+        params, avg_err = solver.solve(y_a)
+        [self.assertAlmostEqual(e, c, 6) for e, c in zip(scipy_params, params)]
+        self.assertAlmostEqual(sqrt(diag(scipy_covariance)).mean(), avg_err, 6)
+        self.assertEqual(3, solver.rank)
+
+    def test_multiple_outputs_in_one_solve(self):
+        x_1, x_2, y_a, y_b = self._noisy_data()
+        solver = LinearLeastSquares(column_stack((ones(20), x_1, x_2)))
+        params, avg_err = solver.solve(column_stack((y_a, y_b)))
+        self.assertEqual((3, 2), params.shape)
+        self.assertEqual((2,), avg_err.shape)
+        params_a, avg_err_a = solver.solve(y_a)
+        params_b, avg_err_b = solver.solve(y_b)
+        [self.assertAlmostEqual(e, c, 10) for e, c in zip(params_a, params[:, 0])]
+        [self.assertAlmostEqual(e, c, 10) for e, c in zip(params_b, params[:, 1])]
+        self.assertAlmostEqual(avg_err_a, avg_err[0], 10)
+        self.assertAlmostEqual(avg_err_b, avg_err[1], 10)
+
+    def test_exact_fit_cannot_estimate_error(self):
+        design = CommonCurves.linear_design_matrix(column_stack(([1.0, 2.0], [3.0, 5.0])))
+        self.assertEqual((2, 3), design.shape)
+        params, avg_err = LinearLeastSquares(design).solve([1.0, 2.0])
+        self.assertEqual(3, len(params))
+        self.assertEqual(inf, avg_err)
+
+    def test_bad_design_matrix(self):
+        with self.assertRaises(EnergyPlusPetException):
+            LinearLeastSquares(array([1.0, 2.0, 3.0]))
+
+
+class TestNormalEquationAccumulator(TestCase):
+
+    def test_chunked_accumulation_matches_factored_solve(self):
+        x_1, x_2, y_a, y_b = TestLinearLeastSquares._noisy_data()
+        design = column_stack((ones(20), x_1, x_2))
+        dependent = column_stack((y_a, y_b))
+        expected_params, expected_err = LinearLeastSquares(design).solve(dependent)
+        accumulator = NormalEquationAccumulator(3, 2)
+        for start in range(0, 20, 7):
+            accumulator.add(design[start:start + 7], dependent[start:start + 7])
+        self.assertEqual(20, accumulator.num_points)
+        params, avg_err = accumulator.solve()
+        [self.assertAlmostEqual(e, c, 8) for e, c in zip(expected_params.ravel(), params.ravel())]
+        [self.assertAlmostEqual(e, c, 6) for e, c in zip(expected_err, avg_err)]
+        expected_ssr = ((dependent - design @ params) ** 2).sum(axis=0)
+        [self.assertAlmostEqual(e, c, 8) for e, c in zip(expected_ssr, accumulator.residual_sum_of_squares(params))]
+
+    def test_bad_chunk_shape(self):
+        accumulator = NormalEquationAccumulator(3, 1)
+        with self.assertRaises(EnergyPlusPetException):
+            accumulator.add(ones((4, 2)), ones(4))
+
+
+class TestBootstrapLinearFit(TestCase):
+
+    def test_resampled_coefficients_spread_around_the_fit(self):
+        x_1, x_2, y_a, y_b = TestLinearLeastSquares._noisy_data()
+        design = column_stack((ones(20), x_1, x_2))
+        dependent = column_stack((y_a, y_b))
+        expected_params, _ = LinearLeastSquares(design).solve(dependent)
+        samples = BootstrapLinearFit(design, dependent).resample_coefficients(500, seed=3, max_block_elements=2000)
+        self.assertEqual((500, 3, 2), samples.shape)
+        [self.assertAlmostEqual(e, c, 1) for e, c in zip(expected_params.ravel(), samples.mean(axis=0).ravel())]
+        self.assertTrue((samples.std(axis=0) > 0.0).all())
+        repeated = BootstrapLinearFit(design, dependent).resample_coefficients(500, seed=3)
+        self.assertEqual(samples.tolist(), repeated.tolist())
+
+    def test_noise_free_resamples_recover_exact_coefficients(self):
+        x_1, x_2, _, _ = TestLinearLeastSquares._noisy_data()
+        design = column_stack((ones(20), x_1, x_2))
+        samples = BootstrapLinearFit(design, design @ array([1.0, 2.0, 3.0])).resample_coefficients(50, seed=1)
+        [self.assertAlmostEqual(e, c, 6) for e, c in zip([1.0, 2.0, 3.0], samples.max(axis=0)[:, 0])]
+
+    def test_bad_arguments(self):
+        with self.assertRaises(EnergyPlusPetException):
+            BootstrapLinearFit(array([1.0, 2.0, 3.0]), array([1.0, 2.0, 3.0]))
+        with self.assertRaises(EnergyPlusPetException):
+            BootstrapLinearFit(ones((4, 2)), ones(4)).resample_coefficients(0)
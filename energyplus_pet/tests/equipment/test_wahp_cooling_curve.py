@@ -58,7 +58,11 @@ class TestWAHPCoolingCurve(EquipmentTestHelper):
         eq.set_required_constant_parameter(eq.rated_total_capacity_key, 100)
         eq.set_required_constant_parameter(eq.rated_sensible_capacity_key, 80)
         eq.set_required_constant_parameter(eq.rated_cooling_power_key, 20)
-        eq.generate_parameters(cdm, lambda *_: None, lambda *_: None)
+        progress_calls = []
+        eq.generate_parameters(cdm, lambda *_: progress_calls.append(1), lambda *_: None)
+        self.assertEqual(eq.get_number_of_progress_steps(), len(progress_calls))
+        self.assertEqual(32, len(eq.predicted_sensible_capacity))
+        self.assertEqual(32, len(eq.percent_error_cooling_power))
         expected = [81.4, 69.2, 76.8, 54.1, 93.8]
         calculated = eq.total_capacity_params
         [self.assertAlmostEqual(e, c, 1) for e, c in zip(expected, calculated)]
@@ -68,6 +72,36 @@ class TestWAHPCoolingCurve(EquipmentTestHelper):
         expected = [97.4, 64.3, 31.5, 38.7, 94.5]
         calculated = eq.cooling_power_params
         [self.assertAlmostEqual(e, c, 1) for e, c in zip(expected, calculated)]
+        # streaming the same data in small chunks should give the same fit, with chunk statistics and sampled arrays
+        streamed = WaterToAirHeatPumpCoolingCurveFit()
+        streamed.set_required_constant_parameter(eq.rated_air_volume_flow_key, 10)
+        streamed.set_required_constant_parameter(eq.rated_water_volume_flow_key, 20)
+        streamed.set_required_constant_parameter(eq.rated_total_capacity_key, 100)
+        streamed.set_required_constant_parameter(eq.rated_sensible_capacity_key, 80)
+        streamed.set_required_constant_parameter(eq.rated_cooling_power_key, 20)
+        progress_calls = []
+        fractions = []
+        streamed.generate_parameters(
+            cdm, lambda *_: progress_calls.append(1), lambda *_: None, chunk_size=5,
+            cb_progress_fraction=fractions.append
+        )
+        self.assertEqual(eq.get_number_of_progress_steps(), len(progress_calls))
+        self.assertEqual(14, len(fractions))  # one per chunk in each of the two passes
+        self.assertEqual(1.0, fractions[-1])
+        calculated = streamed.sensible_capacity_params
+        [self.assertAlmostEqual(e, c, 4) for e, c in zip(eq.sensible_capacity_params, calculated)]
+        self.assertEqual(7, len(streamed.cooling_power_chunk_errors))
+        self.assertEqual(30, streamed.cooling_power_chunk_errors[-1].start_row)
+        self.assertEqual(2, streamed.cooling_power_chunk_errors[-1].num_rows)
+        # every row fits within the default plot sample, so the plot arrays match the in-memory fit
+        self.assertEqual(32, len(streamed.predicted_cooling_power))
+        [self.assertAlmostEqual(e, c, 4) for e, c in zip(eq.predicted_cooling_power, streamed.predicted_cooling_power)]
+        streamed.generate_parameters_streaming(cdm, lambda *_: None, lambda *_: None, chunk_size=5, max_plot_points=10)
+        self.assertEqual(8, len(streamed.catalog_cooling_power))  # every fourth row, across the chunk boundaries
+        [self.assertEqual(e, c) for e, c in zip(eq.catalog_cooling_power[::4], streamed.catalog_cooling_power)]
+        self.assertEqual(8, len(streamed.percent_error_sensible_capacity))
+        max_error = max(abs(e) for e in eq.percent_error_cooling_power)
+        self.assertAlmostEqual(max_error, max(c.max_abs_percent_error for c in streamed.cooling_power_chunk_errors), 3)
 
     def test_output_forms(self):
         pass
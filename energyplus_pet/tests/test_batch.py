@@ -0,0 +1,77 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from json import dumps, loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from energyplus_pet.batch import main_batch, process_catalog_file
+from energyplus_pet.tests.equipment.catalog_test_helper import wwhp_heating_definition
+
+
+class TestBatch(TestCase):
+
+    def test_process_catalog_file_reports_failure(self):
+        with TemporaryDirectory() as temp_dir:
+            catalog_path = Path(temp_dir) / 'broken.json'
+            catalog_path.write_text('{not json')
+            result = process_catalog_file(str(catalog_path), temp_dir)
+            self.assertFalse(result.success)
+            self.assertEqual('broken', result.sku)
+            self.assertIn('JSONDecodeError', result.error_message)
+
+    def test_process_catalog_file_stage_failure(self):
+        with TemporaryDirectory() as temp_dir:
+            too_small = wwhp_heating_definition('SKU-9')
+            too_small['correction_factors'] = []
+            too_small['base_data'] = too_small['base_data'][:2]
+            catalog_path = Path(temp_dir) / 'file-name.json'
+            catalog_path.write_text(dumps(too_small))
+            result = process_catalog_file(str(catalog_path), temp_dir)
+            self.assertFalse(result.success)
+            self.assertEqual('SKU-9', result.sku)  # the sku key wins over the file name
+            self.assertEqual(2, result.num_data_rows)
+            self.assertIn('ApplyCorrectionFactors stage failed', result.error_message)
+            self.assertIn('ApplyCorrectionFactors', result.stage_seconds)
+            self.assertNotIn('GenerateParameters', result.stage_seconds)  # the pipeline stopped at the failure
+            self.assertEqual([], result.output_files)
+            del too_small['sku']
+            catalog_path.write_text(dumps(too_small))
+            self.assertEqual('file-name', process_catalog_file(str(catalog_path), temp_dir).sku)
+
+    def test_main_batch(self):
+        with TemporaryDirectory() as temp_dir:
+            catalog_dir = Path(temp_dir) / 'catalogs'
+            catalog_dir.mkdir()
+            output_dir = Path(temp_dir) / 'outputs'
+            (catalog_dir / 'SKU-1.json').write_text(dumps(wwhp_heating_definition('SKU-1')))
+            too_small = wwhp_heating_definition('SKU-3')
+            too_small['correction_factors'] = []
+            too_small['base_data'] = too_small['base_data'][:2]
+            (catalog_dir / 'SKU-3.json').write_text(dumps(too_small))
+            output = StringIO()
+            with redirect_stdout(output):
+                exit_code = main_batch([str(catalog_dir), str(output_dir), '--workers', '2'])
+            self.assertEqual(1, exit_code)
+            self.assertIn('Succeeded: 1, Failed: 1', output.getvalue())
+            self.assertIn('SKU-3', output.getvalue())
+            self.assertIn('ApplyCorrectionFactors stage failed', output.getvalue())
+            self.assertIn('HeatPump:WaterToWater:EquationFit:Heating', (output_dir / 'SKU-1.idf').read_text())
+            loads((output_dir / 'SKU-1.epJSON').read_text())
+            self.assertTrue((output_dir / 'SKU-1.summary.txt').exists())
+            self.assertFalse((output_dir / 'SKU-3.idf').exists())
+
+    def test_main_batch_with_fit_cache(self):
+        with TemporaryDirectory() as temp_dir:
+            catalog_dir = Path(temp_dir) / 'catalogs'
+            catalog_dir.mkdir()
+            (catalog_dir / 'SKU-1.json').write_text(dumps(wwhp_heating_definition('SKU-1')))
+            arguments = [str(catalog_dir), str(Path(temp_dir) / 'outputs'), '--workers', '1']
+            arguments += ['--cache-dir', str(Path(temp_dir) / 'cache'), '--profile']
+            for expected_hits in (0, 1):
+                output = StringIO()
+                with redirect_stdout(output):
+                    self.assertEqual(0, main_batch(arguments))
+                self.assertIn(f"Fit cache: {expected_hits} hits, {1 - expected_hits} misses", output.getvalue())
+            report = loads((Path(temp_dir) / 'outputs' / 'SKU-1.profile.json').read_text())
+            self.assertIn('GenerateParameters', report['totals'])
@@ -0,0 +1,68 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from json import dumps, loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from energyplus_pet.benchmark import (
+    BENCHMARK_EQUIPMENT, CORRECTION_FACTOR_SETUPS, SyntheticCatalog, compare_results, main_benchmark, run_benchmarks
+)
+from energyplus_pet.data_manager import CatalogDataManager
+
+
+class TestBenchmark(TestCase):
+
+    def test_synthetic_catalogs_expand_to_requested_size(self):
+        for equip_type in BENCHMARK_EQUIPMENT:
+            for setup in CORRECTION_FACTOR_SETUPS:
+                catalog = SyntheticCatalog(equip_type, 1000, setup)
+                equipment = catalog.equipment()
+                data_manager = catalog.data_manager()
+                status = data_manager.apply_correction_factors(
+                    equipment.minimum_data_points_for_generation(),
+                    equipment.headers().get_db_column(), equipment.headers().get_wb_column()
+                )
+                self.assertEqual(CatalogDataManager.ProcessResult.OK, status, data_manager.last_error_message)
+                self.assertGreaterEqual(data_manager.final_data.shape[0], 1000)
+                self.assertLess(data_manager.final_data.shape[0], 1100)
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(BENCHMARK_EQUIPMENT[:1], [100], ['multiplier'], repeat=1)
+        self.assertIn('numpy', results['metadata'])
+        self.assertGreater(results['results']['micro']['fill_eplus_object_format_10000'], 0.0)
+        case = results['results'][f"{BENCHMARK_EQUIPMENT[0].name}/multiplier/100"]
+        for name in (
+                'apply_correction_factors', 'generate_parameters', 'eval_curve_at_points', 'unit_conversion',
+                'to_eplus_idf_object', 'to_eplus_epjson_object'
+        ):
+            self.assertGreater(case[name], 0.0)
+
+    def test_compare_results(self):
+        baseline = {'results': {'A/none/100': {'fit': 0.010, 'export': 0.010, 'tiny': 0.00001, 'expanded_rows': 100}}}
+        current = {'results': {
+            'A/none/100': {'fit': 0.020, 'export': 0.011, 'tiny': 0.00009, 'expanded_rows': 400},
+            'B/none/100': {'fit': 1.0},
+        }}
+        regressions = compare_results(baseline, current, threshold=0.25)
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith('A/none/100 fit'))
+        self.assertEqual([], compare_results(baseline, current, threshold=1.5))
+
+    def test_main_benchmark(self):
+        with TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir) / 'results.json'
+            args = ['run', str(output_file), '--sizes', '100', '--setups', 'none', '--repeat', '1']
+            with redirect_stdout(StringIO()):
+                self.assertEqual(0, main_benchmark(args + ['--equipment', BENCHMARK_EQUIPMENT[0].name]))
+            results = loads(output_file.read_text())
+            self.assertEqual(['micro', f"{BENCHMARK_EQUIPMENT[0].name}/none/100"], list(results['results']))
+            slower_file = Path(temp_dir) / 'slower.json'
+            case = results['results'][f"{BENCHMARK_EQUIPMENT[0].name}/none/100"]
+            case['generate_parameters'] = case['generate_parameters'] * 10.0 + 1.0
+            slower_file.write_text(dumps(results))
+            with redirect_stdout(StringIO()) as output:
+                self.assertEqual(1, main_benchmark(['compare', str(output_file), str(slower_file)]))
+            self.assertIn('SLOWER', output.getvalue())
+            with redirect_stdout(StringIO()):
+                self.assertEqual(0, main_benchmark(['compare', str(slower_file), str(output_file)]))
@@ -0,0 +1,112 @@
+from json import loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from energyplus_pet.bulk_export import BulkExporter, bulk_export
+from energyplus_pet.equipment.equip_types import EquipType
+from energyplus_pet.equipment.manager import EquipmentFactory
+from energyplus_pet.exceptions import EnergyPlusPetException
+from energyplus_pet.tests.equipment.catalog_test_helper import equipment_with_results
+
+CURVE_FIT_TYPES = (
+    EquipType.WAHP_Cooling_CurveFit, EquipType.WAHP_Heating_CurveFit,
+    EquipType.WWHP_Cooling_CurveFit, EquipType.WWHP_Heating_CurveFit
+)
+
+
+class TestBulkExport(TestCase):
+
+    @staticmethod
+    def _export(products):
+        with TemporaryDirectory() as temp_dir:
+            idf_path = Path(temp_dir) / 'model.idf'
+            epjson_path = Path(temp_dir) / 'model.epJSON'
+            exporter = bulk_export((p for p in products), str(idf_path), str(epjson_path))
+            return exporter, idf_path.read_text(), loads(epjson_path.read_text())
+
+    def test_bulk_export(self):
+        products = [
+            (f"Model {equip_type.name}", equipment_with_results(equip_type, i))
+            for i, equip_type in enumerate(CURVE_FIT_TYPES)
+        ]
+        exporter, idf, epjson = self._export(products)
+        self.assertEqual(4, exporter.num_coils)
+        self.assertEqual(9, exporter.num_curves)
+        self.assertEqual(0, exporter.num_shared_curves)
+        self.assertEqual(1, idf.count('Version,'))
+        self.assertEqual(['Version 1'], list(epjson['Version']))
+        curve_names = set(epjson['Curve:QuadLinear']) | set(epjson['Curve:QuintLinear'])
+        self.assertEqual(9, len(curve_names))
+        for object_type, objects in epjson.items():
+            if object_type == 'Version':
+                continue
+            for name, fields in objects.items():
+                self.assertIn(f"    {name},", idf)
+                for field_name, value in fields.items():
+                    if field_name.endswith('curve_name'):
+                        self.assertIn(value, curve_names)
+        wahp_cooling = products[0][1]
+        sensible_curve = epjson['Curve:QuintLinear']['Model WAHP_Cooling_CurveFit SensibleCapacityCurve']
+        self.assertEqual(wahp_cooling.sensible_capacity_params[5], sensible_curve['coefficient6_z'])
+
+    def test_name_collisions(self):
+        # repeated product names get numeric suffixes, including where a suffixed name was itself a product name
+        products = [
+            ('X', equipment_with_results(EquipType.WWHP_Heating_CurveFit, 0.0)),
+            ('X', equipment_with_results(EquipType.WWHP_Heating_CurveFit, 1.0)),
+            ('X 2', equipment_with_results(EquipType.WWHP_Heating_CurveFit, 2.0)),
+        ]
+        exporter, idf, epjson = self._export(products)
+        coils = epjson['HeatPump:WaterToWater:EquationFit:Heating']
+        self.assertEqual(['X', 'X 2', 'X 2 2'], list(coils))
+        self.assertEqual('X 2 Source Side Inlet Node', coils['X 2']['source_side_inlet_node_name'])
+        self.assertEqual(6, len(epjson['Curve:QuadLinear']))
+        self.assertIn('X 2 TotalCapacityCurve', epjson['Curve:QuadLinear'])
+        self.assertIn('X 2 2 TotalCapacityCurve', epjson['Curve:QuadLinear'])
+        # every object name is unique across the whole model
+        self.assertEqual(3 + 6, len({name for objects in epjson.values() for name in objects}) - 1)
+
+    def test_shared_curves(self):
+        first = equipment_with_results(EquipType.WWHP_Heating_CurveFit, 0.0)
+        same = equipment_with_results(EquipType.WWHP_Heating_CurveFit, 0.0)
+        one_different = equipment_with_results(EquipType.WWHP_Heating_CurveFit, 0.0)
+        one_different.heating_power_params = [p + 1.0 for p in one_different.heating_power_params]
+        exporter, idf, epjson = self._export([('A', first), ('B', same), ('C', one_different)])
+        self.assertEqual(3, exporter.num_coils)
+        self.assertEqual(3, exporter.num_curves)
+        self.assertEqual(3, exporter.num_shared_curves)
+        coils = epjson['HeatPump:WaterToWater:EquationFit:Heating']
+        self.assertEqual('A TotalCapacityCurve', coils['B']['heating_capacity_curve_name'])
+        self.assertEqual('A TotalCapacityCurve', coils['C']['heating_capacity_curve_name'])
+        self.assertEqual('A HeatingPowerCurve', coils['B']['heating_compressor_power_curve_name'])
+        self.assertEqual('C HeatingPowerCurve', coils['C']['heating_compressor_power_curve_name'])
+        self.assertEqual(3, idf.count('Curve:QuadLinear,'))
+
+    def test_matches_single_product_outputs(self):
+        # the same results must give the same curve objects whether exported alone or in bulk
+        for equip_type in CURVE_FIT_TYPES:
+            equipment = equipment_with_results(equip_type)
+            _, bulk_idf, bulk_epjson = self._export([('P', equipment)])
+            single_epjson = loads(equipment.to_eplus_epjson_object())
+            for object_type in ('Curve:QuadLinear', 'Curve:QuintLinear'):
+                self.assertEqual(
+                    list(single_epjson.get(object_type, {}).values()), list(bulk_epjson.get(object_type, {}).values())
+                )
+
+            def coefficient_lines(idf: str):
+                return [line for line in idf.splitlines() if '!-Coefficient' in line or 'Value of' in line]
+
+            single_lines = coefficient_lines(equipment.to_eplus_idf_object())
+            self.assertGreater(len(single_lines), 0)
+            self.assertEqual(single_lines, coefficient_lines(bulk_idf))
+
+    def test_unfitted_or_closed(self):
+        with TemporaryDirectory() as temp_dir:
+            with BulkExporter(str(Path(temp_dir) / 'model.idf')) as exporter:
+                with self.assertRaises(EnergyPlusPetException):
+                    exporter.add(EquipmentFactory.instance_factory(EquipType.WAHP_Heating_CurveFit), 'X')
+            with self.assertRaises(EnergyPlusPetException):
+                exporter.add(equipment_with_results(EquipType.WAHP_Heating_CurveFit), 'Y')
+            idf_lines = (Path(temp_dir) / 'model.idf').read_text().splitlines()
+            self.assertEqual(['Version,'], [line for line in idf_lines if line and not line.startswith(' ')])
@@ -1,3 +1,4 @@
+from json import dumps, loads
 from unittest import TestCase
 
 from energyplus_pet.correction_factor import CorrectionFactor, CorrectionFactorType
@@ -81,3 +82,17 @@ class TestCorrectionFactor(TestCase):
         self.assertFalse(cf.check_ok(0, 1))
         cf.base_correction_db = [2, 1]
         self.assertFalse(cf.check_ok(0, 1))
+
+    def test_dict_round_trip(self):
+        cf = CorrectionFactor('foo')
+        cf.correction_type = CorrectionFactorType.CombinedDbWb
+        cf.num_corrections = 2
+        cf.base_correction_db = [20.0, 25.0]
+        cf.base_correction_wb = [15.0, 17.0]
+        cf.columns_to_modify = [3, 4]
+        cf.mod_correction_data_column_map = {3: [0.9, 1.1], 4: [1.05, 0.95]}
+        # go through JSON to make sure the integer column keys survive becoming strings
+        new_cf = CorrectionFactor.from_dict(loads(dumps(cf.to_dict())))
+        self.assertEqual(cf.to_dict(), new_cf.to_dict())
+        self.assertEqual([0.9, 1.1], new_cf.mod_correction_data_column_map[3])
+        self.assertTrue(new_cf.check_ok(0, 1))
@@ -1,8 +1,14 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
+from numpy import memmap, shares_memory
+from numpy.testing import assert_array_equal
+
 from energyplus_pet.correction_factor import CorrectionFactor, CorrectionFactorType
 from energyplus_pet.data_manager import CatalogDataManager
 from energyplus_pet.equipment.wahp_heating_curve import WaterToAirHeatPumpHeatingCurveFit
+from energyplus_pet.exceptions import EnergyPlusPetException
 
 
 class TestDataManager(TestCase):
@@ -50,6 +56,26 @@ class TestDataManager(TestCase):
         self.assertEqual(3, len(cdm.final_data_matrix))
         self.assertIsInstance(cdm.summary(), dict)
 
+    def test_columnar_storage(self):
+        cdm = CatalogDataManager()
+        cdm.add_base_data([
+            [0, 1, 2, 3],
+            [1, 2, 3, 5],
+            [2, 3, 4, 7]
+        ])
+        status = cdm.apply_correction_factors(0, -1, -1)
+        self.assertEqual(status, CatalogDataManager.ProcessResult.OK)
+        self.assertEqual('float64', cdm.final_data.dtype.name)
+        self.assertEqual((3, 4), cdm.final_data.shape)
+        column = cdm.column(3)
+        self.assertEqual([3.0, 5.0, 7.0], column.tolist())
+        self.assertTrue(shares_memory(column, cdm.final_data))
+        # the list accessor can also still be used to set the final data directly
+        cdm.final_data_matrix = [[1, 2], [3, 4]]
+        self.assertEqual([2.0, 4.0], cdm.column(1).tolist())
+        with self.assertRaises(EnergyPlusPetException):
+            cdm.add_base_data([1.0, 2.0])
+
     def test_process_not_enough_data(self):
         cdm = CatalogDataManager()
         cdm.add_base_data([
@@ -112,6 +138,85 @@ class TestDataManager(TestCase):
             cdm.final_data_matrix
         )
 
+    @staticmethod
+    def _row_by_row_expansion(base_rows, factors, db_column, wb_column):
+        """Reference implementation of the original row-by-row expansion to compare the vectorized one against"""
+        final_rows = [list(row) for row in base_rows]
+        for cf in factors:
+            previous_rows = [list(row) for row in final_rows]
+            for cf_row in range(cf.num_corrections):
+                for row in previous_rows:
+                    new_row = list(row)
+                    if cf.correction_type == CorrectionFactorType.Multiplier:
+                        new_row[cf.base_column_index] *= cf.base_correction[cf_row]
+                    elif cf.correction_type == CorrectionFactorType.Replacement:
+                        new_row[cf.base_column_index] = cf.base_correction[cf_row]
+                    elif cf.correction_type == CorrectionFactorType.CombinedDbWb:
+                        new_row[db_column] = cf.base_correction_db[cf_row]
+                        new_row[wb_column] = cf.base_correction_wb[cf_row]
+                    for column_to_modify in cf.columns_to_modify:
+                        new_row[column_to_modify] *= cf.mod_correction_data_column_map[column_to_modify][cf_row]
+                    final_rows.append(new_row)
+        return final_rows
+
+    def test_vectorized_expansion_matches_row_by_row_order(self):
+        cdm = CatalogDataManager()
+        factors = []
+        cf = CorrectionFactor('db_wb')
+        cf.correction_type = CorrectionFactorType.CombinedDbWb
+        cf.num_corrections = 3
+        cf.base_correction_db = [20.0, 25.0, 30.0]
+        cf.base_correction_wb = [15.0, 17.0, 19.0]
+        cf.columns_to_modify = [3, 4]
+        cf.mod_correction_data_column_map = {3: [0.9, 1.0, 1.1], 4: [1.05, 1.0, 0.95]}
+        factors.append(cf)
+        cf = CorrectionFactor('multiplier')
+        cf.correction_type = CorrectionFactorType.Multiplier
+        cf.num_corrections = 2
+        cf.base_column_index = 2
+        cf.base_correction = [0.5, 1.5]
+        cf.columns_to_modify = [3]
+        cf.mod_correction_data_column_map = {3: [0.8, 1.2]}
+        factors.append(cf)
+        cf = CorrectionFactor('replacement')
+        cf.correction_type = CorrectionFactorType.Replacement
+        cf.num_corrections = 2
+        cf.base_column_index = 2
+        cf.base_correction = [3.0, 4.0]
+        cf.columns_to_modify = [4]
+        cf.mod_correction_data_column_map = {4: [0.7, 1.3]}
+        factors.append(cf)
+        base = [
+            [22.0, 16.0, 1.0, 10.0, 5.0],
+            [24.0, 18.0, 2.0, 12.0, 6.0],
+        ]
+        for f in factors:
+            cdm.add_correction_factor(f)
+        cdm.add_base_data(base)
+        status = cdm.apply_correction_factors(0, 0, 1)
+        self.assertEqual(status, CatalogDataManager.ProcessResult.OK)
+        expected = self._row_by_row_expansion(base, factors, 0, 1)
+        self.assertEqual(2 * 4 * 3 * 3, len(expected))
+        self.assertEqual(len(expected), len(cdm.final_data_matrix))
+        for expected_row, calculated_row in zip(expected, cdm.final_data_matrix):
+            [self.assertAlmostEqual(e, c, 10) for e, c in zip(expected_row, calculated_row)]
+        # the base data should not have been touched, so applying again should give the exact same result
+        summary = cdm.summary()
+        self.assertEqual(base, summary['base_data_in_rows'])
+        self.assertEqual([len(expected), 5], summary['final_data_shape'])
+        self.assertNotIn('final_data_rows', summary)  # the expanded rows are never listed
+        first_pass = cdm.final_data_matrix
+        cdm.apply_correction_factors(0, 0, 1)
+        self.assertEqual(first_pass, cdm.final_data_matrix)
+        self.assertEqual(summary, cdm.summary())
+        lazy = CatalogDataManager()
+        for cf in factors:
+            lazy.add_correction_factor(cf)
+        lazy.add_base_data(base)
+        lazy.apply_correction_factors(0, 0, 1, materialize=False)
+        self.assertEqual(summary, lazy.summary())  # described the same without building the final data
+        self.assertTrue(lazy._final_data_pending)
+
     def test_lots_of_correction_factors(self):
         cdm = CatalogDataManager()
 
@@ -177,3 +282,103 @@ class TestDataManager(TestCase):
         expected = [-1914.568, 943.8333, 1017.4521, 9.1667, 16.1239]
         calculated = eq.heating_power_params
         [self.assertAlmostEqual(e, c, 2) for e, c in zip(expected, calculated)]
+
+    def test_incremental_re_expansion(self):
+        def multiplier(name: str, base_column: int, values) -> CorrectionFactor:
+            cf = CorrectionFactor(name)
+            cf.correction_type = CorrectionFactorType.Multiplier
+            cf.num_corrections = len(values)
+            cf.base_column_index = base_column
+            cf.base_correction = list(values)
+            cf.columns_to_modify = [3]
+            cf.mod_correction_data_column_map = {3: [0.9 + 0.1 * i for i in range(len(values))]}
+            return cf
+
+        def full_rebuild(factors) -> list:
+            fresh = CatalogDataManager()
+            for factor in factors:
+                fresh.add_correction_factor(factor)
+            fresh.add_base_data(base)
+            fresh.apply_correction_factors(0, -1, -1)
+            return fresh.final_data_matrix
+
+        base = [[1, 2, 3, 4], [2, 3, 4, 6]]
+        cdm = CatalogDataManager()
+        cdm.add_base_data(base)
+        cdm.add_correction_factor(multiplier('a', 0, [0.5, 1.5]))
+        cdm.add_correction_factor(multiplier('b', 1, [0.8, 1.2, 1.4]))
+        cdm.apply_correction_factors(0, -1, -1)
+        self.assertEqual(2, cdm.last_expansion_steps)
+        # appending a factor only expands the one new factor
+        cdm.add_correction_factor(multiplier('c', 2, [0.7, 1.1]))
+        cdm.apply_correction_factors(0, -1, -1)
+        self.assertEqual(1, cdm.last_expansion_steps)
+        self.assertEqual(full_rebuild(cdm.correction_factors), cdm.final_data_matrix)
+        # nothing changed, so nothing is expanded
+        cdm.apply_correction_factors(0, -1, -1)
+        self.assertEqual(0, cdm.last_expansion_steps)
+        # replacing the middle factor re-expands from there onward
+        cdm.replace_correction_factor(1, multiplier('b2', 1, [0.6, 1.3]))
+        cdm.apply_correction_factors(0, -1, -1)
+        self.assertEqual(2, cdm.last_expansion_steps)
+        self.assertEqual(full_rebuild(cdm.correction_factors), cdm.final_data_matrix)
+        # editing the last factor in place is detected too
+        cdm.correction_factors[2].base_correction[0] = 0.75
+        cdm.apply_correction_factors(0, -1, -1)
+        self.assertEqual(1, cdm.last_expansion_steps)
+        self.assertEqual(full_rebuild(cdm.correction_factors), cdm.final_data_matrix)
+        cdm.remove_correction_factor(0)
+        cdm.apply_correction_factors(0, -1, -1)
+        self.assertEqual(2, cdm.last_expansion_steps)
+        self.assertEqual(full_rebuild(cdm.correction_factors), cdm.final_data_matrix)
+        # new base data invalidates every level
+        cdm.add_base_data([[1, 2, 3, 4], [2, 3, 4, 7]])
+        cdm.apply_correction_factors(0, -1, -1)
+        self.assertEqual(2, cdm.last_expansion_steps)
+        self.assertEqual(7.0, cdm.final_data[1, 3])
+        with self.assertRaises(EnergyPlusPetException):
+            cdm.replace_correction_factor(5, multiplier('x', 0, [1.0]))
+        with self.assertRaises(EnergyPlusPetException):
+            cdm.remove_correction_factor(-1)
+
+    def test_backing_file(self):
+        cf = CorrectionFactor('multiplier')
+        cf.correction_type = CorrectionFactorType.Multiplier
+        cf.num_corrections = 3
+        cf.base_column_index = 1
+        cf.base_correction = [0.5, 1.5, 2.0]
+        cf.columns_to_modify = [3]
+        cf.mod_correction_data_column_map = {3: [0.9, 1.1, 1.2]}
+        base = [[1, 2, 3, 4], [2, 3, 4, 6], [3, 5, 4, 7]]
+
+        in_memory = CatalogDataManager()
+        in_memory.add_correction_factor(cf)
+        in_memory.add_base_data(base)
+        in_memory.apply_correction_factors(0, -1, -1)
+
+        with TemporaryDirectory() as temp_dir:
+            backing_file = str(Path(temp_dir) / 'expanded.npy')
+            cdm = CatalogDataManager()
+            cdm.backing_file = backing_file
+            cdm.backing_chunk_size = 5  # smaller than the data, so it is written over several chunks
+            cdm.add_correction_factor(cf)
+            cdm.add_base_data(base)
+            self.assertEqual(CatalogDataManager.ProcessResult.OK, cdm.apply_correction_factors(0, -1, -1))
+            self.assertIsInstance(cdm.final_data, memmap)
+            self.assertFalse(cdm.final_data.flags.writeable)
+            assert_array_equal(in_memory.final_data, cdm.final_data)
+            self.assertTrue(shares_memory(cdm.final_data, cdm.column(3)))
+            self.assertEqual(
+                in_memory.final_data_matrix, [row for chunk in cdm.iter_final_data_chunks(4) for row in chunk.tolist()]
+            )
+            # another manager, such as one in a worker process, can share the expanded data read-only
+            shared = CatalogDataManager()
+            shared.attach_backing_file(backing_file)
+            self.assertTrue(shared.data_processed)
+            assert_array_equal(in_memory.final_data, shared.final_data)
+            # the diversity check still works without reading the data back
+            cdm.add_base_data([[1, 2, 3, 4], [2, 2, 4, 6]])
+            cdm.remove_correction_factor(0)
+            self.assertEqual(CatalogDataManager.ProcessResult.ERROR, cdm.apply_correction_factors(0, -1, -1))
+            self.assertIn('column #1', cdm.last_error_message)
+            del cdm, shared  # release the mappings so the temporary directory can be removed on every platform
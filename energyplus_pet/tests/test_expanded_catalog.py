@@ -0,0 +1,110 @@
+from unittest import TestCase
+
+from numpy import allclose, arange, concatenate
+
+from energyplus_pet.correction_factor import CorrectionFactor, CorrectionFactorType
+from energyplus_pet.data_manager import CatalogDataManager
+from energyplus_pet.expanded_catalog import ExpandedCatalog
+
+
+class TestExpandedCatalog(TestCase):
+
+    @staticmethod
+    def _sample_factors():
+        factors = []
+        cf = CorrectionFactor('db_wb')
+        cf.correction_type = CorrectionFactorType.CombinedDbWb
+        cf.num_corrections = 3
+        cf.base_correction_db = [20.0, 25.0, 30.0]
+        cf.base_correction_wb = [15.0, 17.0, 19.0]
+        cf.columns_to_modify = [3, 4]
+        cf.mod_correction_data_column_map = {3: [0.9, 1.0, 1.1], 4: [1.05, 1.0, 0.95]}
+        factors.append(cf)
+        cf = CorrectionFactor('skipped')
+        cf.num_corrections = 0
+        factors.append(cf)
+        cf = CorrectionFactor('multiplier')
+        cf.correction_type = CorrectionFactorType.Multiplier
+        cf.num_corrections = 2
+        cf.base_column_index = 2
+        cf.base_correction = [0.5, 1.5]
+        cf.columns_to_modify = [2, 3]
+        cf.mod_correction_data_column_map = {2: [2.0, 3.0], 3: [0.8, 1.2]}
+        factors.append(cf)
+        cf = CorrectionFactor('replacement')
+        cf.correction_type = CorrectionFactorType.Replacement
+        cf.num_corrections = 2
+        cf.base_column_index = 2
+        cf.base_correction = [3.0, 4.0]
+        cf.columns_to_modify = [4]
+        cf.mod_correction_data_column_map = {4: [0.7, 1.3]}
+        factors.append(cf)
+        return factors
+
+    def _materialized_and_lazy(self):
+        base = [
+            [22.0, 16.0, 1.0, 10.0, 5.0],
+            [24.0, 18.0, 2.0, 12.0, 6.0],
+            [26.0, 19.0, 3.0, 14.0, 7.0],
+        ]
+        cdm = CatalogDataManager()
+        for cf in self._sample_factors():
+            cdm.add_correction_factor(cf)
+        cdm.add_base_data(base)
+        self.assertEqual(CatalogDataManager.ProcessResult.OK, cdm.apply_correction_factors(0, 0, 1))
+        return cdm.final_data, ExpandedCatalog(base, self._sample_factors(), 0, 1)
+
+    def test_rows_match_materialized_expansion(self):
+        materialized, lazy = self._materialized_and_lazy()
+        self.assertEqual(3 * 4 * 3 * 3, len(lazy))
+        self.assertEqual(materialized.shape, lazy.shape)
+        self.assertTrue(allclose(materialized, lazy[:]))
+        self.assertTrue(allclose(materialized[7], lazy[7]))
+        self.assertTrue(allclose(materialized[-1], lazy[-1]))
+        self.assertTrue(allclose(materialized[10:50:3], lazy[10:50:3]))
+        self.assertTrue(allclose(materialized[[100, 0, 55]], lazy[[100, 0, 55]]))
+        with self.assertRaises(IndexError):
+            lazy[len(lazy)]
+
+    def test_chunks_and_columns(self):
+        materialized, lazy = self._materialized_and_lazy()
+        chunks = list(lazy.iter_chunks(chunk_size=25))
+        self.assertEqual(5, len(chunks))
+        self.assertEqual(8, chunks[-1].shape[0])
+        self.assertTrue(allclose(materialized, concatenate(chunks)))
+        for column_index in range(lazy.num_columns):
+            self.assertTrue(allclose(materialized[:, column_index], lazy.column(column_index)))
+        self.assertTrue(allclose(materialized[20:40, 3], lazy.column(3, 20, 40)))
+        minimums, maximums = lazy.column_ranges(chunk_size=7)
+        self.assertTrue(allclose(materialized.min(axis=0), minimums))
+        self.assertTrue(allclose(materialized.max(axis=0), maximums))
+        self.assertEqual([], lazy.constant_columns())
+
+    def test_constant_column_detected(self):
+        base = [[0.0, float(i), 2.0 * i] for i in range(5)]
+        self.assertEqual([0], ExpandedCatalog(base, [], 0, 0).constant_columns(chunk_size=2))
+        cf = CorrectionFactor('varies_column_zero')
+        cf.correction_type = CorrectionFactorType.Replacement
+        cf.num_corrections = 1
+        cf.base_column_index = 0
+        cf.base_correction = [1.0]
+        self.assertEqual([], ExpandedCatalog(base, [cf], 0, 0).constant_columns(chunk_size=2))
+
+    def test_data_manager_without_materializing(self):
+        materialized, _ = self._materialized_and_lazy()
+        cdm = CatalogDataManager()
+        for cf in self._sample_factors():
+            cdm.add_correction_factor(cf)
+        cdm.add_base_data(materialized[:3])
+        status = cdm.apply_correction_factors(materialized.shape[0], 0, 1, materialize=False)
+        self.assertEqual(CatalogDataManager.ProcessResult.OK, status)
+        self.assertEqual(len(materialized), len(cdm.expanded_catalog))
+        self.assertTrue(allclose(materialized[:, 4], cdm.column(4)))
+        self.assertTrue(allclose(materialized, concatenate(list(cdm.iter_final_data_chunks(chunk_size=10)))))
+        self.assertTrue(allclose(materialized, cdm.final_data))  # built on demand once requested
+        # diversity check works through the lazy view as well
+        cdm = CatalogDataManager()
+        cdm.add_base_data([[1.0, float(i)] for i in arange(4)])
+        status = cdm.apply_correction_factors(0, -1, -1, materialize=False)
+        self.assertEqual(CatalogDataManager.ProcessResult.ERROR, status)
+        self.assertIn('#0', cdm.last_error_message)
@@ -0,0 +1,100 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from os import utime
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from numpy.testing import assert_array_equal
+
+from energyplus_pet.equipment.equip_types import EquipType
+from energyplus_pet.equipment.wwhp_heating_curve import WaterToWaterHeatPumpHeatingCurveFit
+from energyplus_pet.fit_cache import FitCache, main_fit_cache
+from energyplus_pet.pipeline import Pipeline
+from energyplus_pet.tests.equipment.catalog_test_helper import equipment_with_results, wwhp_heating_definition
+
+
+class TestFitCache(TestCase):
+
+    def test_hit_restores_generated_results(self):
+        with TemporaryDirectory() as temp_dir:
+            cache = FitCache(temp_dir)
+            first = Pipeline(cache)
+            self.assertTrue(first.run(wwhp_heating_definition('A')))
+            self.assertFalse(first.fit_cache_hit)
+            second = Pipeline(cache)
+            progress_calls = []
+            definition = wwhp_heating_definition('A')
+            self.assertTrue(second.run(definition, lambda: progress_calls.append(1)))
+            self.assertTrue(second.fit_cache_hit)
+            self.assertEqual((1, 1), (cache.hits, cache.misses))
+            self.assertEqual(second.equipment.get_number_of_progress_steps(), len(progress_calls))
+            self.assertEqual(first.outputs, second.outputs)
+            self.assertEqual(first.equipment.total_capacity_params, second.equipment.total_capacity_params)
+            assert_array_equal(
+                first.equipment.percent_error_heating_power, second.equipment.percent_error_heating_power
+            )
+
+    def test_key_changes_with_inputs(self):
+        def key_for(definition: dict) -> str:
+            # the key only depends on the inputs, so there is no need to fit
+            pipeline = Pipeline()
+            pipeline.select_equipment(definition['equipment_type'])
+            pipeline.add_correction_factors(definition['correction_factors'])
+            pipeline.add_base_data(definition['base_data'])
+            pipeline.set_constant_parameters(definition['constant_parameters'])
+            return FitCache.cache_key(pipeline.equipment, pipeline.data_manager, pipeline.constant_parameters)
+
+        definition = wwhp_heating_definition('A')
+        base_key = key_for(definition)
+        self.assertEqual(base_key, key_for(wwhp_heating_definition('B')))  # sku isn't an input
+        definition['constant_parameters']['qc'] = 15000.0
+        self.assertNotEqual(base_key, key_for(definition))
+        definition = wwhp_heating_definition('A')
+        definition['base_data'][0][4] += 1.0
+        self.assertNotEqual(base_key, key_for(definition))
+        definition = wwhp_heating_definition('A')
+        definition['correction_factors'][0]['base_correction'] = [0.7, 1.2]
+        self.assertNotEqual(base_key, key_for(definition))
+
+    def test_corrupt_entries_are_misses(self):
+        with TemporaryDirectory() as temp_dir:
+            cache = FitCache(temp_dir)
+            equipment = WaterToWaterHeatPumpHeatingCurveFit()
+            for key, contents in [('garbage', b'not a cache entry'), ('truncated', b'PK\x03\x04'), ('empty', b'')]:
+                path = cache.cache_directory / f"{key}.npz"
+                path.write_bytes(contents)
+                self.assertFalse(cache.restore(key, equipment))
+                self.assertFalse(path.exists())
+            self.assertFalse(cache.restore('missing', equipment))
+            self.assertEqual((0, 4), (cache.hits, cache.misses))
+
+    def test_concurrently_evicted_entry_is_still_a_hit(self):
+        with TemporaryDirectory() as temp_dir:
+            cache = FitCache(temp_dir)
+            stored = equipment_with_results(EquipType.WWHP_Heating_CurveFit, 1.0)
+            cache.store('a', stored)
+            restored = WaterToWaterHeatPumpHeatingCurveFit()
+            with patch('energyplus_pet.fit_cache.utime', side_effect=FileNotFoundError):
+                self.assertTrue(cache.restore('a', restored))
+            self.assertEqual(stored.heating_power_params, restored.heating_power_params)
+            assert_array_equal(stored.percent_error_total_capacity, restored.percent_error_total_capacity)
+
+    def test_eviction_and_invalidation(self):
+        with TemporaryDirectory() as temp_dir:
+            cache = FitCache(temp_dir, max_entries=2)
+            equipment = equipment_with_results(EquipType.WWHP_Heating_CurveFit)
+            for i, key in enumerate(['a', 'b']):
+                cache.store(key, equipment)
+                utime(cache.cache_directory / f"{key}.npz", (i, i))
+            self.assertTrue(cache.restore('a', equipment))  # 'a' is now the most recently used
+            cache.store('c', equipment)
+            self.assertEqual({'a.npz', 'c.npz'}, {p.name for p in cache.entry_paths()})
+            self.assertFalse(cache.restore('b', equipment))
+            self.assertTrue(cache.invalidate('a'))
+            self.assertFalse(cache.invalidate('a'))
+            output = StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(0, main_fit_cache([temp_dir, '--clear']))
+            self.assertIn('Removed 1 cached fits', output.getvalue())
+            self.assertEqual([], cache.entry_paths())
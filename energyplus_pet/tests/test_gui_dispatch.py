@@ -0,0 +1,59 @@
+from threading import Thread
+from unittest import TestCase
+
+from energyplus_pet.forms.gui_dispatch import GuiDispatcher
+
+
+class TestGuiDispatcher(TestCase):
+
+    def test_burst_is_one_wake_and_coalesced(self):
+        wakes = []
+        ran = []
+        dispatcher = GuiDispatcher(lambda: wakes.append(1))
+        dispatcher.post(lambda: ran.append('start'))
+        for i in range(1000):
+            dispatcher.post(lambda i=i: ran.append(i), coalesce_key='progress')
+        dispatcher.post(lambda: ran.append('done'))
+        self.assertEqual(1, len(wakes))
+        self.assertEqual(3, dispatcher.drain())
+        self.assertEqual(['start', 999, 'done'], ran)
+        self.assertEqual(0, dispatcher.drain())
+        dispatcher.post(lambda: ran.append('again'), coalesce_key='progress')
+        self.assertEqual(2, len(wakes))  # a post after a drain wakes the main thread again
+        dispatcher.drain()
+        self.assertEqual('again', ran[-1])
+        self.assertEqual(1003, dispatcher.num_posted)
+        self.assertEqual(2, dispatcher.num_wakes)
+
+    def test_posts_from_threads(self):
+        ran = []
+        dispatcher = GuiDispatcher(lambda: None)
+
+        def post_many():
+            for _ in range(100):
+                dispatcher.post(lambda: ran.append(1))
+
+        threads = [Thread(target=post_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(400, dispatcher.drain())
+        self.assertEqual(400, len(ran))
+
+    def test_failed_wake_does_not_block_later_posts(self):
+        wakes = []
+
+        def wake():
+            wakes.append(1)
+            if len(wakes) == 1:
+                raise RuntimeError('main thread is not in main loop')
+
+        ran = []
+        dispatcher = GuiDispatcher(wake)
+        with self.assertRaises(RuntimeError):
+            dispatcher.post(lambda: ran.append('first'))
+        dispatcher.post(lambda: ran.append('second'))
+        self.assertEqual(2, len(wakes))  # the failed wake-up was not left outstanding
+        self.assertEqual(2, dispatcher.drain())
+        self.assertEqual(['first', 'second'], ran)
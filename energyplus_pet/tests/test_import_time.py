@@ -0,0 +1,45 @@
+from json import loads
+from os import environ
+from subprocess import run
+from sys import executable
+from unittest import skipUnless, TestCase
+
+# cumulative import time budgets in seconds, measured in a fresh interpreter with `python -X importtime`, these are
+# several times what a normal machine takes, so they catch a heavy dependency creeping back in, not small regressions;
+# wall clock times are unreliable on loaded CI runners, so the budget test only runs when this variable is set
+TIMING_TESTS_VARIABLE = 'ENERGYPLUS_PET_TIMING_TESTS'
+IMPORT_TIME_BUDGETS = {
+    'energyplus_pet.units': 0.4,
+    'energyplus_pet.equipment.manager': 0.6,
+    'energyplus_pet.pipeline': 0.6,
+}
+HEAVY_MODULES = ['scipy', 'matplotlib', 'tkinter', 'tksheet']
+
+
+class TestImportTime(TestCase):
+
+    @staticmethod
+    def _import_in_fresh_interpreter(module_name: str):
+        """Imports a module in a new process, returning the loaded heavy modules and the importtime cumulative time"""
+        check_heavy = f"import sys, json; print(json.dumps([m for m in {HEAVY_MODULES} if m in sys.modules]))"
+        process = run(
+            [executable, '-X', 'importtime', '-c', f"import {module_name}; {check_heavy}"],
+            capture_output=True, text=True, check=True
+        )
+        cumulative_us = None
+        for line in process.stderr.splitlines():
+            fields = [f.strip() for f in line.split('|')]
+            if len(fields) == 3 and fields[2] == module_name:
+                cumulative_us = int(fields[1])
+        return loads(process.stdout), cumulative_us / 1e6
+
+    def test_core_modules_do_not_import_heavy_dependencies(self):
+        for module_name in IMPORT_TIME_BUDGETS:
+            heavy_modules_loaded, _ = self._import_in_fresh_interpreter(module_name)
+            self.assertEqual([], heavy_modules_loaded, f"Importing {module_name} loaded heavy modules")
+
+    @skipUnless(environ.get(TIMING_TESTS_VARIABLE), f"Set {TIMING_TESTS_VARIABLE} to check the import time budgets")
+    def test_import_time_budget(self):
+        for module_name, budget in IMPORT_TIME_BUDGETS.items():
+            _, seconds = self._import_in_fresh_interpreter(module_name)
+            self.assertLess(seconds, budget, f"Importing {module_name} took {seconds:.3f} s")
@@ -0,0 +1,111 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from numpy import memmap
+
+from energyplus_pet.correction_factor import CorrectionFactor
+from energyplus_pet.equipment.equip_types import EquipType
+from energyplus_pet.pipeline import Pipeline
+from energyplus_pet.progress import CancellationToken
+from energyplus_pet.tests.equipment.catalog_test_helper import wwhp_heating_definition
+
+
+class TestPipeline(TestCase):
+
+    def test_run_all_stages(self):
+        pipeline = Pipeline()
+        progress_calls = []
+        definition = wwhp_heating_definition('A')
+        self.assertTrue(pipeline.run(definition, lambda: progress_calls.append(1)))
+        self.assertTrue(pipeline.succeeded)
+        self.assertIsNone(pipeline.first_failure)
+        self.assertEqual(list(Pipeline.Stage), [r.stage for r in pipeline.stage_results])
+        self.assertTrue(all(r.elapsed_seconds >= 0.0 for r in pipeline.stage_results))
+        self.assertEqual(pipeline.equipment.get_number_of_progress_steps(), len(progress_calls))
+        self.assertEqual(5, len(pipeline.equipment.total_capacity_params))
+        self.assertIn('HeatPump:WaterToWater:EquationFit:Heating', pipeline.outputs['idf'])
+        self.assertEqual({'summary', 'idf', 'epjson'}, set(pipeline.outputs))
+        self.assertIn('OK', pipeline.stage_results[0].describe())
+
+    def test_structured_errors(self):
+        pipeline = Pipeline()
+        result = pipeline.add_base_data([[1.0, 2.0]])
+        self.assertFalse(result.success)
+        self.assertEqual(Pipeline.Stage.AddBaseData, result.stage)
+        self.assertEqual('EnergyPlusPetException', result.error_type)
+        self.assertIn('No equipment', result.error_message)
+        self.assertFalse(pipeline.select_equipment('NotAnEquipmentType').success)
+        self.assertTrue(pipeline.select_equipment(EquipType.WWHP_Heating_CurveFit).success)
+        self.assertFalse(pipeline.add_base_data([[1.0, 2.0]]).success)  # wrong number of columns
+        cf = CorrectionFactor('bad')
+        cf.num_corrections = 0
+        self.assertFalse(pipeline.add_correction_factors([cf]).success)
+        self.assertFalse(pipeline.set_constant_parameters({'vl': 1.0}).success)
+        self.assertFalse(pipeline.succeeded)
+        self.assertEqual(Pipeline.Stage.AddBaseData, pipeline.first_failure.stage)
+
+    def test_run_stops_at_first_failure(self):
+        pipeline = Pipeline()
+        definition = wwhp_heating_definition('A')
+        del definition['constant_parameters']['qc']
+        self.assertFalse(pipeline.run(definition))
+        self.assertEqual(Pipeline.Stage.SetConstantParameters, pipeline.stage_results[-1].stage)
+        self.assertIn("'qc'", pipeline.first_failure.error_message)
+        self.assertEqual({}, pipeline.outputs)
+
+    def test_backing_file(self):
+        definition = wwhp_heating_definition('A')
+        in_memory = Pipeline()
+        self.assertTrue(in_memory.run(definition))
+        with TemporaryDirectory() as temp_dir:
+            pipeline = Pipeline()
+            pipeline.select_equipment(definition['equipment_type'])
+            pipeline.add_correction_factors(definition['correction_factors'])
+            pipeline.add_base_data(definition['base_data'])
+            pipeline.apply_correction_factors(backing_file=str(Path(temp_dir) / 'expanded.npy'))
+            pipeline.set_constant_parameters(definition['constant_parameters'])
+            pipeline.generate_parameters()
+            pipeline.export()
+            self.assertTrue(pipeline.succeeded)
+            self.assertEqual(in_memory.outputs, pipeline.outputs)
+            self.assertIsNone(pipeline.data_manager.backing_file)
+            self.assertIsInstance(pipeline.data_manager.final_data, memmap)
+            # a later apply without a backing file is back in memory, rather than reusing the file
+            self.assertTrue(pipeline.apply_correction_factors().success)
+            self.assertNotIsInstance(pipeline.data_manager.final_data, memmap)
+            del pipeline
+
+    def test_cancel_and_progress_fraction(self):
+        definition = wwhp_heating_definition('A')
+        pipeline = Pipeline()
+        self.assertTrue(pipeline.run(definition, cancel_token=CancellationToken(), timeout_seconds=0.0))
+        fractions = []
+        pipeline.generate_parameters(cb_progress_fraction=fractions.append)
+        self.assertTrue(pipeline.succeeded)
+        self.assertEqual(sorted(fractions), fractions)
+        self.assertEqual(1.0, fractions[-1])
+        token = CancellationToken()
+        token.cancel()
+        result = pipeline.generate_parameters(cancel_token=token)
+        self.assertFalse(result.success)
+        self.assertTrue(result.cancelled)
+        self.assertEqual('OperationCancelled', result.error_type)
+
+    def test_run_timeout(self):
+        pipeline = Pipeline()
+        self.assertFalse(pipeline.run(wwhp_heating_definition('A'), timeout_seconds=0.0))
+        self.assertEqual(Pipeline.Stage.ApplyCorrectionFactors, pipeline.first_failure.stage)
+        self.assertTrue(pipeline.first_failure.cancelled)
+        self.assertIn('Timed out', pipeline.first_failure.error_message)
+        self.assertFalse(pipeline.data_manager.data_processed)
+
+    def test_run_again_clears_previous_results(self):
+        pipeline = Pipeline()
+        definition = wwhp_heating_definition('A')
+        del definition['constant_parameters']['qc']
+        self.assertFalse(pipeline.run(definition))
+        self.assertTrue(pipeline.run(wwhp_heating_definition('A')))
+        self.assertTrue(pipeline.succeeded)
+        self.assertIsNone(pipeline.first_failure)
+        self.assertEqual(list(Pipeline.Stage), [r.stage for r in pipeline.stage_results])
@@ -0,0 +1,84 @@
+from json import loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase
+from unittest.mock import patch
+
+from energyplus_pet.pipeline import Pipeline
+from energyplus_pet.profiling import profiled, Profiler, span
+from energyplus_pet.tests.equipment.catalog_test_helper import wwhp_heating_definition
+
+
+class TestProfiling(TestCase):
+
+    def test_spans_are_free_when_inactive(self):
+        with span('outside') as s:
+            self.assertIsNone(s)
+        profiler = Profiler()
+        with profiler:
+            with span('outer'):
+                with span('inner'):
+                    pass
+        with span('after'):
+            pass
+        self.assertEqual(['outer', 'inner'], [s.name for s in profiler.spans])
+        self.assertEqual([0, 1], [s.depth for s in profiler.spans])
+        self.assertGreaterEqual(profiler.spans[0].seconds, profiler.spans[1].seconds)
+        self.assertIsNone(profiler.peak_memory_bytes)
+
+    def test_decorator_threads_and_totals(self):
+        @profiled('work')
+        def work(value: int) -> int:
+            with span('inner'):
+                return value * 2
+
+        self.assertEqual(2, work(1))  # no profiler yet, so nothing is recorded
+        profiler = Profiler()
+        with profiler:
+            with span('outer'):
+                self.assertEqual(4, work(2))
+                # another thread starts its own nesting, rather than nesting inside this thread's open span
+                thread = Thread(target=work, args=(3,))
+                thread.start()
+                thread.join()
+        names_and_depths = sorted((s.name, s.depth) for s in profiler.spans)
+        self.assertEqual([('inner', 1), ('inner', 2), ('outer', 0), ('work', 0), ('work', 1)], names_and_depths)
+        totals = profiler.totals()
+        self.assertEqual(2, totals['work']['count'])
+        self.assertLessEqual(totals['work']['max_seconds'], totals['work']['seconds'])
+        self.assertEqual({'outer', 'work', 'inner'}, set(totals))
+
+    def test_memory_without_reset_peak(self):
+        # before Python 3.9 there is no tracemalloc.reset_peak, so only the overall peak is recorded
+        with patch('energyplus_pet.profiling._RESET_PEAK', None):
+            with Profiler(trace_memory=True) as profiler:
+                with span('outer'):
+                    data = [float(i) for i in range(10000)]
+        self.assertEqual(10000, len(data))
+        self.assertGreater(profiler.peak_memory_bytes, 0)
+        self.assertIsNone(profiler.spans[0].peak_memory_bytes)
+        self.assertNotIn('peak_memory_bytes', profiler.report()['spans'][0])
+
+    def test_pipeline_report(self):
+        with Profiler(trace_memory=True, use_cprofile=True) as profiler:
+            self.assertTrue(Pipeline().run(wwhp_heating_definition('A')))
+        totals = profiler.totals()
+        for name in [
+            'ApplyCorrectionFactors', 'apply_correction_factors', 'expand_by_correction_factor', 'read_catalog_data',
+            'do_curve_fits', 'evaluate_generated_parameters', 'eval_linear_curve_at_points', 'to_eplus_idf_object',
+            'to_eplus_epjson_object'
+        ]:
+            self.assertIn(name, totals)
+        self.assertEqual(2, totals['eval_linear_curve_at_points']['count'])
+        self.assertGreater(profiler.peak_memory_bytes, 0)
+        for s in profiler.spans:
+            if s.peak_memory_bytes is not None:  # the per-span peaks need Python 3.9
+                self.assertLessEqual(s.peak_memory_bytes, profiler.peak_memory_bytes)
+        with TemporaryDirectory() as temp_dir:
+            report_path = Path(temp_dir) / 'report.json'
+            profiler.dump_json(str(report_path))
+            report = loads(report_path.read_text())
+        self.assertEqual(len(profiler.spans), len(report['spans']))
+        self.assertGreater(len(report['cprofile']), 0)
+        self.assertGreaterEqual(report['total_seconds'], totals['GenerateParameters']['seconds'])
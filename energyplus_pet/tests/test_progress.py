@@ -0,0 +1,48 @@
+from time import sleep
+from unittest import TestCase
+
+from energyplus_pet.exceptions import EnergyPlusPetException, OperationCancelled
+from energyplus_pet.progress import CancellationToken, check_cancelled, ProgressTracker
+
+
+class TestCancellationToken(TestCase):
+
+    def test_cancel(self):
+        token = CancellationToken()
+        self.assertFalse(token.cancelled)
+        token.check()
+        check_cancelled(None)
+        token.cancel('First reason')
+        token.cancel('Second reason')
+        self.assertTrue(token.cancelled)
+        with self.assertRaises(OperationCancelled) as context:
+            check_cancelled(token)
+        self.assertEqual('First reason', str(context.exception))
+        self.assertIsInstance(context.exception, EnergyPlusPetException)
+
+    def test_timeout(self):
+        self.assertFalse(CancellationToken(timeout_seconds=60.0).cancelled)
+        token = CancellationToken(timeout_seconds=0.01)
+        sleep(0.02)
+        self.assertTrue(token.cancelled)
+        self.assertIn('Timed out', token.reason)
+
+
+class TestProgressTracker(TestCase):
+
+    def test_reports_fractions(self):
+        fractions = []
+        tracker = ProgressTracker(1000, fractions.append, min_step=0.1)
+        for _ in range(1000):
+            tracker.advance(1)
+        self.assertEqual(10, len(fractions))  # throttled to the minimum step, rather than once per advance
+        self.assertEqual(sorted(fractions), fractions)
+        self.assertEqual(1.0, fractions[-1])
+        tracker.advance(5)
+        self.assertEqual(1.0, tracker.fraction)
+        self.assertEqual(10, len(fractions))
+
+    def test_no_callback_or_work(self):
+        tracker = ProgressTracker(0, None)
+        tracker.advance(1)
+        self.assertEqual(1.0, tracker.fraction)
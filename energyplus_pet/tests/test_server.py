@@ -0,0 +1,123 @@
+from http.client import HTTPConnection
+from json import dumps, loads
+from threading import Thread
+from unittest import TestCase
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from energyplus_pet.server import fit_definition, FittingServer, FittingService
+from energyplus_pet.tests.equipment.catalog_test_helper import wwhp_heating_definition
+
+
+class TestServer(TestCase):
+
+    def setUp(self):
+        self.service = FittingService(num_workers=1, max_queue=1, timeout_seconds=60.0)
+        self.server = FittingServer(self.service)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.shutdown()
+
+    def request(self, path: str, body=None):
+        data = None if body is None else (body if isinstance(body, bytes) else dumps(body).encode('utf-8'))
+        try:
+            with urlopen(Request(f"{self.base_url}{path}", data=data), timeout=60) as response:
+                return response.status, loads(response.read()), response.headers
+        except HTTPError as e:
+            return e.code, loads(e.read()), e.headers
+
+    def test_fit_definition_failure(self):
+        # the successful path is covered through the server in test_fit_and_metrics
+        response = fit_definition({'equipment_type': 'Nope'})
+        self.assertFalse(response['success'])
+        self.assertIn('SelectEquipment', response['error'])
+        response = fit_definition({'base_data': []})
+        self.assertFalse(response['success'])
+        self.assertNotIn('idf', response)
+
+    def test_fit_and_metrics(self):
+        status, body, _ = self.request('/fit', wwhp_heating_definition('SKU-1'))
+        self.assertEqual(200, status)
+        self.assertTrue(body['success'])
+        self.assertIn('HeatPump:WaterToWater:EquationFit:Heating', loads(body['epjson']))
+        self.assertEqual(24, body['metrics']['num_data_rows'])
+        self.assertEqual({'total_capacity', 'heating_power'}, set(body['metrics']['outputs']))
+        self.assertGreater(body['elapsed_seconds'], 0.0)
+        too_small = wwhp_heating_definition('SKU-2')
+        too_small['correction_factors'] = []
+        too_small['base_data'] = too_small['base_data'][:2]
+        status, body, _ = self.request('/fit', too_small)
+        self.assertEqual(422, status)
+        self.assertIn('ApplyCorrectionFactors', body['error'])
+        status, body, _ = self.request('/fit', b'{not json')
+        self.assertEqual(400, status)
+        status, metrics, _ = self.request('/metrics')
+        self.assertEqual(200, status)
+        self.assertEqual(2, metrics['requests'])
+        self.assertEqual(1, metrics['succeeded'])
+        self.assertEqual(1, metrics['failed'])
+        self.assertEqual(0, metrics['pending'])
+        self.assertEqual(2, metrics['latency_seconds']['count'])
+        self.assertLessEqual(metrics['latency_seconds']['p50'], metrics['latency_seconds']['p99'])
+        self.assertEqual((200, {'status': 'ok'}), self.request('/health')[:2])
+        self.assertEqual(404, self.request('/nope')[0])
+
+    def test_full_queue_is_rejected(self):
+        # take every worker and queue slot, as if long running jobs were already submitted
+        for _ in range(self.service.num_workers + self.service.max_queue):
+            self.service._slots.acquire()
+        status, body, headers = self.request('/fit', wwhp_heating_definition('SKU-1'))
+        self.assertEqual(503, status)
+        self.assertFalse(body['success'])
+        self.assertEqual('1', headers['Retry-After'])
+        self.assertEqual(1, self.request('/metrics')[1]['rejected'])
+
+    def test_unavailable_pool_releases_the_slot(self):
+        self.service.shutdown()
+        for _ in range(self.service.num_workers + self.service.max_queue + 1):
+            job_result = self.service.submit(wwhp_heating_definition('SKU-1'))
+            self.assertEqual(503, job_result.status)
+            self.assertIn('unavailable', job_result.body['error'])
+        metrics = self.service.metrics()
+        self.assertEqual(0, metrics['pending'])
+        # every slot was given back, so they can all still be taken
+        for _ in range(self.service.num_workers + self.service.max_queue):
+            self.assertTrue(self.service._slots.acquire(blocking=False))
+
+    def test_rejected_request_bodies(self):
+        for body in ([1, 2], 'a string', None, 3.5):
+            status, response, _ = self.request('/fit', dumps(body).encode('utf-8'))
+            self.assertEqual(400, status)
+            self.assertEqual('Request body must be a JSON object', response['error'])
+        status, response, _ = self.request('/fit', b'\xff\xfe')
+        self.assertEqual(400, status)
+        self.assertIn('not valid JSON', response['error'])
+        self.server.max_request_bytes = 16
+        status, response, _ = self.request('/fit', {'equipment_type': 'WWHP_Heating_CurveFit'})
+        self.assertEqual(413, status)
+        self.assertIn('16 bytes', response['error'])
+        # none of these ever reached the fitting service
+        self.assertEqual(0, self.service.metrics()['requests'])
+
+    def test_bad_content_length(self):
+        for length in ('abc', '-5'):
+            connection = HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=60)
+            connection.putrequest('POST', '/fit')
+            connection.putheader('Content-Length', length)
+            connection.endheaders()
+            response = connection.getresponse()
+            self.assertEqual(400, response.status)
+            self.assertIn('Content-Length', loads(response.read())['error'])
+            connection.close()
+
+    def test_percentile(self):
+        self.assertIsNone(FittingService.percentile([], 50))
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(50.0, FittingService.percentile(values, 50))
+        self.assertEqual(99.0, FittingService.percentile(values, 99))
+        self.assertEqual(1.0, FittingService.percentile(values, 0))
@@ -0,0 +1,99 @@
+from json import dumps
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from numpy import frombuffer, load, savez, uint8
+from numpy.testing import assert_array_equal
+
+from energyplus_pet.exceptions import EnergyPlusPetException
+from energyplus_pet.pipeline import Pipeline
+from energyplus_pet.session import load_session, save_session
+from energyplus_pet.tests.equipment.catalog_test_helper import wwhp_heating_definition
+
+
+class TestSession(TestCase):
+
+    def test_fitted_round_trip(self):
+        pipeline = Pipeline()
+        self.assertTrue(pipeline.run(wwhp_heating_definition('A')))
+        with TemporaryDirectory() as temp_dir:
+            session_path = str(Path(temp_dir) / 'session.npz')
+            save_session(pipeline, session_path)
+            with load(session_path) as container:
+                self.assertNotIn('final_data', container.files)  # the expanded data is recomputed, not saved
+            restored = load_session(session_path)
+        self.assertEqual(pipeline.outputs, restored.outputs)
+        self.assertEqual(pipeline.constant_parameters, restored.constant_parameters)
+        assert_array_equal(pipeline.data_manager.final_data, restored.data_manager.final_data)
+        self.assertEqual(pipeline.equipment.heating_power_params, restored.equipment.heating_power_params)
+        assert_array_equal(pipeline.equipment.predicted_heating_power, restored.equipment.predicted_heating_power)
+        self.assertEqual(
+            [cf.to_dict() for cf in pipeline.data_manager.correction_factors],
+            [cf.to_dict() for cf in restored.data_manager.correction_factors]
+        )
+
+    def test_partial_sessions(self):
+        with TemporaryDirectory() as temp_dir:
+            session_path = str(Path(temp_dir) / 'session.npz')
+            pipeline = Pipeline()
+            with self.assertRaises(EnergyPlusPetException):
+                save_session(pipeline, session_path)
+            pipeline.select_equipment('WWHP_Heating_CurveFit')
+            pipeline.add_base_data(wwhp_heating_definition('A')['base_data'])
+            save_session(pipeline, session_path)
+            restored = load_session(session_path)
+            self.assertFalse(restored.data_manager.data_processed)
+            self.assertEqual({}, restored.outputs)
+            assert_array_equal(pipeline.data_manager.base_data, restored.data_manager.base_data)
+            # a failed apply, with too little data, leaves the data unprocessed, so the session still loads
+            self.assertFalse(pipeline.apply_correction_factors().success)
+            self.assertFalse(pipeline.data_manager.data_processed)
+            save_session(pipeline, session_path)
+            self.assertFalse(load_session(session_path).data_manager.data_processed)
+
+    def test_bad_session_files(self):
+        with TemporaryDirectory() as temp_dir:
+            with self.assertRaises(EnergyPlusPetException):
+                load_session(str(Path(temp_dir) / 'missing.npz'))
+            future_path = str(Path(temp_dir) / 'future.npz')
+            metadata = frombuffer(dumps({'format_version': 999}).encode('utf-8'), dtype=uint8)
+            savez(future_path, metadata=metadata, base_data=[[]])
+            with self.assertRaises(EnergyPlusPetException):
+                load_session(future_path)
+
+    def test_corrupt_session_files(self):
+        with TemporaryDirectory() as temp_dir:
+            session_path = Path(temp_dir) / 'session.npz'
+            pipeline = Pipeline()
+            pipeline.select_equipment('WWHP_Heating_CurveFit')
+            pipeline.add_base_data(wwhp_heating_definition('A')['base_data'])
+            save_session(pipeline, str(session_path))
+            good_bytes = session_path.read_bytes()
+            bad_files = {
+                'garbage': b'not a session file',
+                'truncated': good_bytes[:len(good_bytes) // 2],
+                'empty': b'',
+            }
+            for name, contents in bad_files.items():
+                path = Path(temp_dir) / f"{name}.npz"
+                path.write_bytes(contents)
+                with self.assertRaises(EnergyPlusPetException):
+                    load_session(str(path))
+            wrong_arrays = Path(temp_dir) / 'wrong_arrays.npz'
+            savez(str(wrong_arrays), something_else=[1.0])
+            bad_metadata = Path(temp_dir) / 'bad_metadata.npz'
+            savez(str(bad_metadata), metadata=frombuffer(b'{not json', dtype=uint8), base_data=[[]])
+            missing_keys = Path(temp_dir) / 'missing_keys.npz'
+            metadata = frombuffer(dumps({'format_version': 1}).encode('utf-8'), dtype=uint8)
+            savez(str(missing_keys), metadata=metadata, base_data=[[]])
+            missing_params = Path(temp_dir) / 'missing_params.npz'
+            metadata = frombuffer(dumps({
+                'format_version': 1, 'equipment_type': 'WWHP_Heating_CurveFit', 'constant_parameters': {},
+                'correction_factors': [], 'data_processed': False, 'fitted': True,
+            }).encode('utf-8'), dtype=uint8)
+            savez(str(missing_params), metadata=metadata, base_data=[[]])
+            for path in (wrong_arrays, bad_metadata, missing_keys, missing_params):
+                with self.assertRaises(EnergyPlusPetException):
+                    load_session(str(path))
+            self.assertEqual(8, load_session(str(session_path)).data_manager.base_data.shape[0])
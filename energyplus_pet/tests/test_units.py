@@ -1,10 +1,13 @@
 from typing import Union
 from unittest import TestCase
 
+from numpy import linspace
+
 from energyplus_pet.exceptions import EnergyPlusPetException
 from energyplus_pet.units import (
     PowerValue, FlowValue, TemperatureValue, PressureValue, LengthValue, RotationSpeedValue,
-    unit_class_factory, unit_instance_factory, UnitType, DimensionlessValue
+    convert_array_to_calculation_unit, convert_units, unit_class_factory, unit_instance_factory, UnitType,
+    DimensionlessValue, UnitRegistry
 )
 
 
@@ -137,3 +140,109 @@ class TestUnitFactory(TestCase):
         with self.assertRaises(EnergyPlusPetException):
             # noinspection PyTypeChecker
             unit_instance_factory(0.0, 42828)  # purposefully passing an invalid unit type here
+
+
+class TestArrayConversion(TestCase):
+    def test_array_and_single_conversions_match_known_formulas(self):
+        # the expected conversions are written out independently of the unit tables, so a wrong scale or offset fails
+        expected_formulas = [
+            (UnitType.Power, PowerValue.Watts, lambda v: v / 1000.0),
+            (UnitType.Power, PowerValue.Kilowatts, lambda v: v),
+            (UnitType.Power, PowerValue.BTU_hour, lambda v: v / (3.412 * 1000)),
+            (UnitType.Power, PowerValue.MBTU_hour, lambda v: v * 1000 / (3.412 * 1000)),
+            (UnitType.Flow, FlowValue.GPM, lambda v: v * 0.00006309),
+            (UnitType.Flow, FlowValue.CFM, lambda v: v * 0.0004719474432),
+            (UnitType.Flow, FlowValue.M3S, lambda v: v),
+            (UnitType.Temperature, TemperatureValue.F, lambda v: (v - 32.0) / 1.8),
+            (UnitType.Temperature, TemperatureValue.C, lambda v: v),
+            (UnitType.Temperature, TemperatureValue.K, lambda v: v - 273.15),
+            (UnitType.Pressure, PressureValue.KPa, lambda v: v * 1000.0),
+            (UnitType.Pressure, PressureValue.Atm, lambda v: v * 101325.0),
+            (UnitType.Pressure, PressureValue.PSI, lambda v: v * 6894.757),
+            (UnitType.Length, LengthValue.Feet, lambda v: v * 0.3048),
+            (UnitType.Length, LengthValue.Inches, lambda v: v * 0.0254),
+            (UnitType.RotationalSpeed, RotationSpeedValue.RevsPerMinute, lambda v: v / 60.0),
+            (UnitType.RotationalSpeed, RotationSpeedValue.RadiansPerSecond, lambda v: v / 6.2831853),
+        ]
+        values = [-40.0, 0.0, 1.0, 72.5, 1234.5]
+        for unit_type, unit_id, formula in expected_formulas:
+            converted = convert_array_to_calculation_unit(values, unit_type, unit_id)
+            self.assertEqual((len(values),), converted.shape)
+            for value, converted_value in zip(values, converted):
+                expected = formula(value)
+                self.assertAlmostEqual(expected, converted_value, delta=1e-12 * max(1.0, abs(expected)))
+                single = unit_class_factory(unit_type)(value, initial_unit_id=unit_id)
+                single.convert_to_calculation_unit()
+                self.assertAlmostEqual(expected, single.value, delta=1e-12 * max(1.0, abs(expected)))
+        # and a few familiar points
+        fahrenheit = convert_array_to_calculation_unit([32.0, 212.0], UnitType.Temperature, TemperatureValue.F)
+        self.assertAlmostEqual(0.0, fahrenheit[0])
+        self.assertAlmostEqual(100.0, fahrenheit[1])
+        self.assertAlmostEqual(0.00006309, convert_array_to_calculation_unit([1.0], UnitType.Flow, FlowValue.GPM)[0])
+        self.assertAlmostEqual(1.0, convert_array_to_calculation_unit([3412.0], UnitType.Power, PowerValue.BTU_hour)[0])
+
+    def test_large_array_conversion(self):
+        values = linspace(-40.0, 120.0, 50000).reshape(10000, 5)
+        converted = TemperatureValue.convert_array_to_calculation_unit(values, TemperatureValue.F)
+        self.assertEqual(values.shape, converted.shape)
+        self.assertAlmostEqual(-40.0, converted.min())
+
+    def test_bad_unit_id_in_array_conversion(self):
+        with self.assertRaises(EnergyPlusPetException):
+            PowerValue.convert_array_to_calculation_unit([1.0], FlowValue.GPM)
+
+
+class TestUnitRegistry(TestCase):
+    @staticmethod
+    def _registry() -> UnitRegistry:
+        return UnitRegistry([PowerValue, TemperatureValue])
+
+    def test_convert_between_any_units(self):
+        self.assertAlmostEqual(233.15, float(convert_units(-40.0, TemperatureValue.F, TemperatureValue.K)), 6)
+        self.assertAlmostEqual(212.0, float(convert_units(373.15, TemperatureValue.K, TemperatureValue.F)), 6)
+        converted = convert_units([1.0, 2.0], PowerValue.MBTU_hour, PowerValue.BTU_hour)
+        self.assertAlmostEqual(2000.0, converted[1], 6)
+        with self.assertRaises(EnergyPlusPetException):
+            convert_units(1.0, PowerValue.Watts, FlowValue.GPM)
+        with self.assertRaises(EnergyPlusPetException):
+            convert_units(1.0, 'not-a-unit', FlowValue.GPM)
+
+    def test_register_unit(self):
+        registry = self._registry()
+        held_strings = registry.unit_strings(UnitType.Power)
+        registry.register_unit(UnitType.Power, 'PowerValueTon', 'tons', 3.517)
+        self.assertNotIn('PowerValueTon', held_strings)  # mappings already handed out never change
+        self.assertEqual('PowerValueTon', registry.id_from_string(UnitType.Power, 'tons'))
+        self.assertAlmostEqual(3517.0, float(registry.convert(1.0, 'PowerValueTon', PowerValue.Watts)), 6)
+        with self.assertRaises(EnergyPlusPetException):
+            registry.register_unit(UnitType.Power, 'PowerValueTon', 'other tons', 3.517)
+        with self.assertRaises(EnergyPlusPetException):
+            registry.register_unit(UnitType.Power, 'PowerValueTon2', 'tons', 3.517)
+        with self.assertRaises(EnergyPlusPetException):
+            registry.register_unit(UnitType.Power, 'PowerValueZero', 'zero', 0.0)
+        with self.assertRaises(EnergyPlusPetException):
+            registry.register_unit(UnitType.Flow, 'FlowValueLPS', 'L/s', 0.001)  # type not in this registry
+
+    def test_unit_id_order(self):
+        # the unit ID list keeps its original order, which differs from the string map for power
+        self.assertEqual(
+            [PowerValue.Watts, PowerValue.Kilowatts, PowerValue.BTU_hour, PowerValue.MBTU_hour],
+            PowerValue.get_unit_ids()
+        )
+        self.assertEqual(
+            [PowerValue.Kilowatts, PowerValue.Watts, PowerValue.BTU_hour, PowerValue.MBTU_hour],
+            list(PowerValue.get_unit_string_map())
+        )
+        self.assertEqual([FlowValue.GPM, FlowValue.CFM, FlowValue.M3S], FlowValue.get_unit_ids())
+        registry = self._registry()
+        registry.register_unit(UnitType.Power, 'PowerValueTon', 'tons', 3.517)
+        self.assertEqual('PowerValueTon', registry.unit_ids(UnitType.Power)[-1])
+        self.assertEqual(PowerValue.Watts, registry.unit_ids(UnitType.Power)[0])
+
+    def test_mappings_are_read_only(self):
+        string_map = TemperatureValue.get_unit_string_map()
+        self.assertIs(string_map, TemperatureValue.get_unit_string_map())
+        self.assertEqual([TemperatureValue.F, TemperatureValue.C, TemperatureValue.K], list(string_map))
+        with self.assertRaises(TypeError):
+            # noinspection PyUnresolvedReferences
+            string_map[TemperatureValue.F] = 'Fahrenheit'
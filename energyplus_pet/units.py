@@ -1,7 +1,9 @@
 from abc import abstractmethod
-from collections import OrderedDict
 from enum import Enum, auto
-from typing import List, Type, OrderedDict as TypingOD
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple, Type
+
+from numpy import asarray, ndarray
 
 from energyplus_pet.exceptions import EnergyPlusPetException
 
@@ -23,8 +25,19 @@ class BaseValueWithUnit:
     just use the UnitType enumeration, because there is no value associated with that column.
     This class is mostly just used while tabular forms are open to handle users entering data in various units and
     normalizing them before sending the properly formed data to the equipment processing routines.
+
+    Every conversion to the calculation unit is affine, calculation_value = value * scale + offset, so each derived
+    class declares its units once in ``unit_definitions``, mapping each unit ID to its (unit string, scale, offset).
+    Those declarations are collected into the module level ``UNIT_REGISTRY`` at import, and all the lookups here are
+    answered from that registry with dictionary lookups, nothing is rebuilt or scanned per call.
     """
 
+    unit_type: UnitType = None
+    # maps each unit ID to a (unit string, scale, offset) tuple, where the scale and offset convert to calculation unit
+    unit_definitions: Dict[str, Tuple[str, float, float]] = {}
+    # the order of get_unit_ids, only needed where it differs from the unit_definitions (and unit string map) order
+    unit_id_order: Tuple[str, ...] = ()
+
     def __init__(
             self, initial_value: float, name: str = "<Unnamed>", description: str = '<...>', initial_unit_id: str = None
     ):
@@ -32,7 +45,7 @@ class BaseValueWithUnit:
         self.name = name
         self.description = description
         if initial_unit_id is not None:
-            if initial_unit_id not in self.get_unit_ids():
+            if initial_unit_id not in self.get_unit_string_map():
                 raise EnergyPlusPetException(
                     f"Invalid unit ID in unit constructor for class {self.__class__.__name__} = {initial_unit_id}"
                 )
@@ -40,19 +53,18 @@ class BaseValueWithUnit:
         else:
             self.units = self.calculation_unit_id()
 
-    @abstractmethod
-    def get_unit_type(self) -> UnitType:  # pragma: no cover
-        pass
+    def get_unit_type(self) -> UnitType:
+        return self.unit_type
 
-    @staticmethod
-    @abstractmethod
-    def get_unit_ids() -> List[str]:  # pragma: no cover
-        pass
+    @classmethod
+    def get_unit_ids(cls) -> List[str]:
+        """Returns the unit IDs of this type, in ``unit_id_order`` if given, then in declaration order"""
+        return list(UNIT_REGISTRY.unit_ids(cls.unit_type))
 
-    @staticmethod
-    @abstractmethod
-    def get_unit_string_map() -> TypingOD[str, str]:  # pragma: no cover
-        pass
+    @classmethod
+    def get_unit_string_map(cls) -> Mapping[str, str]:
+        """Returns a read-only, ordered mapping of unit ID to unit string for this type, shared between calls"""
+        return UNIT_REGISTRY.unit_strings(cls.unit_type)
 
     @classmethod
     def get_id_from_unit_string(cls, current_units_string: str) -> str:
@@ -62,12 +74,7 @@ class BaseValueWithUnit:
         :param current_units_string: A string of units to search for, such as 'kg/s'
         :return: An internal string ID of the unit matching what comes from get_unit_ids()
         """
-        for k, v in cls.get_unit_string_map().items():
-            if v == current_units_string:
-                return k
-        raise EnergyPlusPetException(
-            f"No ID for unit string: {current_units_string}; possible units = {cls.get_unit_string_map().values()}"
-        )
+        return UNIT_REGISTRY.id_from_string(cls.unit_type, current_units_string)
 
     @staticmethod
     @abstractmethod
@@ -84,9 +91,36 @@ class BaseValueWithUnit:
     def base_si_unit() -> str:  # pragma: no cover
         pass
 
-    @abstractmethod
-    def convert_to_calculation_unit(self):  # pragma: no cover
-        pass
+    @classmethod
+    def get_calculation_unit_affine(cls, unit_id: str) -> Tuple[float, float]:
+        """
+        Looks up the affine conversion from a unit of this type to the calculation unit
+
+        :param unit_id: An internal string ID of the unit matching what comes from get_unit_ids()
+        :return: A tuple of (scale, offset), where calculation_value = value * scale + offset
+        """
+        definition = UNIT_REGISTRY.find_definition(unit_id)
+        if definition is None or definition.unit_type != cls.unit_type:
+            raise EnergyPlusPetException(f"Invalid unit ID for conversion in class {cls.__name__} = {unit_id}")
+        return definition.scale, definition.offset
+
+    @classmethod
+    def convert_array_to_calculation_unit(cls, values, unit_id: str) -> ndarray:
+        """
+        Converts a whole array of values from one unit of this type to the calculation unit in a single operation.
+
+        :param values: A NumPy array or any sequence of numbers, all in the same unit
+        :param unit_id: The internal string ID of the unit the values are currently in
+        :return: A new float array of values in the calculation unit, with the same shape as the input
+        """
+        scale, offset = cls.get_calculation_unit_affine(unit_id)
+        return asarray(values, dtype=float) * scale + offset
+
+    def convert_to_calculation_unit(self) -> None:
+        """Converts this value in place to the calculation unit, using the same table as the array conversion"""
+        scale, offset = self.get_calculation_unit_affine(self.units)
+        self.value = self.value * scale + offset
+        self.units = self.calculation_unit_id()
 
     def __str__(self) -> str:
         return f"{self.value} [{self.get_unit_string_map()[self.units]}]"
@@ -95,18 +129,10 @@ class BaseValueWithUnit:
 class DimensionlessValue(BaseValueWithUnit):
     Dimensionless = __qualname__ + "-"
 
-    def get_unit_type(self) -> UnitType:
-        return UnitType.Dimensionless
-
-    @staticmethod
-    def get_unit_ids() -> List[str]:
-        return [DimensionlessValue.Dimensionless]
-
-    @staticmethod
-    def get_unit_string_map() -> TypingOD[str, str]:
-        od = OrderedDict()
-        od[DimensionlessValue.Dimensionless] = "--"
-        return od
+    unit_type = UnitType.Dimensionless
+    unit_definitions = {
+        Dimensionless: ("--", 1.0, 0.0),
+    }
 
     @staticmethod
     def calculation_unit_id() -> str:
@@ -120,9 +146,6 @@ class DimensionlessValue(BaseValueWithUnit):
     def base_si_unit() -> str:
         return DimensionlessValue.Dimensionless
 
-    def convert_to_calculation_unit(self):
-        return
-
 
 class PowerValue(BaseValueWithUnit):
     Kilowatts = __qualname__ + "kW"
@@ -130,21 +153,14 @@ class PowerValue(BaseValueWithUnit):
     BTU_hour = __qualname__ + "BtuH"
     MBTU_hour = __qualname__ + "MBtuH"
 
-    def get_unit_type(self) -> UnitType:
-        return UnitType.Power
-
-    @staticmethod
-    def get_unit_ids() -> List[str]:
-        return [PowerValue.Watts, PowerValue.Kilowatts, PowerValue.BTU_hour, PowerValue.MBTU_hour]
-
-    @staticmethod
-    def get_unit_string_map() -> TypingOD[str, str]:
-        od = OrderedDict()
-        od[PowerValue.Kilowatts] = "kW"
-        od[PowerValue.Watts] = "W"
-        od[PowerValue.BTU_hour] = "Btu/hr"
-        od[PowerValue.MBTU_hour] = "MBtu/hr"
-        return od
+    unit_type = UnitType.Power
+    unit_definitions = {
+        Kilowatts: ("kW", 1.0, 0.0),
+        Watts: ("W", 1 / 1000.0, 0.0),
+        BTU_hour: ("Btu/hr", 1 / (3.412 * 1000), 0.0),
+        MBTU_hour: ("MBtu/hr", 1000 / (3.412 * 1000), 0.0),
+    }
+    unit_id_order = (Watts, Kilowatts, BTU_hour, MBTU_hour)
 
     @staticmethod
     def calculation_unit_id() -> str:
@@ -158,39 +174,18 @@ class PowerValue(BaseValueWithUnit):
     def base_si_unit() -> str:
         return PowerValue.Kilowatts
 
-    def convert_to_calculation_unit(self):
-        if self.units == self.calculation_unit_id():
-            return
-        elif self.units == PowerValue.Watts:
-            self.value /= 1000.0
-        elif self.units == PowerValue.BTU_hour:
-            factor = 1 / (3.412 * 1000)
-            self.value *= factor
-        elif self.units == PowerValue.MBTU_hour:
-            factor = 1000 / (3.412 * 1000)
-            self.value *= factor
-        self.units = self.calculation_unit_id()
-
 
 class FlowValue(BaseValueWithUnit):
     GPM = __qualname__ + "GPM"
     CFM = __qualname__ + "CFM"
     M3S = __qualname__ + "M3S"
 
-    def get_unit_type(self) -> UnitType:
-        return UnitType.Flow
-
-    @staticmethod
-    def get_unit_ids() -> List[str]:
-        return [FlowValue.GPM, FlowValue.CFM, FlowValue.M3S]
-
-    @staticmethod
-    def get_unit_string_map() -> TypingOD[str, str]:
-        od = OrderedDict()
-        od[FlowValue.GPM] = "GPM"
-        od[FlowValue.CFM] = "CFM"
-        od[FlowValue.M3S] = "m^3/s"
-        return od
+    unit_type = UnitType.Flow
+    unit_definitions = {
+        GPM: ("GPM", 0.00006309, 0.0),
+        CFM: ("CFM", 0.0004719474432, 0.0),
+        M3S: ("m^3/s", 1.0, 0.0),
+    }
 
     @staticmethod
     def calculation_unit_id() -> str:
@@ -204,35 +199,18 @@ class FlowValue(BaseValueWithUnit):
     def base_si_unit() -> str:
         return FlowValue.M3S
 
-    def convert_to_calculation_unit(self):
-        if self.units == self.calculation_unit_id():
-            return
-        elif self.units == FlowValue.CFM:
-            self.value *= 0.0004719474432
-        elif self.units == FlowValue.GPM:
-            self.value *= 0.00006309
-        self.units = self.calculation_unit_id()
-
 
 class TemperatureValue(BaseValueWithUnit):
     F = __qualname__ + "F"
     C = __qualname__ + "C"
     K = __qualname__ + "K"
 
-    def get_unit_type(self) -> UnitType:
-        return UnitType.Temperature
-
-    @staticmethod
-    def get_unit_ids() -> List[int]:
-        return [TemperatureValue.F, TemperatureValue.C, TemperatureValue.K]
-
-    @staticmethod
-    def get_unit_string_map() -> TypingOD[str, str]:
-        od = OrderedDict()
-        od[TemperatureValue.F] = "deg F"
-        od[TemperatureValue.C] = "deg C"
-        od[TemperatureValue.K] = "Kelvin"
-        return od
+    unit_type = UnitType.Temperature
+    unit_definitions = {
+        F: ("deg F", 1 / 1.8, -32.0 / 1.8),
+        C: ("deg C", 1.0, 0.0),
+        K: ("Kelvin", 1.0, -273.15),
+    }
 
     @staticmethod
     def calculation_unit_id() -> str:
@@ -246,15 +224,6 @@ class TemperatureValue(BaseValueWithUnit):
     def base_si_unit() -> str:
         return TemperatureValue.C
 
-    def convert_to_calculation_unit(self):
-        if self.units == self.calculation_unit_id():
-            return
-        elif self.units == TemperatureValue.F:
-            self.value = (self.value - 32.0) / 1.8
-        elif self.units == TemperatureValue.K:
-            self.value -= 273.15
-        self.units = self.calculation_unit_id()
-
 
 class PressureValue(BaseValueWithUnit):
     Pa = __qualname__ + "Pa"
@@ -262,21 +231,13 @@ class PressureValue(BaseValueWithUnit):
     Atm = __qualname__ + "Atm"
     PSI = __qualname__ + "PSI"
 
-    def get_unit_type(self) -> UnitType:
-        return UnitType.Pressure
-
-    @staticmethod
-    def get_unit_ids() -> List[str]:
-        return [PressureValue.Pa, PressureValue.KPa, PressureValue.Atm, PressureValue.PSI]
-
-    @staticmethod
-    def get_unit_string_map() -> TypingOD[str, str]:
-        od = OrderedDict()
-        od[PressureValue.Pa] = "Pa"
-        od[PressureValue.KPa] = "kPa"
-        od[PressureValue.Atm] = "atm"
-        od[PressureValue.PSI] = "psi"
-        return od
+    unit_type = UnitType.Pressure
+    unit_definitions = {
+        Pa: ("Pa", 1.0, 0.0),
+        KPa: ("kPa", 1000.0, 0.0),
+        Atm: ("atm", 101325.0, 0.0),
+        PSI: ("psi", 6894.757, 0.0),
+    }
 
     @staticmethod
     def calculation_unit_id() -> str:
@@ -290,17 +251,6 @@ class PressureValue(BaseValueWithUnit):
     def base_si_unit() -> str:
         return PressureValue.Pa
 
-    def convert_to_calculation_unit(self):
-        if self.units == self.calculation_unit_id():
-            return
-        elif self.units == PressureValue.KPa:
-            self.value *= 1000.0
-        elif self.units == PressureValue.Atm:
-            self.value *= 101325.0
-        elif self.units == PressureValue.PSI:
-            self.value *= 6894.757
-        self.units = self.calculation_unit_id()
-
 
 class LengthValue(BaseValueWithUnit):
     Meters = __qualname__ + "M"
@@ -309,24 +259,14 @@ class LengthValue(BaseValueWithUnit):
     Centimeters = __qualname__ + "CM"
     Millimeters = __qualname__ + "MM"
 
-    def get_unit_type(self) -> UnitType:
-        return UnitType.Length
-
-    @staticmethod
-    def get_unit_ids() -> List[str]:
-        return [
-            LengthValue.Meters, LengthValue.Feet, LengthValue.Inches, LengthValue.Centimeters, LengthValue.Millimeters
-        ]
-
-    @staticmethod
-    def get_unit_string_map() -> TypingOD[str, str]:
-        od = OrderedDict()
-        od[LengthValue.Meters] = "Meters"
-        od[LengthValue.Feet] = "Feet"
-        od[LengthValue.Inches] = "Inches"
-        od[LengthValue.Centimeters] = "Centimeters"
-        od[LengthValue.Millimeters] = "Millimeters"
-        return od
+    unit_type = UnitType.Length
+    unit_definitions = {
+        Meters: ("Meters", 1.0, 0.0),
+        Feet: ("Feet", 0.3048, 0.0),
+        Inches: ("Inches", 0.0254, 0.0),
+        Centimeters: ("Centimeters", 0.01, 0.0),
+        Millimeters: ("Millimeters", 0.001, 0.0),
+    }
 
     @staticmethod
     def calculation_unit_id() -> str:
@@ -340,39 +280,18 @@ class LengthValue(BaseValueWithUnit):
     def base_si_unit() -> str:
         return LengthValue.Meters
 
-    def convert_to_calculation_unit(self):
-        if self.units == self.calculation_unit_id():
-            return
-        elif self.units == LengthValue.Feet:
-            self.value *= 0.3048
-        elif self.units == LengthValue.Inches:
-            self.value *= 0.0254
-        elif self.units == LengthValue.Centimeters:
-            self.value *= 0.01
-        elif self.units == LengthValue.Millimeters:
-            self.value *= 0.001
-        self.units = self.calculation_unit_id()
-
 
 class RotationSpeedValue(BaseValueWithUnit):
     RevsPerSecond = __qualname__ + "Rps"
     RevsPerMinute = __qualname__ + "Rpm"
     RadiansPerSecond = __qualname__ + "RadPs"
 
-    def get_unit_type(self) -> UnitType:
-        return UnitType.RotationalSpeed
-
-    @staticmethod
-    def get_unit_ids() -> List[str]:
-        return [RotationSpeedValue.RevsPerSecond, RotationSpeedValue.RevsPerMinute, RotationSpeedValue.RadiansPerSecond]
-
-    @staticmethod
-    def get_unit_string_map() -> TypingOD[str, str]:
-        od = OrderedDict()
-        od[RotationSpeedValue.RevsPerSecond] = "Revs/Sec"
-        od[RotationSpeedValue.RevsPerMinute] = "Revs/Min"
-        od[RotationSpeedValue.RadiansPerSecond] = "Rads/Sec"
-        return od
+    unit_type = UnitType.RotationalSpeed
+    unit_definitions = {
+        RevsPerSecond: ("Revs/Sec", 1.0, 0.0),
+        RevsPerMinute: ("Revs/Min", 1 / 60.0, 0.0),
+        RadiansPerSecond: ("Rads/Sec", 1 / 6.2831853, 0.0),
+    }
 
     @staticmethod
     def calculation_unit_id() -> str:
@@ -386,34 +305,230 @@ class RotationSpeedValue(BaseValueWithUnit):
     def base_si_unit() -> str:
         return RotationSpeedValue.RevsPerSecond
 
-    def convert_to_calculation_unit(self):
-        if self.units == self.calculation_unit_id():
-            return
-        elif self.units == RotationSpeedValue.RadiansPerSecond:
-            self.value /= 6.2831853
-        elif self.units == RotationSpeedValue.RevsPerMinute:
-            self.value /= 60.0
-        self.units = self.calculation_unit_id()
+
+class UnitDefinition(NamedTuple):
+    """Everything the registry knows about a single unit"""
+    unit_id: str
+    unit_type: UnitType
+    unit_string: str
+    scale: float  # calculation_value = value * scale + offset
+    offset: float
+
+
+class UnitRegistry:
+    """
+    A registry of every unit type and unit, built once from the unit classes and then treated as frozen.
+    All the lookups are dictionary lookups, and every mapping handed out is a read-only view.
+    Registering a new unit does not mutate any mapping in place, it builds new dictionaries and swaps them in, so a
+    mapping a caller is already holding never changes underneath them.
+    """
+
+    def __init__(self, unit_classes: List[Type[BaseValueWithUnit]]):
+        """
+        Create a new registry from the unit declarations of each unit class
+
+        :param unit_classes: The BaseValueWithUnit derived classes to register, one per UnitType
+        """
+        self._classes: Mapping[UnitType, Type[BaseValueWithUnit]] = MappingProxyType(
+            {c.unit_type: c for c in unit_classes}
+        )
+        self._definitions: Mapping[str, UnitDefinition] = MappingProxyType({})
+        self._strings_by_type: Mapping[UnitType, Mapping[str, str]] = MappingProxyType({})
+        self._ids_by_type: Mapping[UnitType, Tuple[str, ...]] = MappingProxyType({})
+        self._ids_by_type_and_string: Mapping[Tuple[UnitType, str], str] = MappingProxyType({})
+        self._conversions: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._rebuild([
+            UnitDefinition(unit_id, c.unit_type, *definition)
+            for c in unit_classes for unit_id, definition in c.unit_definitions.items()
+        ])
+
+    def _rebuild(self, definitions: List[UnitDefinition]) -> None:
+        """Validates the full list of unit definitions and replaces every lookup mapping with new ones built from it"""
+        strings_by_type = {unit_type: {} for unit_type in self._classes}
+        ids_by_type_and_string = {}
+        for d in definitions:
+            if d.unit_type not in strings_by_type:
+                raise EnergyPlusPetException(f"Unit {d.unit_id} has an unregistered unit type: {d.unit_type}")
+            if (d.unit_type, d.unit_string) in ids_by_type_and_string:
+                raise EnergyPlusPetException(f"Duplicate unit string for {d.unit_type.name}: {d.unit_string}")
+            if d.scale == 0.0:
+                raise EnergyPlusPetException(f"Unit {d.unit_id} has a zero scale, it could never be converted back")
+            strings_by_type[d.unit_type][d.unit_id] = d.unit_string
+            ids_by_type_and_string[(d.unit_type, d.unit_string)] = d.unit_id
+        definitions_by_id = {d.unit_id: d for d in definitions}
+        if len(definitions_by_id) != len(definitions):
+            raise EnergyPlusPetException("Duplicate unit ID found while building the unit registry")
+        self._definitions = MappingProxyType(definitions_by_id)
+        self._strings_by_type = MappingProxyType({t: MappingProxyType(m) for t, m in strings_by_type.items()})
+        ids_by_type = {}
+        for unit_type, strings in strings_by_type.items():
+            preferred = [i for i in self._classes[unit_type].unit_id_order if i in strings]
+            ids_by_type[unit_type] = tuple(preferred + [i for i in strings if i not in preferred])
+        self._ids_by_type = MappingProxyType(ids_by_type)
+        self._ids_by_type_and_string = MappingProxyType(ids_by_type_and_string)
+        self._conversions = {}
+
+    def unit_class(self, unit_type: UnitType) -> Type[BaseValueWithUnit]:
+        """
+        Looks up the unit class registered for a unit type
+
+        :param unit_type: A UnitType enum value
+        :return: The BaseValueWithUnit derived class for that type, raising if the type is not registered
+        """
+        try:
+            return self._classes[unit_type]
+        except (KeyError, TypeError):
+            raise EnergyPlusPetException(f"Bad unit_type input sent to unit registry: \"{str(unit_type)}\", aborting.")
+
+    def find_definition(self, unit_id: str) -> Optional[UnitDefinition]:
+        """
+        Looks up a unit definition, without raising if it is missing
+
+        :param unit_id: An internal string unit ID
+        :return: The UnitDefinition, or None if no unit has that ID
+        """
+        return self._definitions.get(unit_id)
+
+    def definition(self, unit_id: str) -> UnitDefinition:
+        """
+        Looks up a unit definition
+
+        :param unit_id: An internal string unit ID
+        :return: The UnitDefinition, raising if no unit has that ID
+        """
+        definition = self._definitions.get(unit_id)
+        if definition is None:
+            raise EnergyPlusPetException(f"Unknown unit ID: {unit_id}")
+        return definition
+
+    def unit_strings(self, unit_type: UnitType) -> Mapping[str, str]:
+        """Returns a read-only mapping of unit ID to unit string for one type, in registration order"""
+        self.unit_class(unit_type)  # validates the type
+        return self._strings_by_type[unit_type]
+
+    def unit_ids(self, unit_type: UnitType) -> Tuple[str, ...]:
+        """
+        Returns the unit IDs of one type, in the unit class ``unit_id_order`` if it has one, then registration order
+
+        :param unit_type: A UnitType enum value
+        :return: A tuple of internal string unit IDs
+        """
+        self.unit_class(unit_type)  # validates the type
+        return self._ids_by_type[unit_type]
+
+    def id_from_string(self, unit_type: UnitType, unit_string: str) -> str:
+        """
+        Looks up a unit ID from its display string
+
+        :param unit_type: The UnitType to search within
+        :param unit_string: A unit display string, such as 'kW'
+        :return: The internal string unit ID, raising if no unit of that type has the string
+        """
+        try:
+            return self._ids_by_type_and_string[(unit_type, unit_string)]
+        except KeyError:
+            raise EnergyPlusPetException(
+                f"No ID for unit string: {unit_string}; possible units = {list(self.unit_strings(unit_type).values())}"
+            ) from None
+
+    def register_unit(self, unit_type: UnitType, unit_id: str, unit_string: str, scale: float, offset: float = 0.0):
+        """
+        Adds a new unit to an existing unit type
+
+        :param unit_type: The UnitType the new unit belongs to
+        :param unit_id: A unique internal string ID for the new unit
+        :param unit_string: The display string for the new unit, unique within the unit type
+        :param scale: The scale in calculation_value = value * scale + offset
+        :param offset: The offset in calculation_value = value * scale + offset
+        :return: Nothing
+        """
+        self.unit_class(unit_type)
+        if unit_id in self._definitions:
+            raise EnergyPlusPetException(f"Unit ID is already registered: {unit_id}")
+        new_definition = UnitDefinition(unit_id, unit_type, unit_string, float(scale), float(offset))
+        self._rebuild(list(self._definitions.values()) + [new_definition])
+
+    def conversion(self, from_unit_id: str, to_unit_id: str) -> Tuple[float, float]:
+        """
+        Composes the affine conversion between two units of the same type, without going through the calculation unit
+
+        :param from_unit_id: The unit ID to convert from
+        :param to_unit_id: The unit ID to convert to
+        :return: A tuple of (scale, offset), where to_value = from_value * scale + offset
+        """
+        key = (from_unit_id, to_unit_id)
+        cached = self._conversions.get(key)
+        if cached is not None:
+            return cached
+        from_definition, to_definition = self.definition(from_unit_id), self.definition(to_unit_id)
+        if from_definition.unit_type != to_definition.unit_type:
+            raise EnergyPlusPetException(
+                f"Cannot convert between unit types {from_definition.unit_type.name} and {to_definition.unit_type.name}"
+            )
+        scale = from_definition.scale / to_definition.scale
+        offset = (from_definition.offset - to_definition.offset) / to_definition.scale
+        self._conversions[key] = (scale, offset)
+        return scale, offset
+
+    def convert(self, values, from_unit_id: str, to_unit_id: str) -> ndarray:
+        """
+        Converts a value or array of values directly between two units of the same type
+
+        :param values: A number, NumPy array or any sequence of numbers, all in the from unit
+        :param from_unit_id: The unit ID to convert from
+        :param to_unit_id: The unit ID to convert to
+        :return: A new float array of converted values, with the same shape as the input
+        """
+        scale, offset = self.conversion(from_unit_id, to_unit_id)
+        return asarray(values, dtype=float) * scale + offset
+
+
+UNIT_REGISTRY = UnitRegistry(
+    [PowerValue, FlowValue, TemperatureValue, DimensionlessValue, PressureValue, LengthValue, RotationSpeedValue]
+)
+
+
+def register_unit(unit_type: UnitType, unit_id: str, unit_string: str, scale: float, offset: float = 0.0) -> None:
+    """
+    Adds a new unit to an existing unit type in the shared registry, so every unit class and form can use it
+
+    :param unit_type: The UnitType the new unit belongs to
+    :param unit_id: A unique internal string ID for the new unit
+    :param unit_string: The display string for the new unit, unique within the unit type
+    :param scale: The scale in calculation_value = value * scale + offset
+    :param offset: The offset in calculation_value = value * scale + offset
+    :return: Nothing
+    """
+    UNIT_REGISTRY.register_unit(unit_type, unit_id, unit_string, scale, offset)
+
+
+def convert_units(values, from_unit_id: str, to_unit_id: str) -> ndarray:
+    """
+    Converts a value or array of values directly between any two units of the same type
+
+    :param values: A number, NumPy array or any sequence of numbers, all in the from unit
+    :param from_unit_id: The internal string ID of the unit the values are currently in
+    :param to_unit_id: The internal string ID of the unit to convert to
+    :return: A new float array of converted values, with the same shape as the input
+    """
+    return UNIT_REGISTRY.convert(values, from_unit_id, to_unit_id)
 
 
 def unit_class_factory(unit_type: UnitType) -> Type[BaseValueWithUnit]:
-    if unit_type == UnitType.Power:
-        return PowerValue
-    elif unit_type == UnitType.Flow:
-        return FlowValue
-    elif unit_type == UnitType.Temperature:
-        return TemperatureValue
-    elif unit_type == UnitType.Dimensionless:
-        return DimensionlessValue
-    elif unit_type == UnitType.Pressure:
-        return PressureValue
-    elif unit_type == UnitType.Length:
-        return LengthValue
-    elif unit_type == UnitType.RotationalSpeed:
-        return RotationSpeedValue
-    else:
-        raise EnergyPlusPetException(f"Bad unit_type input sent to unit_class_factory: \"{str(unit_type)}\", aborting.")
+    return UNIT_REGISTRY.unit_class(unit_type)
 
 
 def unit_instance_factory(value: float, unit_type: UnitType) -> BaseValueWithUnit:
     return unit_class_factory(unit_type)(value)
+
+
+def convert_array_to_calculation_unit(values, unit_type: UnitType, unit_id: str) -> ndarray:
+    """
+    Converts a whole array of values in one unit to the calculation unit of the unit type, with no per-value objects.
+
+    :param values: A NumPy array or any sequence of numbers, all in the same unit
+    :param unit_type: The UnitType of the values
+    :param unit_id: The internal string ID of the unit the values are currently in
+    :return: A new float array of values in the calculation unit
+    """
+    return unit_class_factory(unit_type).convert_array_to_calculation_unit(values, unit_id)
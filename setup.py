@@ -7,7 +7,7 @@ from energyplus_pet import VERSION
 readme_file = pathlib.Path(__file__).parent.resolve() / 'README.md'
 readme_contents = readme_file.read_text()
 
-install_requires = ['tksheet==7.1.8', 'matplotlib', 'scipy', 'PLAN-Tools>=0.5', 'pillow>=8.0.0']
+install_requires = ['tksheet==7.1.8', 'matplotlib', 'numpy', 'scipy', 'PLAN-Tools>=0.5', 'pillow>=8.0.0']
 if system() == 'Windows':
     install_requires.append('pypiwin32')
 
@@ -26,7 +26,13 @@ setup(
     install_requires=install_requires,
     entry_points={
         'gui_scripts': ['energyplus_pet_gui=energyplus_pet.runner:main_gui'],
-        'console_scripts': ['energyplus_pet_configure=energyplus_pet.configure:configure_cli',]
+        'console_scripts': [
+            'energyplus_pet_configure=energyplus_pet.configure:configure_cli',
+            'energyplus_pet_batch=energyplus_pet.batch:main_batch',
+            'energyplus_pet_fit_cache=energyplus_pet.fit_cache:main_fit_cache',
+            'energyplus_pet_benchmark=energyplus_pet.benchmark:main_benchmark',
+            'energyplus_pet_server=energyplus_pet.server:main_server',
+        ]
     },
     classifiers=[
         'Development Status :: 4 - Beta',